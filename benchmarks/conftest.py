@@ -0,0 +1,33 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from synthetic import SHAPES, write_mdoc
+
+SECTION_COUNTS = [
+    n for n in (10, 100, 1000, 10000)
+    if n <= int(os.environ.get('MDOCFILE_BENCHMARK_MAX_SECTIONS', 10000))
+]
+
+
+@pytest.fixture(scope='session', params=list(SHAPES))
+def shape(request):
+    """Shape of the synthetic mdoc files, see `synthetic.SHAPES`."""
+    return request.param
+
+
+@pytest.fixture(scope='session', params=SECTION_COUNTS)
+def n_sections(request):
+    """Number of sections per synthetic mdoc file."""
+    return request.param
+
+
+@pytest.fixture(scope='session')
+def mdoc_file(tmp_path_factory, shape, n_sections):
+    """Synthetic mdoc file, written once per session."""
+    directory = tmp_path_factory.mktemp('synthetic')
+    return write_mdoc(directory / f'{shape}_{n_sections}.mdoc', shape, n_sections)
@@ -0,0 +1,126 @@
+"""Generate synthetic SerialEM mdoc files of realistic shape and arbitrary size."""
+import random
+from os import PathLike
+from pathlib import Path
+from typing import Callable, Dict, List
+
+TITLES = [
+    '[T = SerialEM: Synthetic Krios                        01-Jan-24  12:00:00    ]',
+    '[T =     Tilt axis angle = 85.3, binning = 1  spot = 8  camera = 1]',
+]
+EXTRA_SECTION_FIELDS = ['OperatingMode = 1', 'CountsPerElectron = 16', 'MoveStage = 0']
+
+
+def _header(lines: List[str]) -> str:
+    return '\n'.join(lines) + '\n\n' + '\n\n'.join(TITLES)
+
+
+def _common_section_lines(
+    rng: random.Random, idx: int, tilt_angle: float
+) -> List[str]:
+    return [
+        f'TiltAngle = {tilt_angle:g}',
+        f'StagePosition = {rng.uniform(-500, 500):.4f} {rng.uniform(-500, 500):.4f}',
+        f'StageZ = {rng.uniform(-20, 20):.4f}',
+        'Magnification = 105000',
+        f'Intensity = {rng.uniform(0, 0.1):.6f}',
+        f'ExposureDose = {rng.uniform(0, 4):.4f}',
+        'PixelSpacing = 1.35',
+        'SpotSize = 8',
+        f'Defocus = {rng.uniform(-5, -1):.5f}',
+        f'ImageShift = {rng.gauss(0, 1):.5f} {rng.gauss(0, 1):.5f}',
+        'RotationAngle = 175.3',
+        'ExposureTime = 0.8',
+        'Binning = 1',
+        'CameraIndex = 1',
+        'DividedBy2 = 0',
+        'MagIndex = 31',
+        f'MinMaxMean = {rng.randint(-50, 0)} {rng.randint(1000, 2000)} '
+        f'{rng.uniform(200, 800):.3f}',
+        'TargetDefocus = -4',
+        f'DateTime = 01-Jan-24  12:{idx // 60 % 60:02d}:{idx % 60:02d}',
+    ]
+
+
+def tilt_series(n_sections: int, seed: int = 0) -> str:
+    """Tilt series with [ZValue] sections and movie frame paths."""
+    rng = random.Random(seed)
+    blocks = [_header([
+        'PixelSpacing = 1.35', 'ImageFile = TS_01.mrc', 'ImageSize = 4096 4096',
+        'DataMode = 1',
+    ])]
+    for idx in range(n_sections):
+        tilt_angle = (idx % 41 - 20) * 3.0
+        blocks.append('\n'.join([
+            f'[ZValue = {idx}]',
+            *_common_section_lines(rng, idx, tilt_angle),
+            f'SubFramePath = D:\\DATA\\frames\\TS_01_{idx:05d}_{tilt_angle:.1f}.tif',
+            'NumSubFrames = 8',
+        ]))
+    return '\n\n'.join(blocks) + '\n'
+
+
+def montage(n_sections: int, seed: int = 0) -> str:
+    """Montage with one piece per section, every tenth section is a [MontSection]."""
+    rng = random.Random(seed)
+    blocks = [_header([
+        'PixelSpacing = 76.8', 'Voltage = 300', 'ImageFile = mmm.mrc',
+        'ImageSize = 2880 2046', 'Montage = 1', 'DataMode = 1',
+    ])]
+    pieces_per_row = 50
+    for idx in range(n_sections):
+        x, y = idx % pieces_per_row * 2600, idx // pieces_per_row * 1800
+        header = f'[MontSection = {idx}]' if idx % 10 == 9 else f'[ZValue = {idx}]'
+        blocks.append('\n'.join([
+            header,
+            f'PieceCoordinates = {x} {y} 0',
+            *_common_section_lines(rng, idx, 0.0),
+            f'XedgeDxy = {rng.gauss(0, 50):.3f} {rng.gauss(0, 50):.3f}',
+            f'YedgeDxy = {rng.gauss(0, 50):.3f} {rng.gauss(0, 50):.3f}',
+            f'XedgeDxyVS = {rng.gauss(0, 50):.3f} {rng.gauss(0, 50):.3f} '
+            f'{rng.random():.4f}',
+            f'AlignedPieceCoords = {x + rng.randint(-50, 50)} '
+            f'{y + rng.randint(-50, 50)} 0',
+        ]))
+    return '\n\n'.join(blocks) + '\n'
+
+
+def frame_sets(n_sections: int, seed: int = 0) -> str:
+    """Frame sets using the 'FrameDosesAndNumber' alias."""
+    rng = random.Random(seed)
+    blocks = [_header(['T = SerialEM: Synthetic Krios', 'Voltage = 300'])]
+    for idx in range(n_sections):
+        tilt_angle = (idx % 41 - 20) * 3.0
+        blocks.append('\n'.join([
+            f'[FrameSet = {idx}]',
+            *_common_section_lines(rng, idx, tilt_angle),
+            f'SubFramePath = X:\\frames\\s_{idx:05d}_{tilt_angle:.1f}.tif',
+            'NumSubFrames = 12',
+            f'FrameDosesAndNumber = {rng.uniform(0.5, 1):.5f} 12',
+            'FilterSlitAndLoss = 20 0',
+        ]))
+    return '\n\n'.join(blocks) + '\n'
+
+
+def extra_fields(n_sections: int, seed: int = 0) -> str:
+    """Tilt series with unknown global and section fields."""
+    text = tilt_series(n_sections, seed=seed)
+    text = 'GridName = grid_03\n' + text
+    return text.replace(
+        'NumSubFrames = 8', '\n'.join(['NumSubFrames = 8', *EXTRA_SECTION_FIELDS])
+    )
+
+
+SHAPES: Dict[str, Callable[..., str]] = {
+    'tilt_series': tilt_series,
+    'montage': montage,
+    'frame_sets': frame_sets,
+    'extra_fields': extra_fields,
+}
+
+
+def write_mdoc(filename: PathLike, shape: str, n_sections: int, seed: int = 0) -> Path:
+    """Write a synthetic mdoc file of the given shape and number of sections."""
+    filename = Path(filename)
+    filename.write_text(SHAPES[shape](n_sections, seed=seed))
+    return filename
@@ -0,0 +1,73 @@
+"""Throughput and peak memory of reading and writing mdoc files.
+
+Run with `pytest benchmarks`, see benchmarks/README.md.
+"""
+import logging
+import tracemalloc
+
+import pytest
+
+from mdocfile import read, write
+from mdocfile.data_models import Mdoc
+
+pytest.importorskip('pytest_benchmark')
+
+
+@pytest.fixture(autouse=True)
+def quiet_logging():
+    """Silence logs of unknown fields and aliases, written once per file read."""
+    logger = logging.getLogger('mdocfile')
+    level = logger.level
+    logger.setLevel(logging.ERROR)
+    yield
+    logger.setLevel(level)
+
+
+def run(benchmark, n_sections, func, *args):
+    """Benchmark func(*args), recording throughput and peak memory."""
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result = benchmark(func, *args)
+    benchmark.extra_info['n_sections'] = n_sections
+    benchmark.extra_info['peak_memory_bytes'] = peak
+    if benchmark.stats is not None:  # None with --benchmark-disable
+        benchmark.extra_info['sections_per_second'] = (
+            n_sections / benchmark.stats.stats.mean
+        )
+    return result
+
+
+@pytest.mark.parametrize('engine', ['pydantic', 'fast'])
+def test_read(benchmark, mdoc_file, n_sections, engine):
+    """Read a file into a dataframe with each engine."""
+    df = run(benchmark, n_sections, read, mdoc_file, engine)
+    assert len(df) == n_sections
+
+
+def test_mdoc_from_file(benchmark, mdoc_file, n_sections):
+    """Parse a file into an Mdoc."""
+    mdoc = run(benchmark, n_sections, Mdoc.from_file, mdoc_file)
+    assert len(mdoc.section_data) == n_sections
+
+
+def test_mdoc_to_dataframe(benchmark, mdoc_file, n_sections):
+    """Convert a parsed Mdoc to a dataframe."""
+    mdoc = Mdoc.from_file(mdoc_file)
+    df = run(benchmark, n_sections, mdoc.to_dataframe)
+    assert len(df) == n_sections
+
+
+def test_mdoc_from_dataframe(benchmark, mdoc_file, n_sections):
+    """Convert a dataframe back to an Mdoc."""
+    df = read(mdoc_file)
+    mdoc = run(benchmark, n_sections, Mdoc.from_dataframe, df)
+    assert len(mdoc.section_data) == n_sections
+
+
+def test_write(benchmark, mdoc_file, n_sections, tmp_path):
+    """Write a dataframe to an mdoc file."""
+    df = read(mdoc_file)
+    run(benchmark, n_sections, write, df, tmp_path / 'out.mdoc')
+    assert (tmp_path / 'out.mdoc').read_text() == Mdoc.from_dataframe(df).to_string()
@@ -1 +1,49 @@
-from .functions import read, write
+"""SerialEM mdoc files as pandas dataframes.
+
+Attributes and submodules are imported on first access so that ``import
+mdocfile`` stays cheap: pandas and pydantic are only loaded once something
+which needs them is used.
+"""
+import importlib
+from typing import Any, List
+
+# public attribute -> submodule which defines it
+_LAZY_ATTRIBUTES = {
+    'read': 'functions',
+    'read_many': 'functions',
+    'write': 'functions',
+    'MdocFollower': 'follow',
+    'iter_sections': 'streaming',
+    'MdocCache': 'cache',
+    'read_parquet': 'parquet',
+    'to_arrow': 'parquet',
+    'to_parquet': 'parquet',
+    'MdocIndex': 'index',
+    'stats': 'profiling',
+    'read_header': 'header',
+    'read_titles': 'header',
+    'read_tilt_angles': 'header',
+    'MdocEditor': 'editor',
+    'edit_many': 'editor',
+    'read_montage': 'montage',
+    'validate': 'validation',
+}
+_LAZY_SUBMODULES = ('aio',)
+
+__all__ = [*_LAZY_ATTRIBUTES, *_LAZY_SUBMODULES]
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_ATTRIBUTES:
+        module = importlib.import_module(f'.{_LAZY_ATTRIBUTES[name]}', __name__)
+        value = getattr(module, name)
+    elif name in _LAZY_SUBMODULES:
+        value = importlib.import_module(f'.{name}', __name__)
+    else:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,5 @@
+import sys
+
+from mdocfile.cli import main
+
+sys.exit(main())
@@ -0,0 +1,144 @@
+"""Asynchronous reading of mdoc files, e.g. from slow network filesystems.
+
+File I/O runs in threads with a bounded number of files open at a time and
+parsing is offloaded to an executor, so reads from high latency storage
+overlap with each other and with parsing.
+"""
+import asyncio
+import logging
+from concurrent.futures import Executor
+from os import PathLike
+from typing import Iterable, Optional, Union
+
+import pandas as pd
+
+from mdocfile import columnar
+from mdocfile.data_models import Mdoc
+from mdocfile.functions import ENGINES, find_mdoc_files, tilt_series_id
+from mdocfile.interning import Interner
+
+log = logging.getLogger('mdocfile')
+
+DEFAULT_MAX_CONCURRENCY = 16
+
+
+def _read_text(filename: PathLike) -> str:
+    with open(filename) as file:
+        return file.read()
+
+
+def _parse(text: str, engine: str) -> pd.DataFrame:
+    if engine == 'fast':
+        return columnar.read_string(text)
+    return Mdoc.from_string(text).to_dataframe()
+
+
+async def read_mdoc(
+    filename: PathLike, executor: Optional[Executor] = None
+) -> Mdoc:
+    """Read an mdoc file as an Mdoc object without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    text = await asyncio.to_thread(_read_text, filename)
+    return await loop.run_in_executor(executor, Mdoc.from_string, text)
+
+
+async def read(
+    filename: PathLike,
+    engine: str = 'pydantic',
+    executor: Optional[Executor] = None,
+) -> pd.DataFrame:
+    """Read an mdoc file as a pandas dataframe without blocking the event loop.
+
+    Parameters
+    ----------
+    filename : PathLike
+        SerialEM mdoc file to read
+    engine : str
+        parsing engine, see `mdocfile.read`
+    executor : Optional[Executor]
+        executor in which files are parsed, defaults to the event loop's
+        default executor
+
+    Returns
+    -------
+    df : pd.DataFrame
+        dataframe containing info from mdoc file
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}, got '{engine}'")
+    loop = asyncio.get_running_loop()
+    text = await asyncio.to_thread(_read_text, filename)
+    return await loop.run_in_executor(executor, _parse, text, engine)
+
+
+async def read_many(
+    paths: Union[PathLike, str, Iterable[PathLike]],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    engine: str = 'pydantic',
+    executor: Optional[Executor] = None,
+    add_tilt_series_id: bool = False,
+    intern: Union[bool, Interner] = True,
+) -> pd.DataFrame:
+    """Read many mdoc files concurrently into a single pandas dataframe.
+
+    Behaves like `mdocfile.read_many`: rows keep the order of the input files
+    and files which fail to parse are logged and recorded in
+    `df.attrs['read_errors']`.
+
+    Parameters
+    ----------
+    paths : PathLike | str | Iterable[PathLike]
+        glob pattern, directory containing mdoc files or sequence of mdoc files
+    max_concurrency : int
+        maximum number of files which are read at the same time
+    engine : str
+        parsing engine, see `mdocfile.read`
+    executor : Optional[Executor]
+        executor in which files are parsed, defaults to the event loop's
+        default executor
+    add_tilt_series_id : bool
+        whether to add a 'tilt_series_id' column derived from each filename
+    intern : Union[bool, Interner]
+        share equal titles, paths, keys and tuple values between files to
+        reduce memory, an `Interner` also shares them with other batches
+
+    Returns
+    -------
+    df : pd.DataFrame
+        concatenated dataframe with a 'source_file' column
+    """
+    if max_concurrency < 1:
+        raise ValueError(
+            f'max_concurrency must be a positive integer, got {max_concurrency}'
+        )
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}, got '{engine}'")
+    filenames = find_mdoc_files(paths)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def read_one(filename) -> pd.DataFrame:
+        async with semaphore:
+            df = await read(filename, engine=engine, executor=executor)
+        df['source_file'] = str(filename)
+        if add_tilt_series_id:
+            df['tilt_series_id'] = tilt_series_id(filename)
+        return df
+
+    results = await asyncio.gather(
+        *(read_one(filename) for filename in filenames), return_exceptions=True
+    )
+    frames = []
+    read_errors = {}
+    for filename, result in zip(filenames, results):
+        if isinstance(result, Exception):
+            log.warning(f"Failed to read {filename}: {result!r}")
+            read_errors[str(filename)] = repr(result)
+            continue
+        frames.append(result)
+
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    if intern:
+        interner = intern if isinstance(intern, Interner) else Interner()
+        interner.dataframe(df)
+    df.attrs['read_errors'] = read_errors
+    return df
@@ -0,0 +1,206 @@
+"""Persistent on-disk cache of parsed mdoc files."""
+import hashlib
+import json
+import logging
+import math
+import os
+import tempfile
+from importlib.metadata import PackageNotFoundError, version
+from os import PathLike
+from pathlib import Path, PurePath, PureWindowsPath
+from typing import Any, Callable, Optional
+
+import pandas as pd
+
+log = logging.getLogger('mdocfile')
+
+try:
+    LIBRARY_VERSION = version('mdocfile')
+except PackageNotFoundError:  # pragma: no cover
+    LIBRARY_VERSION = 'unknown'
+
+CACHE_SUFFIX = '.json'
+DEFAULT_MAX_BYTES = 1024 ** 3
+
+
+def default_cache_directory() -> Path:
+    """Cache directory from $MDOCFILE_CACHE_DIR, else the user cache directory."""
+    if 'MDOCFILE_CACHE_DIR' in os.environ:
+        return Path(os.environ['MDOCFILE_CACHE_DIR'])
+    cache_home = os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')
+    return Path(cache_home) / 'mdocfile'
+
+
+def _encode(value: Any) -> Any:
+    """JSON representation of a dataframe value, tuples and paths are tagged."""
+    if isinstance(value, tuple):
+        return {'tuple': [_encode(v) for v in value]}
+    if isinstance(value, list):
+        return [_encode(v) for v in value]
+    if isinstance(value, dict):
+        return {'dict': {k: _encode(v) for k, v in value.items()}}
+    if isinstance(value, PurePath):
+        tag = 'windows_path' if isinstance(value, PureWindowsPath) else 'path'
+        return {tag: str(value)}
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    if pd.isna(value):
+        return math.nan
+    raise TypeError(f'cannot cache value {value!r} of type {type(value).__name__}')
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    [(tag, content)] = value.items()
+    if tag == 'tuple':
+        return tuple(_decode(v) for v in content)
+    if tag == 'dict':
+        return {k: _decode(v) for k, v in content.items()}
+    return (PureWindowsPath if tag == 'windows_path' else Path)(content)
+
+
+def _dump(df: pd.DataFrame, key: str) -> dict:
+    return {
+        'key': key,
+        'columns': list(df.columns),
+        'dtypes': [str(dtype) for dtype in df.dtypes],
+        'data': [_encode(df[column].tolist()) for column in df.columns],
+        'attrs': _encode(df.attrs),
+    }
+
+
+def _load(entry: dict, key: str) -> pd.DataFrame:
+    if entry['key'] != key:
+        raise ValueError('cache entry does not match the file')
+    df = pd.DataFrame(
+        {column: pd.Series(_decode(values), dtype=dtype) for column, values, dtype
+         in zip(entry['columns'], entry['data'], entry['dtypes'])},
+        columns=entry['columns'],
+    )
+    df.attrs = _decode(entry['attrs'])
+    return df
+
+
+class MdocCache:
+    """On-disk cache of parsed mdoc dataframes.
+
+    Entries are keyed on the absolute path, modification time and size of the
+    mdoc file and on the library version, so they are invalidated automatically
+    when a file changes. Entries are written atomically and the least recently
+    used entries are evicted once the cache grows beyond `max_bytes`, which makes
+    the cache safe to share between processes.
+
+    Entries are stored as JSON, so reading a cache entry cannot execute code,
+    but anyone who can write to the cache directory can change the dataframes
+    read from it. The directory is created readable by its owner only, only
+    point `MDOCFILE_CACHE_DIR` at a directory shared with users you trust.
+
+    Parameters
+    ----------
+    directory : Optional[PathLike]
+        directory in which cached dataframes are stored
+    max_bytes : int
+        maximum total size of cached entries
+    """
+
+    def __init__(
+        self,
+        directory: Optional[PathLike] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.directory = Path(directory or default_cache_directory())
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, filename: PathLike) -> str:
+        """Cache key for the current state of an mdoc file."""
+        path = Path(filename).absolute()
+        stat = os.stat(path)
+        identity = f'{path}\0{stat.st_mtime_ns}\0{stat.st_size}\0{LIBRARY_VERSION}'
+        return hashlib.sha256(identity.encode()).hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.directory / f'{key}{CACHE_SUFFIX}'
+
+    def get(self, filename: PathLike) -> Optional[pd.DataFrame]:
+        """Cached dataframe for an mdoc file, None if absent or out of date."""
+        key = self.key(filename)
+        entry = self._entry(key)
+        try:
+            with open(entry, encoding='utf-8') as file:
+                df = _load(json.load(file), key)
+            os.utime(entry)  # mark as recently used
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            log.warning(f'Ignoring unreadable cache entry {entry}: {e!r}')
+            self.misses += 1
+            return None
+        self.hits += 1
+        return df
+
+    def put(self, filename: PathLike, df: pd.DataFrame, key: Optional[str] = None):
+        """Store the dataframe for an mdoc file in the cache."""
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        key = key or self.key(filename)
+        data = _dump(df, key)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump(data, file)
+            os.replace(tmp, self._entry(key))
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def read(
+        self, filename: PathLike, parse: Callable[[PathLike], pd.DataFrame]
+    ) -> pd.DataFrame:
+        """Return the cached dataframe for a file, parsing and storing it on a miss.
+
+        The result is only stored if the file did not change while it was parsed.
+        """
+        df = self.get(filename)
+        if df is not None:
+            return df
+        key = self.key(filename)
+        df = parse(filename)
+        if self.key(filename) == key:
+            self.put(filename, df, key=key)
+        return df
+
+    def size(self) -> int:
+        """Total size of cached entries in bytes."""
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def _entries(self):
+        if not self.directory.exists():
+            return []
+        return list(self.directory.glob(f'*{CACHE_SUFFIX}'))
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:  # removed by another process
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        for entry in self._entries():
+            entry.unlink(missing_ok=True)
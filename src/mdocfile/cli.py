@@ -0,0 +1,375 @@
+"""Command line interface for inspecting and converting many mdoc files.
+
+Files are processed in parallel with ``--jobs N`` and results are printed as
+each file finishes, in input order, so whole session directories can be
+handled in one invocation::
+
+    mdocfile summary /data/session
+    mdocfile to-csv '/data/session/*.mdoc' --output-dir csv/
+    mdocfile filter TS_01.mrc.mdoc --tilt-range -45 45 --output-dir filtered/
+    mdocfile validate /data/session --jobs 8
+"""
+import argparse
+import functools
+import logging
+import math
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from os import PathLike
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from mdocfile.functions import ENGINES, find_mdoc_files, read, write
+from mdocfile.validation import Problem, check_file
+
+log = logging.getLogger('mdocfile')
+
+SUMMARY_COLUMNS = (
+    'file', 'sections', 'min_tilt', 'max_tilt', 'pixel_spacing', 'total_dose'
+)
+
+
+def _describe(error: Exception) -> str:
+    """One line description of an error, e.g. a multi-line ValidationError."""
+    return ' '.join(f'{type(error).__name__}: {error}'.split())
+
+
+def _map_files(
+    function: Callable[[Path], Any], filenames: List[Path], jobs: int
+) -> Iterator[Tuple[Path, Any, Optional[str]]]:
+    """Apply a function to files, yielding (filename, result, error) in order."""
+    if jobs == 1:
+        for filename in filenames:
+            try:
+                yield filename, function(filename), None
+            except Exception as e:
+                yield filename, None, _describe(e)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(function, filename) for filename in filenames]
+        for filename, future in zip(filenames, futures):
+            try:
+                yield filename, future.result(), None
+            except Exception as e:
+                yield filename, None, _describe(e)
+
+
+def _output_path(
+    filename: Path, output_dir: Optional[PathLike], suffix: str
+) -> Path:
+    """Path for a converted file, next to the input if no directory is given."""
+    name = filename.name
+    if name.endswith('.mdoc'):
+        name = name[:-len('.mdoc')]
+    directory = filename.parent if output_dir is None else Path(output_dir)
+    return directory / (name + suffix)
+
+
+def _format_value(value: Any) -> str:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    if isinstance(value, float):
+        return f'{value:g}'
+    return str(value)
+
+
+def _summarize(filename: Path, engine: str) -> Dict[str, Any]:
+    df = read(filename, engine=engine)
+    tilt_angles = df['TiltAngle'] if 'TiltAngle' in df else None
+    return {
+        'file': str(filename),
+        'sections': len(df),
+        'min_tilt': None if tilt_angles is None else tilt_angles.min(),
+        'max_tilt': None if tilt_angles is None else tilt_angles.max(),
+        'pixel_spacing': df['PixelSpacing'].iloc[0] if 'PixelSpacing' in df else None,
+        'total_dose': df['ExposureDose'].sum() if 'ExposureDose' in df else None,
+    }
+
+
+def _to_csv(filename: Path, engine: str, output_dir: Optional[PathLike]) -> Path:
+    out = _output_path(filename, output_dir, '.csv')
+    read(filename, engine=engine, compact=True).to_csv(out, index=False)
+    return out
+
+
+def _to_json(filename: Path, engine: str, output_dir: Optional[PathLike]) -> Path:
+    out = _output_path(filename, output_dir, '.json')
+    read(filename, engine=engine).to_json(
+        out, orient='records', default_handler=str
+    )
+    return out
+
+
+def _filter(
+    filename: Path,
+    engine: str,
+    output_dir: Optional[PathLike],
+    tilt_range: Optional[Tuple[float, float]],
+    mean_range: Optional[Tuple[float, float]],
+    renumber: bool,
+) -> Tuple[Path, int, int]:
+    df = read(filename, engine=engine, compact=True)
+    keep = pd.Series(True, index=df.index)
+    for column, value_range in (
+        ('TiltAngle', tilt_range), ('MinMaxMean_mean', mean_range)
+    ):
+        if value_range is None or column not in df:
+            continue
+        # sections without a value are kept
+        keep &= df[column].between(*value_range) | df[column].isna()
+    filtered = df[keep].reset_index(drop=True)
+    if renumber and 'ZValue' in filtered:
+        # only [ZValue] sections, [MontSection] and [FrameSet] keep their numbers
+        is_z_section = filtered['ZValue'].notna()
+        filtered.loc[is_z_section, 'ZValue'] = range(is_z_section.sum())
+    out = filename if output_dir is None else Path(output_dir) / filename.name
+    _write_atomic(filtered, out)
+    return out, len(filtered), len(df)
+
+
+def _write_atomic(df: pd.DataFrame, out: Path) -> None:
+    """Write an mdoc file through a temporary file, so a crash leaves it intact."""
+    fd, tmp = tempfile.mkstemp(dir=out.parent, suffix='.tmp')
+    os.close(fd)
+    try:
+        write(df, tmp)
+        if out.exists():
+            shutil.copymode(out, tmp)
+        os.replace(tmp, out)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _describe_problem(problem: Problem) -> str:
+    if problem.line is None:
+        return problem.message
+    if problem.key is None:
+        return f'line {problem.line}: {problem.message}: {problem.value!r}'
+    return (
+        f'line {problem.line}: {problem.key} = {problem.value!r}: '
+        f'expected {problem.expected}, {problem.message}'
+    )
+
+
+def _report_error(filename: Path, error: str) -> None:
+    print(f'mdocfile: {filename}: {error}', file=sys.stderr)
+
+
+def _find_files(paths: Sequence[str]) -> Tuple[List[Path], int]:
+    """Existing mdoc files matching the command line paths and the number missing."""
+    filenames = []
+    n_missing = 0
+    for path in paths:
+        for filename in find_mdoc_files(path):
+            if filename.is_file():
+                filenames.append(filename)
+            else:
+                _report_error(filename, 'no such file')
+                n_missing += 1
+    return filenames, n_missing
+
+
+def _run_summary(args: argparse.Namespace, filenames: List[Path]) -> int:
+    failed = 0
+    print('\t'.join(SUMMARY_COLUMNS), flush=True)
+    summarize = functools.partial(_summarize, engine=args.engine)
+    for filename, summary, error in _map_files(summarize, filenames, args.jobs):
+        if error is not None:
+            _report_error(filename, error)
+            failed += 1
+            continue
+        print(
+            '\t'.join(_format_value(summary[column]) for column in SUMMARY_COLUMNS),
+            flush=True,
+        )
+    return failed
+
+
+def _run_convert(args: argparse.Namespace, filenames: List[Path]) -> int:
+    if args.output_dir is not None:
+        Path(args.output_dir).mkdir(parents=True, exist_ok=True)
+    convert = _to_csv if args.command == 'to-csv' else _to_json
+    convert = functools.partial(
+        convert, engine=args.engine, output_dir=args.output_dir
+    )
+    failed = 0
+    for filename, out, error in _map_files(convert, filenames, args.jobs):
+        if error is not None:
+            _report_error(filename, error)
+            failed += 1
+            continue
+        print(out, flush=True)
+    return failed
+
+
+def _run_to_parquet(args: argparse.Namespace, filenames: List[Path]) -> int:
+    from mdocfile.parquet import to_parquet
+
+    read_errors = to_parquet(
+        filenames,
+        args.output,
+        partition_cols=args.partition_cols,
+        workers=args.jobs,
+        executor='thread' if args.jobs == 1 else 'process',
+    )
+    for filename, error in read_errors.items():
+        _report_error(filename, ' '.join(error.split()))
+    print(args.output, flush=True)
+    return len(read_errors)
+
+
+def _run_filter(args: argparse.Namespace, filenames: List[Path]) -> int:
+    if args.output_dir is not None:
+        Path(args.output_dir).mkdir(parents=True, exist_ok=True)
+    filter_file = functools.partial(
+        _filter,
+        engine=args.engine,
+        output_dir=args.output_dir,
+        tilt_range=args.tilt_range,
+        mean_range=args.mean_range,
+        renumber=args.renumber,
+    )
+    failed = 0
+    for filename, result, error in _map_files(filter_file, filenames, args.jobs):
+        if error is not None:
+            _report_error(filename, error)
+            failed += 1
+            continue
+        out, n_kept, n_sections = result
+        print(f'{out}\t{n_kept}/{n_sections} sections kept', flush=True)
+    return failed
+
+
+def _run_validate(args: argparse.Namespace, filenames: List[Path]) -> int:
+    failed = 0
+    for filename, result, error in _map_files(check_file, filenames, args.jobs):
+        if error is None and result[1]:
+            error = '; '.join(_describe_problem(problem) for problem in result[1])
+        if error is not None:
+            print(f'{filename}\tINVALID\t{error}', flush=True)
+            failed += 1
+            continue
+        n_sections = result[0]
+        print(f'{filename}\tOK\t{n_sections} sections', flush=True)
+    return failed
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'must be a positive integer, got {value}')
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Argument parser of the `mdocfile` command."""
+    parser = argparse.ArgumentParser(
+        prog='mdocfile', description='Inspect and convert SerialEM mdoc files.'
+    )
+    parser.add_argument(
+        '-v', '--verbose', action='store_true',
+        help='log warnings about aliases and unknown fields',
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        'paths', nargs='+',
+        help='mdoc files, directories containing mdoc files or glob patterns',
+    )
+    common.add_argument(
+        '-j', '--jobs', type=_positive_int, default=1,
+        help='number of files processed in parallel (default: 1)',
+    )
+    common.add_argument(
+        '--engine', choices=ENGINES, default='pydantic', help='parsing engine'
+    )
+    output_dir = argparse.ArgumentParser(add_help=False)
+    output_dir.add_argument(
+        '-o', '--output-dir',
+        help='directory for output files (default: next to each input file)',
+    )
+
+    subparsers.add_parser(
+        'summary', parents=[common],
+        help='print one line of key statistics per file',
+    )
+    subparsers.add_parser(
+        'to-csv', parents=[common, output_dir],
+        help='convert each file to a CSV file with compact columns',
+    )
+    subparsers.add_parser(
+        'to-json', parents=[common, output_dir],
+        help='convert each file to a JSON file with one record per section',
+    )
+    to_parquet = subparsers.add_parser(
+        'to-parquet', parents=[common],
+        help='convert all files into one parquet dataset',
+    )
+    to_parquet.add_argument(
+        '-o', '--output', required=True, help='directory of the parquet dataset'
+    )
+    to_parquet.add_argument(
+        '--partition-cols', nargs='+', help='columns to partition the dataset by'
+    )
+    filter_parser = subparsers.add_parser(
+        'filter', parents=[common],
+        help='drop sections outside of value ranges and rewrite files',
+    )
+    filter_parser.add_argument(
+        '--tilt-range', nargs=2, type=float, metavar=('MIN', 'MAX'),
+        help='keep sections with a tilt angle in this range',
+    )
+    filter_parser.add_argument(
+        '--mean-range', nargs=2, type=float, metavar=('MIN', 'MAX'),
+        help='keep sections with a MinMaxMean mean in this range',
+    )
+    filter_parser.add_argument(
+        '--renumber', action='store_true',
+        help='renumber ZValue of the kept sections from 0',
+    )
+    destination = filter_parser.add_mutually_exclusive_group(required=True)
+    destination.add_argument(
+        '-o', '--output-dir', help='directory for the filtered files'
+    )
+    destination.add_argument(
+        '--in-place', action='store_true', help='overwrite the input files'
+    )
+    subparsers.add_parser(
+        'validate', parents=[common],
+        help='check every value and report problems or the number of sections',
+    )
+    return parser
+
+
+COMMANDS = {
+    'summary': _run_summary,
+    'to-csv': _run_convert,
+    'to-json': _run_convert,
+    'to-parquet': _run_to_parquet,
+    'filter': _run_filter,
+    'validate': _run_validate,
+}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the `mdocfile` command, returning the exit status.
+
+    The exit status is 1 if any file could not be found or processed.
+    """
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(format='%(name)s: %(message)s')
+    level = log.level
+    log.setLevel(logging.WARNING if args.verbose else logging.ERROR)
+    try:
+        filenames, n_missing = _find_files(args.paths)
+        failed = COMMANDS[args.command](args, filenames)
+    finally:
+        log.setLevel(level)
+    return 1 if failed or n_missing else 0
@@ -0,0 +1,268 @@
+"""Columnar parsing of mdoc files without per-section pydantic models.
+
+Lines are tokenized straight into per-key column lists which are then converted
+to typed columns in bulk, using the field annotations of the data models only
+as a schema. The resulting dataframe is identical to
+``Mdoc.from_lines(lines).to_dataframe()``.
+"""
+import itertools
+import logging
+from collections import Counter
+from os import PathLike
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from mdocfile import profiling
+from mdocfile.converters import ConversionError
+from mdocfile.data_models import GLOBAL_FIELD_TABLE, SECTION_FIELD_TABLE, Mdoc
+from mdocfile.profiling import timed
+from mdocfile.utils import (
+    TITLE_PREFIX,
+    Buffer,
+    open_buffer,
+    scan_boundaries,
+    split_lines,
+)
+
+log = logging.getLogger('mdocfile')
+
+GLOBAL_SCHEMA = GLOBAL_FIELD_TABLE.converters
+SECTION_SCHEMA = SECTION_FIELD_TABLE.converters
+SECTION_ALIASES = SECTION_FIELD_TABLE.aliases
+
+
+def _parse_section_line(line: str, data: Dict[str, str]) -> None:
+    line = line.strip().strip('[]')
+    if not line or '=' not in line:
+        return
+    k, v = line.split('=', 1)
+    data[k.strip()] = v.strip()
+
+
+def parse_header_lines(lines: Iterable[str]) -> Tuple[List[str], Dict[str, str]]:
+    """Split mdoc header lines into titles and raw global key value pairs."""
+    titles = []
+    global_data = {}
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith(TITLE_PREFIX):
+            titles.append(line)
+            continue
+        if '=' not in line:
+            continue
+        k, v = line.split('=', 1)
+        global_data[k.strip()] = v.strip()
+    return titles, global_data
+
+
+def parse_section_lines(lines: Iterable[str]) -> Dict[str, str]:
+    """Parse the lines of one section into raw key value pairs."""
+    data: Dict[str, str] = {}
+    for line in lines:
+        _parse_section_line(line, data)
+    return data
+
+
+def sections_to_columns(
+    sections: List[Dict[str, str]]
+) -> Dict[str, List[Optional[str]]]:
+    """Transpose raw section key value pairs into per-key columns."""
+    keys = dict.fromkeys(itertools.chain.from_iterable(sections))
+    return {k: [section.get(k) for section in sections] for k in keys}
+
+
+def convert_section(section: Dict[str, str]) -> Dict[str, Any]:
+    """Convert raw section key value pairs to typed values, keeping extra fields."""
+    data = {}
+    for k, v in section.items():
+        converter = SECTION_SCHEMA.get(SECTION_ALIASES.get(k, k))
+        data[k] = v if converter is None else converter(v)
+    return data
+
+
+def tokenize(
+    buffer: Buffer
+) -> Tuple[List[str], Dict[str, str], Dict[str, List[Optional[str]]], int]:
+    """Tokenize mdoc data into titles, global data and per-key section columns.
+
+    `buffer` is text or raw bytes, e.g. a memory mapped file, sections are
+    decoded one at a time.
+
+    Returns
+    -------
+    titles : List[str]
+        title entries from the file header
+    global_data : Dict[str, str]
+        raw key value pairs from the file header
+    columns : Dict[str, List[Optional[str]]]
+        raw section values per key, None where a key is absent in a section
+    n_sections : int
+        number of sections in the file
+    """
+    with timed('find_sections'):
+        boundaries = scan_boundaries(buffer)
+
+    with timed('split_lines'):
+        titles, global_data = parse_header_lines(
+            split_lines(buffer, *boundaries.header)
+        )
+        sections = [
+            parse_section_lines(split_lines(buffer, start, end))
+            for _, start, end in boundaries.sections
+        ]
+    return titles, global_data, sections_to_columns(sections), len(sections)
+
+
+def _convert_column(converter: Callable, column: List[Optional[str]]) -> list:
+    if None in column:
+        return [None if v is None else converter(v) for v in column]
+    return list(map(converter, column))
+
+
+def _is_null(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def columns_to_dataframe(
+    titles: List[str],
+    global_data: Dict[str, str],
+    columns: Dict[str, List[Optional[str]]],
+    n_sections: int,
+    usecols: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """Convert tokenized mdoc data to a dataframe matching Mdoc.to_dataframe().
+
+    If `usecols` is given only those columns are converted and returned,
+    in the given order, columns absent from the data are omitted.
+    """
+    wanted = None if usecols is None else set(usecols)
+    used_aliases = {}
+    for alias, field_name in SECTION_ALIASES.items():
+        if alias in columns:
+            aliased = columns.pop(alias)
+            canonical = columns.get(field_name, [None] * n_sections)
+            columns[field_name] = [
+                a if a is not None else c for a, c in zip(aliased, canonical)
+            ]
+            used_aliases[field_name] = alias
+            log.warning(f"'{alias}' mapped to '{field_name}'")
+
+    with timed('validation'):
+        data = {}
+        for field_name, converter in SECTION_SCHEMA.items():
+            column = columns.pop(field_name, None)
+            key = used_aliases.get(field_name, field_name)
+            if wanted is not None and key not in wanted:
+                continue
+            if column is None:
+                data[key] = [None] * n_sections
+            else:
+                data[key] = _convert_column(converter, column)
+        extra_fields = set(columns.keys())
+        data.update(
+            (k, column) for k, column in columns.items()
+            if wanted is None or k in wanted
+        )
+
+        global_values = {
+            k: GLOBAL_SCHEMA[k](v) if k in GLOBAL_SCHEMA else v
+            for k, v in global_data.items()
+        }
+    extra_fields.update(k for k in global_values if k not in GLOBAL_SCHEMA)
+    if extra_fields:
+        log.warning(f"Unknown fields will be preserved: {extra_fields}")
+    for k in GLOBAL_SCHEMA:
+        data[k] = [global_values.get(k)] * n_sections
+    for k, v in global_values.items():
+        if k not in GLOBAL_SCHEMA:
+            data[k] = [v] * n_sections
+    data['titles'] = [titles] * n_sections
+
+    data = {
+        k: column for k, column in data.items()
+        if (wanted is None or k in wanted) and not all(_is_null(v) for v in column)
+    }
+    if usecols is not None:
+        data = {k: data[k] for k in usecols if k in data}
+    with timed('dataframe'):
+        df = pd.DataFrame(data)
+    df.attrs['global_extra_fields'] = [
+        k for k in global_values if k not in GLOBAL_SCHEMA
+    ]
+    return df
+
+
+def select_columns(df: pd.DataFrame, usecols: Sequence[str]) -> pd.DataFrame:
+    """Select columns in the given order, omitting those absent from df."""
+    return df[[k for k in usecols if k in df.columns]]
+
+
+def _count_fields(columns: Dict[str, List[Optional[str]]]) -> Counter:
+    return Counter({
+        k: sum(v is not None for v in column) for k, column in columns.items()
+    })
+
+
+def _record_counts(counts: Counter, n_sections: int) -> None:
+    unknown = Counter({
+        k: n for k, n in counts.items()
+        if k not in SECTION_SCHEMA and k not in SECTION_ALIASES
+    })
+    aliases = Counter({k: n for k, n in counts.items() if k in SECTION_ALIASES})
+    profiling.record_file(
+        n_sections=n_sections,
+        n_fields=sum(counts.values()),
+        unknown_fields=unknown.elements(),
+        aliases=aliases.elements(),
+    )
+
+
+def read_buffer(
+    buffer: Buffer, usecols: Optional[Sequence[str]] = None
+) -> pd.DataFrame:
+    """Parse mdoc text or bytes into a dataframe without building pydantic models.
+
+    Falls back to ``Mdoc.from_buffer(...).to_dataframe()`` for inputs the fast
+    path cannot handle, so errors and edge cases behave exactly as before.
+    """
+    try:
+        titles, global_data, columns, n_sections = tokenize(buffer)
+        if n_sections == 0:
+            raise ConversionError('no sections found')
+        counts = _count_fields(columns) if profiling.enabled() else None
+        df = columns_to_dataframe(
+            titles, global_data, columns, n_sections, usecols=usecols
+        )
+        if counts is not None:
+            _record_counts(counts, n_sections)
+        return df
+    except (ValueError, TypeError, KeyError, IndexError):
+        df = Mdoc.from_buffer(buffer).to_dataframe()
+        return df if usecols is None else select_columns(df, usecols)
+
+
+def read_string(
+    string: str, usecols: Optional[Sequence[str]] = None
+) -> pd.DataFrame:
+    """Parse mdoc text into a dataframe without building pydantic models."""
+    return read_buffer(string, usecols=usecols)
+
+
+def read_file(
+    filename: PathLike,
+    usecols: Optional[Sequence[str]] = None,
+    mmap: bool = False,
+) -> pd.DataFrame:
+    """Read an mdoc file into a dataframe using the columnar parser.
+
+    If mmap, the file is memory mapped rather than read into memory.
+    """
+    if mmap:
+        with open_buffer(filename, use_mmap=True) as buffer:
+            return read_buffer(buffer, usecols=usecols)
+    with timed('io'), open(filename, 'rb') as file:
+        buffer = file.read()
+    return read_buffer(buffer, usecols=usecols)
@@ -0,0 +1,268 @@
+"""Memory-compact dataframe layout and its exact inverse.
+
+In the compact layout tuple fields are split into one numeric column per
+element, e.g. 'StagePosition' becomes 'StagePosition_x' and 'StagePosition_y',
+and values which repeat across rows (global data, titles and paths) are stored
+as categoricals. `expand_dataframe()` restores the layout of `Mdoc.to_dataframe()`.
+"""
+import functools
+from pathlib import Path, PurePath, PureWindowsPath
+from typing import (
+    Any,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+    get_args,
+    get_origin,
+)
+
+import pandas as pd
+
+from mdocfile.data_models import MdocGlobalData, MdocSectionData
+from mdocfile.utils import is_missing
+
+DEFAULT_COMPONENT_NAMES = ('x', 'y', 'z')
+COMPONENT_NAMES = {
+    'MinMaxMean': ('min', 'max', 'mean'),
+    'FilterSlitAndLoss': ('slit', 'loss'),
+}
+TITLE_SEPARATOR = '\n'
+GLOBAL_PREFIX = 'global_'
+FRAME_DOSES_FIELD = 'FrameDosesAndNumbers'
+
+
+def _tuple_layout(annotation: Any) -> Union[Tuple[List[type], int], None]:
+    """Element types and minimum length of a (union of) tuple annotation."""
+    args = [arg for arg in get_args(annotation) if arg is not type(None)]
+    options = []
+    for arg in args:
+        if get_origin(arg) is Union:
+            options.extend(get_args(arg))
+        else:
+            options.append(arg)
+    if not options or any(get_origin(option) is not tuple for option in options):
+        return None
+    longest = max(options, key=lambda option: len(get_args(option)))
+    min_length = min(len(get_args(option)) for option in options)
+    return list(get_args(longest)), min_length
+
+
+def _path_type(annotation: Any) -> Union[Type, None]:
+    args = [arg for arg in get_args(annotation) if arg is not type(None)]
+    if args and set(args) <= {Path, PureWindowsPath}:
+        return args[0]
+    return None
+
+
+def _compile_layouts(*models):
+    tuples: Dict[str, Tuple[List[str], List[type], int]] = {}
+    paths: Dict[str, Type] = {}
+    for model in models:
+        for name, info in model.model_fields.items():
+            layout = _tuple_layout(info.annotation)
+            if layout is not None:
+                element_types, min_length = layout
+                suffixes = COMPONENT_NAMES.get(name, DEFAULT_COMPONENT_NAMES)
+                columns = [f'{name}_{suffix}' for suffix in suffixes]
+                columns = columns[:len(element_types)]
+                tuples[name] = (columns, element_types, min_length)
+            path_type = _path_type(info.annotation)
+            if path_type is not None:
+                paths[name] = path_type
+    return tuples, paths
+
+
+TUPLE_FIELDS, PATH_FIELDS = _compile_layouts(MdocSectionData, MdocGlobalData)
+
+
+class FlatColumn(NamedTuple):
+    """A column of the flat layout of a data model, used by index and parquet.
+
+    `value_type` is the scalar type of the column, `PurePath` for path fields
+    and `list` for 'FrameDosesAndNumbers'. `element` is the tuple element of
+    split tuple fields and None for other fields.
+    """
+
+    name: str
+    field: str
+    value_type: type
+    element: Optional[int] = None
+
+
+@functools.lru_cache(maxsize=None)
+def flat_columns(model) -> Tuple[FlatColumn, ...]:
+    """Columns of a data model with tuple fields split per element."""
+    columns = []
+    for name, info in model.model_fields.items():
+        if name in TUPLE_FIELDS:
+            split_columns, element_types, _ = TUPLE_FIELDS[name]
+            columns.extend(
+                FlatColumn(column, name, element_type, idx)
+                for idx, (column, element_type)
+                in enumerate(zip(split_columns, element_types))
+            )
+        elif name in PATH_FIELDS:
+            columns.append(FlatColumn(name, name, PurePath))
+        elif name == FRAME_DOSES_FIELD:
+            columns.append(FlatColumn(name, name, list))
+        else:
+            scalar = next(a for a in get_args(info.annotation) if a is not type(None))
+            columns.append(FlatColumn(name, name, scalar))
+    return tuple(columns)
+
+
+def flat_values(column: FlatColumn, values: Sequence[Any]) -> list:
+    """Values of a flat column from the values of its field.
+
+    Tuple elements are picked, paths converted to strings and frame doses kept
+    as (dose, frames) pairs, missing values are None.
+    """
+    if column.element is not None:
+        idx = column.element
+        return [None if v is None or idx >= len(v) else v[idx] for v in values]
+    if column.value_type is PurePath:
+        return [None if v is None else str(v) for v in values]
+    return list(values)
+
+
+def _split_tuples(
+    values: list,
+    index: pd.Index,
+    columns: List[str],
+    element_types: List[type],
+    min_length: int,
+) -> Dict[str, pd.Series]:
+    split = {}
+    for idx, (column, element_type) in enumerate(zip(columns, element_types)):
+        elements = [
+            None if is_missing(value) or idx >= len(value) else value[idx]
+            for value in values
+        ]
+        if idx >= min_length and all(element is None for element in elements):
+            break
+        if element_type is int:
+            dtype = 'Int64' if None in elements else 'int64'
+        else:
+            dtype = 'float64'
+        split[column] = pd.Series(elements, index=index, dtype=dtype)
+    return split
+
+
+def join_tuples(
+    split: List[list], element_types: List[type], min_length: int
+) -> list:
+    """Join per-element lists of a split tuple field back into tuples."""
+    values = []
+    for elements in zip(*split):
+        present = [
+            not (element is pd.NA or is_missing(element)) for element in elements
+        ]
+        if not any(present):
+            values.append(None)
+            continue
+        length = len(elements)
+        while length > min_length and not present[length - 1]:
+            length -= 1
+        values.append(tuple(
+            element_type(element)
+            for element_type, element in zip(element_types, elements[:length])
+        ))
+    return values
+
+
+def compact_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert a dataframe from `Mdoc.to_dataframe()` to the compact layout.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        dataframe as returned by `mdocfile.read()`
+
+    Returns
+    -------
+    df : pd.DataFrame
+        dataframe with tuple fields split into numeric columns and repeated
+        values stored as categoricals
+    """
+    repeated = set(MdocGlobalData.model_fields) | set(
+        df.attrs.get('global_extra_fields', [])
+    )
+    data: Dict[str, Any] = {}
+    for column in df.columns:
+        values = df[column].tolist()
+        if column in TUPLE_FIELDS:
+            data.update(_split_tuples(values, df.index, *TUPLE_FIELDS[column]))
+        elif column == 'titles':
+            data[column] = pd.Categorical(
+                [TITLE_SEPARATOR.join(titles) for titles in values]
+            )
+        elif column in PATH_FIELDS:
+            data[column] = pd.Categorical(
+                [None if is_missing(value) else str(value) for value in values]
+            )
+        elif column in repeated:
+            data[column] = df[column].astype('category').array
+        else:
+            data[column] = df[column].array
+    result = pd.DataFrame(data, index=df.index)
+    result.attrs = dict(df.attrs)
+    return result
+
+
+def expand_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """Restore the layout of `Mdoc.to_dataframe()` from the compact layout.
+
+    Dataframes which are not in the compact layout are returned unchanged.
+    """
+    split_columns = {
+        columns[0]: name for name, (columns, _, _) in TUPLE_FIELDS.items()
+        if columns[0] in df.columns and name not in df.columns
+    }
+    categorical = [
+        column for column in df.columns
+        if isinstance(df[column].dtype, pd.CategoricalDtype)
+    ]
+    if not split_columns and not categorical:
+        return df
+
+    data: Dict[str, Any] = {}
+    consumed = set()
+    for column in df.columns:
+        if column in consumed:
+            continue
+        if column in split_columns:
+            name = split_columns[column]
+            columns, element_types, min_length = TUPLE_FIELDS[name]
+            columns = [c for c in columns if c in df.columns]
+            consumed.update(columns)
+            split = [df[c].astype(object).tolist() for c in columns]
+            data[name] = join_tuples(split, element_types, min_length)
+            continue
+        if column not in categorical:
+            data[column] = df[column].array
+            continue
+        values = df[column].astype(object).tolist()
+        if column == 'titles':
+            data[column] = [
+                [] if value == '' else value.split(TITLE_SEPARATOR)
+                for value in values
+            ]
+        elif column in PATH_FIELDS:
+            path_type = PATH_FIELDS[column]
+            data[column] = [
+                None if is_missing(value) else path_type(value) for value in values
+            ]
+        else:
+            data[column] = values
+    result = pd.DataFrame(
+        {k: pd.Series(v, index=df.index) if isinstance(v, list) else v
+         for k, v in data.items()},
+        index=df.index,
+    )
+    result.attrs = dict(df.attrs)
+    return result
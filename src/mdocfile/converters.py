@@ -0,0 +1,183 @@
+"""Converters from raw mdoc string values to validated field values.
+
+Converters are compiled once from the field annotations of the data models and
+produce the same values as pydantic validation. They raise on any value they
+cannot convert, callers fall back to pydantic for those.
+"""
+import collections.abc
+from pathlib import Path, PureWindowsPath
+from typing import Any, Callable, Dict, List, Tuple, Union, get_args, get_origin
+
+_BOOL_STRINGS = {
+    '0': False, 'off': False, 'f': False, 'false': False, 'n': False, 'no': False,
+    '1': True, 'on': True, 't': True, 'true': True, 'y': True, 'yes': True,
+}
+
+
+class ConversionError(ValueError):
+    """Raised when a value cannot be converted on the fast path."""
+
+
+def _to_int(value: str) -> int:
+    if not value.isascii():
+        raise ConversionError(f'non-ascii number {value!r}')
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    # like pydantic, accept a fraction of zeros, e.g. '1.0', but not '2.' or '1e3'
+    integer, point, fraction = value.strip().partition('.')
+    if not point or not fraction or fraction.strip('0'):
+        raise ConversionError(f'not an integer {value!r}')
+    return int(integer)
+
+
+def _to_float(value: str) -> float:
+    if not value.isascii():
+        raise ConversionError(f'non-ascii number {value!r}')
+    return float(value)
+
+
+def _to_bool(value: str) -> bool:
+    return _BOOL_STRINGS[value.lower()]
+
+
+def _to_str(value: str) -> str:
+    return value
+
+
+def _tuple_converter(element_converters: Tuple[Callable, ...]) -> Callable:
+    n_elements = len(element_converters)
+    if set(element_converters) == {_to_float}:
+        def convert(value: str) -> tuple:
+            parts = value.split()
+            if len(parts) != n_elements or not value.isascii():
+                raise ConversionError(f'expected {n_elements} numbers, got {value!r}')
+            return tuple(map(float, parts))
+        return convert
+    if len(set(element_converters)) == 1:
+        element_converter = element_converters[0]
+
+        def convert(value: str) -> tuple:
+            parts = value.split()
+            if len(parts) != n_elements:
+                raise ConversionError(
+                    f'expected {n_elements} elements, got {len(parts)}'
+                )
+            return tuple(map(element_converter, parts))
+        return convert
+
+    def convert(value: str) -> tuple:
+        parts = value.split()
+        if len(parts) != n_elements:
+            raise ConversionError(f'expected {n_elements} elements, got {len(parts)}')
+        return tuple(f(part) for f, part in zip(element_converters, parts))
+    return convert
+
+
+def _union_converter(options: Tuple[Callable, ...]) -> Callable:
+    def convert(value: str) -> Any:
+        for option in options:
+            try:
+                return option(value)
+            except (ValueError, TypeError, KeyError):
+                continue
+        raise ConversionError(f'no union member matched {value!r}')
+    return convert
+
+
+def _frame_doses_and_numbers(value: str) -> List[Tuple[float, int]]:
+    parts = value.split()
+    return [(float(parts[i]), int(parts[i + 1])) for i in range(0, len(parts) - 1, 2)]
+
+
+_SCALAR_CONVERTERS = {
+    int: _to_int,
+    float: _to_float,
+    bool: _to_bool,
+    str: _to_str,
+    Path: Path,
+    PureWindowsPath: PureWindowsPath,
+}
+
+
+def compile_converter(annotation: Any) -> Callable[[str], Any]:
+    """Derive a converter from a raw string value for a field annotation."""
+    if annotation in _SCALAR_CONVERTERS:
+        return _SCALAR_CONVERTERS[annotation]
+    origin, args = get_origin(annotation), get_args(annotation)
+    if origin is Union:
+        options = tuple(
+            compile_converter(arg) for arg in args if arg is not type(None)
+        )
+        return options[0] if len(options) == 1 else _union_converter(options)
+    if origin is tuple and Ellipsis not in args:
+        return _tuple_converter(tuple(compile_converter(arg) for arg in args))
+    if origin is collections.abc.Sequence and args == (Tuple[float, int],):
+        return _frame_doses_and_numbers
+    raise TypeError(f'no fast converter for {annotation}')
+
+
+def compile_schema(model) -> Dict[str, Callable[[str], Any]]:
+    """Derive a {field name: converter} table from a pydantic model."""
+    return {
+        name: compile_converter(info.annotation)
+        for name, info in model.model_fields.items()
+    }
+
+
+def compile_aliases(model) -> Dict[str, str]:
+    """Map validation aliases of a pydantic model onto field names."""
+    return {
+        info.validation_alias: name
+        for name, info in model.model_fields.items()
+        if isinstance(info.validation_alias, str)
+    }
+
+
+class FieldTable:
+    """Precompiled converters, aliases and defaults of a pydantic model.
+
+    `validate()` builds model instances from raw string values without running
+    pydantic validation, at a cost proportional to the number of keys present.
+
+    Parameters
+    ----------
+    model : Type[BaseModel]
+        pydantic model with optional fields, extra fields are allowed
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.converters = compile_schema(model)
+        self.aliases = compile_aliases(model)
+        self.defaults = {
+            name: info.get_default(call_default_factory=True)
+            for name, info in model.model_fields.items()
+        }
+
+    def validate(self, data: Dict[str, str]):
+        """Model instance from raw string values keyed on field name.
+
+        Falls back to pydantic validation if any value cannot be converted, so
+        malformed values raise the usual validation errors.
+        """
+        fields = self.defaults.copy()
+        extra = {}
+        converters = self.converters
+        try:
+            for k, v in data.items():
+                converter = converters.get(k)
+                if converter is None:
+                    extra[k] = v
+                else:
+                    fields[k] = converter(v)
+        except (ValueError, TypeError, KeyError):
+            return self.model(**data)
+        inst = self.model.__new__(self.model)
+        object.__setattr__(inst, '__dict__', fields)
+        object.__setattr__(inst, '__pydantic_fields_set__', set(data))
+        object.__setattr__(inst, '__pydantic_extra__', extra)
+        object.__setattr__(inst, '__pydantic_private__', None)
+        inst.model_post_init(None)  # initialises private attributes
+        return inst
@@ -1,10 +1,38 @@
+import collections.abc
+import io
 import logging
-import pandas as pd
-from pydantic import field_validator, BaseModel, ConfigDict, Field, PrivateAttr
 from pathlib import Path, PureWindowsPath
-from typing import List, Optional, Set, Tuple, Union, Sequence
-
-from mdocfile.utils import find_section_entries, find_title_entries
+from typing import IO, TYPE_CHECKING, List, Optional, Sequence, Tuple, Union
+
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    PrivateAttr,
+    field_serializer,
+    field_validator,
+)
+
+from mdocfile import profiling
+from mdocfile.converters import FieldTable
+from mdocfile.profiling import timed
+from mdocfile.section_index import SectionEntry, SectionIndex
+from mdocfile.utils import (
+    SECTION_HEADER_KEYS,
+    SECTION_PREFIXES,
+    TITLE_PREFIX,
+    Buffer,
+    decode,
+    is_missing,
+    open_buffer,
+    scan_boundaries,
+    split_lines,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from mdocfile.montage import MontageArrays
 
 log = logging.getLogger('mdocfile')
 
@@ -34,25 +62,22 @@ class MdocGlobalData(BaseModel):
 
     @classmethod
     def from_lines(cls, lines: List[str]):
-        lines = [
-            line for line in lines
-            if len(line) > 0
-        ]
-        key_value_pairs = [
-            line.split('=') for line in lines
-            if not line.startswith('[T =')
-        ]
-        key_value_pairs = [
-            (k.strip(), v.strip()) for k, v in key_value_pairs
-        ]
-        data = {k: v for k, v in key_value_pairs}
-        return cls(**data)
-    
+        data = {}
+        for line in lines:
+            line = line.strip()
+            if line.startswith(TITLE_PREFIX) or '=' not in line:
+                continue
+            k, v = line.split('=', 1)
+            data[k.strip()] = v.strip()
+        return GLOBAL_FIELD_TABLE.validate(data)
+
     @classmethod
-    def from_dataframe(cls, df: pd.DataFrame):
+    def from_dataframe(cls, df: 'pd.DataFrame'):
+        """Global data from the first row of a dataframe."""
         data = {}
-        for k in cls.model_fields.keys():
-            if k in df.columns:
+        keys = list(cls.model_fields.keys()) + df.attrs.get('global_extra_fields', [])
+        for k in keys:
+            if k in df.columns and not is_missing(df[k].iloc[0]):
                 data[k] = df[k].iloc[0]
         return cls(**data)
 
@@ -69,6 +94,16 @@ class MdocGlobalData(BaseModel):
         return '\n'.join(lines)
 
 
+def _non_section_columns(attrs: dict) -> set:
+    """Dataframe columns which do not hold section data."""
+    from mdocfile.derived import DERIVED_COLUMNS
+
+    skip = set(MdocGlobalData.model_fields.keys()) | {'titles'}
+    skip.update(DERIVED_COLUMNS)
+    skip.update(attrs.get('global_extra_fields', []))
+    return skip
+
+
 class MdocSectionData(BaseModel):
     """Data model for section data in a SerialEM mdoc file.
 
@@ -114,7 +149,8 @@ class MdocSectionData(BaseModel):
     XedgeDxyVS: Optional[Union[Tuple[float, float], Tuple[float, float, float]]] = None
     YedgeDxyVS: Optional[Union[Tuple[float, float], Tuple[float, float, float]]] = None
     StageOffsets: Optional[Tuple[float, float]] = None
-    AlignedPieceCoords: Optional[Union[Tuple[float, float], Tuple[float, float, float]]] = None
+    AlignedPieceCoords: Optional[
+        Union[Tuple[float, float], Tuple[float, float, float]]] = None
     AlignedPieceCoordsVS: Optional[
         Union[Tuple[float, float], Tuple[float, float, float]]] = None
     SubFramePath: Optional[Union[PureWindowsPath, Path]] = None
@@ -126,7 +162,8 @@ class MdocSectionData(BaseModel):
     NavigatorLabel: Optional[str] = None
     FilterSlitAndLoss: Optional[Tuple[float, float]] = None
     ChannelName: Optional[str] = None
-    MultiShotHoleAndPosition: Optional[Union[Tuple[int, int], Tuple[int, int, int]]] = None
+    MultiShotHoleAndPosition: Optional[
+        Union[Tuple[int, int], Tuple[int, int, int]]] = None
     CameraPixelSize: Optional[float] = None
     Voltage: Optional[float] = None
 
@@ -158,11 +195,14 @@ class MdocSectionData(BaseModel):
         """Parse 'dose1 num1 dose2 num2 ...' into [(dose1, num1), ...]"""
         if isinstance(value, str):
             parts = value.split()
-            return [(float(parts[i]), int(parts[i+1])) for i in range(0, len(parts)-1, 2)]
+            return [
+                (float(parts[i]), int(parts[i+1])) for i in range(0, len(parts)-1, 2)
+            ]
         return value
 
     @classmethod
-    def from_lines(cls, lines: List[str]):
+    def from_lines(cls, lines: List[str], log_aliases: bool = True):
+        """Parse the lines of a section, starting with its header line."""
         data = {}
         for line in lines:
             line = line.strip().strip('[]')
@@ -173,27 +213,51 @@ class MdocSectionData(BaseModel):
 
         # Rename aliased fields and track which were used
         used_aliases = {}
-        for field_name, field_info in cls.model_fields.items():
-            alias = field_info.validation_alias
-            if alias and alias in data:
-                data[field_name] = data.pop(alias)
-                used_aliases[field_name] = alias
+        aliases = SECTION_FIELD_TABLE.aliases
+        for alias in aliases.keys() & data.keys():
+            field_name = aliases[alias]
+            data[field_name] = data.pop(alias)
+            used_aliases[field_name] = alias
+            if log_aliases:
                 log.warning(f"'{alias}' mapped to '{field_name}'")
 
-        inst = cls(**data)
+        inst = SECTION_FIELD_TABLE.validate(data)
         inst._used_aliases = used_aliases
         return inst
-    
+
     @classmethod
-    def from_dataframe(cls, series: pd.Series):
-        skip = set(MdocGlobalData.model_fields.keys()) | {'titles'}
-        data = {k: series[k] for k in series.index if k not in skip}
-        return cls(**data)
+    def from_dataframe(cls, series: 'pd.Series'):
+        """Section data from a row of a dataframe, skipping global columns."""
+        skip = _non_section_columns(series.attrs)
+        data = {
+            k: series[k] for k in series.index
+            if k not in skip and not is_missing(series[k])
+        }
+        inst = cls(**data)
+        inst._used_aliases = cls.aliases_in(data)
+        return inst
+
+    @classmethod
+    def aliases_in(cls, keys) -> dict:
+        """Find validation aliases among keys, as {field name: alias}."""
+        return {
+            field_name: field_info.validation_alias
+            for field_name, field_info in cls.model_fields.items()
+            if field_info.validation_alias and field_info.validation_alias in keys
+        }
+
+    @property
+    def header_key(self) -> str:
+        """Key of the section header, e.g. 'MontSection' for '[MontSection = 0]'."""
+        for key in SECTION_HEADER_KEYS:
+            if getattr(self, key) is not None:
+                return key
+        return 'ZValue'
 
     def to_string(self):
         data = self.model_dump()
-        z_value = data.pop('ZValue')
-        lines = [f'[ZValue = {z_value}]']
+        header_key = self.header_key
+        lines = [f'[{header_key} = {data.pop(header_key)}]']
         for k, v in data.items():
             if v is None:
                 continue
@@ -211,52 +275,221 @@ class MdocSectionData(BaseModel):
         return '\n'.join(lines)
 
 
+class LazySectionData(collections.abc.Sequence):
+    """Sequence of sections which are parsed and validated only when accessed.
+
+    Without an index, the file is read and its sections are located the first
+    time the sequence is used. With an index, only accessed sections are read.
+    Validated sections are cached.
+    """
+
+    def __init__(self, filename: str, index: Optional[SectionIndex] = None):
+        self._filename = filename
+        self._index = index
+        self._buffer: Optional[bytes] = None
+        self._spans: Optional[List[SectionEntry]] = (
+            None if index is None else index.entries
+        )
+        self._sections: dict = {}
+
+    def _entries(self) -> List[SectionEntry]:
+        if self._spans is None:
+            with open(self._filename, 'rb') as file:
+                self._buffer = file.read()
+            self._index = SectionIndex.from_buffer(self._buffer)
+            self._spans = self._index.entries
+        return self._spans
+
+    def lines(self, idx: int) -> List[str]:
+        """Stripped lines of a section."""
+        _, _, start, end = self._entries()[idx]
+        if self._buffer is not None:
+            return split_lines(self._buffer, start, end)
+        with open(self._filename, 'rb') as file:
+            file.seek(start)
+            buffer = file.read(end - start)
+        return split_lines(buffer, 0, len(buffer))
+
+    def find(self, number: int, kind: Optional[str] = 'ZValue') -> int:
+        """Position of the first section with a header number, see `SectionIndex`."""
+        self._entries()
+        return self._index.find(number, kind=kind)
+
+    def __len__(self) -> int:
+        """Number of sections, located on first use."""
+        return len(self._entries())
+
+    def __getitem__(self, idx):
+        """Section or list of sections, parsed on first access."""
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        idx = range(len(self))[idx]
+        if idx not in self._sections:
+            self._sections[idx] = MdocSectionData.from_lines(self.lines(idx))
+        return self._sections[idx]
+
+
 class Mdoc(BaseModel):
     titles: List[str]
     global_data: MdocGlobalData
     section_data: List[MdocSectionData]
 
+    @field_serializer('section_data', mode='wrap')
+    def _serialize_section_data(self, section_data, handler):
+        # sections of a lazily opened file are parsed before serialising
+        if isinstance(section_data, LazySectionData):
+            section_data = list(section_data)
+        return handler(section_data)
+
     @classmethod
-    def from_file(cls, filename: str):
-        with open(filename) as file:
-            return cls.from_lines(file.readlines())
-    
+    def from_file(cls, filename: str, mmap: bool = False):
+        """Read an mdoc file, optionally memory mapped.
+
+        If mmap, the file is memory mapped and sections are decoded and parsed
+        one at a time, so the file contents are never held in memory as a whole.
+        """
+        if mmap:
+            with open_buffer(filename, use_mmap=True) as buffer:
+                return cls.from_buffer(buffer)
+        with timed('io'), open(filename, 'rb') as file:
+            buffer = file.read()
+        return cls.from_buffer(buffer)
+
+    @classmethod
+    def open(
+        cls, filename: str, lazy: bool = False, cache_index: bool = False
+    ) -> 'Mdoc':
+        """Open an mdoc file, optionally parsing sections on access only.
+
+        If lazy, only the header is parsed up front and sections are parsed and
+        validated when they are accessed. If cache_index, section offsets are
+        kept in a side-car file next to the mdoc file, so lazily opened sections
+        are read without scanning the file.
+        """
+        if not lazy:
+            return cls.from_file(filename)
+        index = None
+        if cache_index:
+            index = SectionIndex.for_file(filename, cache=True)
+            with open(filename, 'rb') as file:
+                header = file.read(index.header[1])
+            header_lines = split_lines(header, 0, len(header))
+        else:
+            header_lines = []
+            prefixes = tuple(prefix.encode() for prefix in SECTION_PREFIXES)
+            with open(filename, 'rb') as file:
+                for line in file:
+                    if line.strip().startswith(prefixes):
+                        break
+                    header_lines.append(line.decode().strip())
+        titles = [line for line in header_lines if line.startswith(TITLE_PREFIX)]
+        return cls.model_construct(
+            titles=titles,
+            global_data=MdocGlobalData.from_lines(header_lines),
+            section_data=LazySectionData(filename, index=index),
+        )
+
     @classmethod
     def from_string(cls, string: str):
-        lines = string.split('\n')
+        return cls.from_buffer(string)
 
-        return cls.from_lines(lines)
-    
     @classmethod
     def from_lines(cls, file_lines: List[str]) -> 'Mdoc':
-        lines = [line.strip() for line in file_lines]
-        split_idxs = find_section_entries(lines)
-        split_idxs.append(len(lines))
-
-        header_lines = lines[0:split_idxs[0]]
-        title_idxs = find_title_entries(header_lines)
+        text = '\n'.join(line.rstrip('\r\n') for line in file_lines)
+        return cls.from_buffer(text)
 
-        titles = [header_lines[idx] for idx in title_idxs]
-        global_data = MdocGlobalData.from_lines(header_lines)
-        section_data = [
-            MdocSectionData.from_lines(lines[start_idx:end_idx])
-            for start_idx, end_idx
-            in zip(split_idxs, split_idxs[1:])
-        ]
+    @classmethod
+    def from_buffer(cls, buffer: Buffer) -> 'Mdoc':
+        """Parse mdoc data from text or raw bytes, e.g. a memory mapped file.
 
-        # Warn about extra fields
+        Sections are decoded and validated one at a time.
+        """
+        with timed('find_sections'):
+            boundaries = scan_boundaries(buffer)
+        with timed('split_lines'):
+            titles = [decode(buffer, *span).strip() for span in boundaries.titles]
+            header_lines = split_lines(buffer, *boundaries.header)
+        with timed('validation'):
+            global_data = MdocGlobalData.from_lines(header_lines)
+            section_data = [
+                MdocSectionData.from_lines(
+                    split_lines(buffer, start, end), log_aliases=False
+                )
+                for _, start, end in boundaries.sections
+            ]
+
+        # Warn about aliases and extra fields once per file
+        used_aliases = {}
+        for s in section_data:
+            used_aliases.update(s._used_aliases)
+        for field_name, alias in used_aliases.items():
+            log.warning(f"'{alias}' mapped to '{field_name}'")
         extra_fields = set(global_data.model_extra.keys())
         for s in section_data:
             extra_fields.update(s.model_extra.keys())
         if extra_fields:
             log.warning(f"Unknown fields will be preserved: {extra_fields}")
+        if profiling.enabled():
+            profiling.record_file(
+                n_sections=len(section_data),
+                n_fields=sum(len(s.model_fields_set) for s in section_data),
+                unknown_fields=[k for s in section_data for k in s.model_extra],
+                aliases=[a for s in section_data for a in s._used_aliases.values()],
+            )
 
         return cls(titles=titles, global_data=global_data, section_data=section_data)
-    
-    def to_dataframe(self) -> pd.DataFrame:
+
+    def section(
+        self, number: int, kind: Optional[str] = 'ZValue'
+    ) -> MdocSectionData:
+        """First section with a header number, e.g. 3 for '[ZValue = 3]'.
+
+        Other kinds are selected with `kind`, e.g. 'MontSection', sections of
+        any kind match if `kind` is None.
+        Sections of lazily opened files are located without validating others.
+        Raises a KeyError if there is no such section.
+        """
+        if isinstance(self.section_data, LazySectionData):
+            return self.section_data[self.section_data.find(number, kind=kind)]
+        for section in self.section_data:
+            header_key = section.header_key
+            if (kind is None or kind == header_key) and (
+                getattr(section, header_key) == number
+            ):
+                return section
+        kind = 'any kind' if kind is None else kind
+        raise KeyError(f'no section numbered {number} of {kind}')
+
+    def to_dataframe(self) -> 'pd.DataFrame':
         """
         Convert an Mdoc object to a pandas DataFrame
         """
+        with timed('dataframe'):
+            return self._to_dataframe()
+
+    def montage_arrays(self) -> 'MontageArrays':
+        """Piece metadata of a montage as NumPy arrays, see `read_montage()`."""
+        from mdocfile.montage import MONTAGE_FIELDS, montage_arrays
+
+        pieces = [s for s in self.section_data if s.header_key == 'ZValue']
+        columns = {
+            key: [getattr(s, key) for s in pieces]
+            for key, _ in MONTAGE_FIELDS.values()
+        }
+        return montage_arrays([s.ZValue for s in pieces], columns)
+
+    def derived(self) -> 'pd.DataFrame':
+        """Dataframe with derived columns, e.g. 'CumulativeDose'.
+
+        See `mdocfile.derived` for the columns which are added.
+        """
+        from mdocfile.derived import derive
+
+        return derive(self.to_dataframe())
+
+    def _to_dataframe(self) -> 'pd.DataFrame':
+        import pandas as pd
+
         # Collect used aliases across all sections
         used_aliases = {}
         for section in self.section_data:
@@ -273,24 +506,49 @@ class Mdoc(BaseModel):
             df[k] = [v] * len(df)
         df['titles'] = [self.titles] * len(df)
         df = df.dropna(axis='columns', how='all')
+        df.attrs['global_extra_fields'] = list(self.global_data.model_extra.keys())
         return df
-    
+
     @classmethod
-    def from_dataframe(cls, df: pd.DataFrame):
-        """
-        Convert a suitable pandas dataframe, e.g. as generated by the Mdoc.to_dataframe() method, to an Mdoc object
+    def from_dataframe(cls, df: 'pd.DataFrame'):
+        """Convert a suitable pandas dataframe to an Mdoc object.
+
+        e.g. as generated by the Mdoc.to_dataframe() method
         """
         global_data = MdocGlobalData.from_dataframe(df)
-        section_data = [MdocSectionData.from_dataframe(row) for idx, row in df.iterrows()]
+        skip = _non_section_columns(df.attrs)
+        section_columns = [k for k in df.columns if k not in skip]
+        section_data = [
+            MdocSectionData(**{
+                k: v for k, v in zip(section_columns, values) if not is_missing(v)
+            })
+            for values in df[section_columns].itertuples(index=False, name=None)
+        ]
+        used_aliases = MdocSectionData.aliases_in(section_columns)
+        for section in section_data:
+            section._used_aliases = dict(used_aliases)
         titles = df['titles'].iloc[0]
         return cls(titles=titles, global_data=global_data, section_data=section_data)
 
+    def write(self, file: IO[str]):
+        """Write the Mdoc data to an open file, one section at a time."""
+        file.write(self.global_data.to_string())
+        file.write('\n\n')
+        file.write('\n\n'.join(self.titles))
+        file.write('\n\n')
+        for idx, section in enumerate(self.section_data):
+            if idx > 0:
+                file.write('\n\n')
+            file.write(section.to_string())
+
     def to_string(self):
         """
         Generate the string representation of the Mdoc data
         """
-        return '\n\n'.join([
-            self.global_data.to_string(),
-            '\n\n'.join(self.titles),
-            '\n\n'.join(section.to_string() for section in self.section_data),
-        ])
+        buffer = io.StringIO()
+        self.write(buffer)
+        return buffer.getvalue()
+
+
+GLOBAL_FIELD_TABLE = FieldTable(MdocGlobalData)
+SECTION_FIELD_TABLE = FieldTable(MdocSectionData)
@@ -0,0 +1,123 @@
+"""Derived per-section quantities for dose weighting and ordering.
+
+Columns are computed for a whole dataframe at once from the parsed columns:
+
+- 'Timestamp': 'DateTime' parsed into datetimes
+- 'AcquisitionOrder': position of each section in order of acquisition, by
+  'Timestamp'. Sections without a timestamp follow, in file order.
+- 'PriorDose': dose received before each section, 'PriorRecordDose' where
+  present, otherwise the sum of 'ExposureDose' of earlier acquired sections
+- 'CumulativeDose': 'PriorDose' plus the 'ExposureDose' of the section
+- 'FrameDoses': array of the dose of each frame, from 'FrameDosesAndNumbers'
+"""
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+DERIVED_COLUMNS = (
+    'Timestamp', 'AcquisitionOrder', 'PriorDose', 'CumulativeDose', 'FrameDoses'
+)
+# SerialEM writes e.g. '30-Nov-15  15:21:38', older and newer versions vary
+DATETIME_FORMATS = ('%d-%b-%y %H:%M:%S', '%d-%b-%Y %H:%M:%S', '%Y-%m-%d %H:%M:%S')
+FRAME_DOSES_COLUMNS = ('FrameDosesAndNumbers', 'FrameDosesAndNumber')
+
+# format which parsed the last column, tried first on the next
+_datetime_format = DATETIME_FORMATS[0]
+
+
+def parse_datetimes(values: Sequence[Optional[str]]) -> pd.Series:
+    """Parse SerialEM 'DateTime' values, NaT where missing or unparseable.
+
+    The format which parsed the previous column is tried first, so columns of
+    files from the same microscope are parsed in a single vectorised pass.
+    Runs of whitespace, e.g. in '30-Nov-15  15:21:38', match a single space.
+    """
+    global _datetime_format
+    values = pd.Series(values, dtype=object)
+    n_present = values.notna().sum()
+    formats = [_datetime_format, *(
+        f for f in DATETIME_FORMATS if f != _datetime_format
+    )]
+    best = None
+    for datetime_format in formats:
+        parsed = pd.to_datetime(values, format=datetime_format, errors='coerce')
+        n_parsed = parsed.notna().sum()
+        if best is None or n_parsed > best.notna().sum():
+            best = parsed
+        if n_parsed == n_present:
+            _datetime_format = datetime_format
+            break
+    return best
+
+
+def _float_column(df: pd.DataFrame, column: str) -> np.ndarray:
+    if column not in df:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)
+
+
+def _frame_doses(values: pd.Series) -> list:
+    """Per-frame dose arrays from (dose, number of frames) pairs."""
+    pairs = [
+        value if isinstance(value, (list, tuple)) else None for value in values
+    ]
+    counts = [0 if p is None else len(p) for p in pairs]
+    flat = [pair for p in pairs if p is not None for pair in p]
+    doses = np.array([dose for dose, _ in flat], dtype=float)
+    numbers = np.array([number for _, number in flat], dtype=int)
+    frames = np.repeat(doses, numbers)
+    # index of the frame after the last pair of each section
+    pair_ends = np.cumsum(counts)
+    frame_ends = np.concatenate([[0], np.cumsum(numbers)])[pair_ends]
+    per_section = np.split(frames, frame_ends[:-1])
+    return [None if p is None else a for p, a in zip(pairs, per_section)]
+
+
+def derive(df: pd.DataFrame) -> pd.DataFrame:
+    """Add derived columns to a dataframe of one mdoc file.
+
+    Columns are computed from those present, e.g. without 'DateTime' the
+    acquisition order is the file order and without 'FrameDosesAndNumbers'
+    'FrameDoses' is omitted.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        dataframe from `read` or `Mdoc.to_dataframe`, also in compact form
+
+    Returns
+    -------
+    df : pd.DataFrame
+        copy of the dataframe with the columns in `DERIVED_COLUMNS` added
+    """
+    df = df.copy()
+    n_sections = len(df)
+    if 'DateTime' in df:
+        timestamps = parse_datetimes(df['DateTime'].to_numpy(dtype=object))
+    else:
+        timestamps = parse_datetimes([None] * n_sections)
+    df['Timestamp'] = timestamps.to_numpy()
+
+    # stable sort keeps file order for equal timestamps, NaT sorts last
+    acquired = np.argsort(timestamps.to_numpy(), kind='stable')
+    order = np.empty(n_sections, dtype=int)
+    order[acquired] = np.arange(n_sections)
+    df['AcquisitionOrder'] = order
+
+    exposure_dose = _float_column(df, 'ExposureDose')
+    dose = np.nan_to_num(exposure_dose[acquired])
+    prior_dose = np.empty(n_sections)
+    prior_dose[acquired] = np.cumsum(dose) - dose
+    if np.isnan(exposure_dose).all():
+        prior_dose[:] = np.nan
+    prior_record_dose = _float_column(df, 'PriorRecordDose')
+    prior_dose = np.where(np.isnan(prior_record_dose), prior_dose, prior_record_dose)
+    df['PriorDose'] = prior_dose
+    df['CumulativeDose'] = prior_dose + exposure_dose
+
+    for column in FRAME_DOSES_COLUMNS:
+        if column in df:
+            df['FrameDoses'] = _frame_doses(df[column])
+            break
+    return df
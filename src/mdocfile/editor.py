@@ -0,0 +1,321 @@
+"""Batch edits of mdoc files which leave untouched bytes as they are.
+
+Sections are located with a single boundary scan and never validated. Edits
+are collected and applied when the file is saved: unedited sections are
+copied verbatim and edited sections only have the affected lines replaced, so
+formatting, unknown fields and line endings are preserved. Files are replaced
+atomically.
+"""
+import logging
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from os import PathLike
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from mdocfile.section_index import SectionEntry, SectionIndex, SectionSelector, selects
+from mdocfile.utils import SECTION_HEADER_KEYS, TITLE_PREFIX, open_buffer
+
+log = logging.getLogger('mdocfile')
+
+# key -> new value, None removes the key
+KeyEdits = Dict[str, Optional[str]]
+
+
+def format_value(value: Any) -> str:
+    """Format a value as in an mdoc file, e.g. (1, 2) as '1 2'."""
+    if isinstance(value, (tuple, list)):
+        return ' '.join(str(element) for element in value)
+    return str(value)
+
+
+def _key_of(line: bytes) -> Optional[str]:
+    name, separator, _ = line.partition(b'=')
+    if not separator:
+        return None
+    return name.strip().decode()
+
+
+def _split_trailing(chunk: bytes) -> Tuple[bytes, bytes]:
+    """Split a chunk into its content and the blank lines which follow it."""
+    content = chunk.rstrip(b' \t\r\n')
+    return content, chunk[len(content):]
+
+
+def _indent(line: bytes) -> bytes:
+    return line[:len(line) - len(line.lstrip())]
+
+
+def _apply_key_edits(lines: List[bytes], edits: KeyEdits, insert_at: int) -> None:
+    """Replace and remove 'key = value' lines in place, new keys at insert_at."""
+    pending = dict(edits)
+    idx = 0
+    while idx < len(lines):
+        key = _key_of(lines[idx])
+        if key not in pending:
+            idx += 1
+            continue
+        value = pending.pop(key)
+        if value is None:
+            del lines[idx]
+            if idx < insert_at:
+                insert_at -= 1
+            continue
+        lines[idx] = _indent(lines[idx]) + f'{key} = {value}'.encode()
+        idx += 1
+    lines[insert_at:insert_at] = [
+        f'{key} = {value}'.encode()
+        for key, value in pending.items() if value is not None
+    ]
+
+
+class MdocEditor:
+    """Edit the sections and global data of an mdoc file without parsing it.
+
+    Edits are applied in one pass when `save()` is called. Methods return the
+    editor, so edits can be chained::
+
+        MdocEditor('TS_01.mrc.mdoc').delete_sections([0, 40]).renumber().save()
+
+    Sections are selected as in ``mdocfile.read(sections=...)``: numbers select
+    '[ZValue]' sections and e.g. ('MontSection', 2) other kinds, by their
+    header numbers in the original file, also after sections were deleted,
+    reordered or renumbered.
+
+    Parameters
+    ----------
+    filename : PathLike
+        SerialEM mdoc file to edit
+    """
+
+    def __init__(self, filename: PathLike):
+        self.filename = Path(filename)
+        with open_buffer(filename) as data:
+            self._data: bytes = data
+        index = SectionIndex.from_buffer(self._data)
+        self._header = index.header
+        self.entries: List[SectionEntry] = index.entries
+        self._order: List[int] = list(range(len(self.entries)))
+        self._global_edits: KeyEdits = {}
+        self._section_edits: Dict[int, KeyEdits] = {}
+        self._numbers: Dict[int, int] = {}
+        self._newline = b'\r\n' if b'\r\n' in self._data else b'\n'
+
+    @property
+    def sections(self) -> List[SectionEntry]:
+        """Entries of the sections which will be written, in output order."""
+        return [self.entries[idx] for idx in self._order]
+
+    def _positions(self, sections: Optional[SectionSelector]) -> List[int]:
+        if sections is None:
+            return list(self._order)
+        selected = selects(sections)
+        return [idx for idx in self._order if selected(self.entries[idx])]
+
+    def delete_sections(self, sections: SectionSelector) -> 'MdocEditor':
+        """Delete sections selected by header number, slice, list or predicate.
+
+        Numbers select '[ZValue]' sections, e.g. ('FrameSet', 0) other kinds.
+        """
+        deleted = set(self._positions(sections))
+        self._order = [idx for idx in self._order if idx not in deleted]
+        return self
+
+    def reorder_sections(self, numbers: Sequence[int]) -> 'MdocEditor':
+        """Reorder sections by their header numbers.
+
+        Every remaining section must be listed exactly once. Raises a
+        ValueError otherwise or if header numbers are ambiguous.
+        """
+        positions = {}
+        for idx in self._order:
+            number = self.entries[idx].number
+            if number in positions:
+                raise ValueError(f'more than one section numbered {number}')
+            positions[number] = idx
+        if sorted(numbers) != sorted(positions):
+            raise ValueError(
+                'numbers must list every remaining section exactly once'
+            )
+        self._order = [positions[number] for number in numbers]
+        return self
+
+    def renumber(self, start: int = 0) -> 'MdocEditor':
+        """Number the remaining sections of each kind consecutively."""
+        counters: Dict[str, int] = {}
+        for idx in self._order:
+            kind = self.entries[idx].kind
+            self._numbers[idx] = counters.get(kind, start)
+            counters[kind] = self._numbers[idx] + 1
+        return self
+
+    def set_global(self, key: str, value: Any) -> 'MdocEditor':
+        """Set a key of the global data, e.g. 'PixelSpacing'."""
+        self._global_edits[key] = format_value(value)
+        return self
+
+    def remove_global(self, key: str) -> 'MdocEditor':
+        """Remove a key from the global data if present."""
+        self._global_edits[key] = None
+        return self
+
+    def set_value(
+        self, key: str, value: Any, sections: Optional[SectionSelector] = None
+    ) -> 'MdocEditor':
+        """Set a key in the selected sections, all remaining if None.
+
+        Section header keys, e.g. 'ZValue', are changed with `renumber()`.
+        """
+        self._edit_sections(key, format_value(value), sections)
+        return self
+
+    def remove_key(
+        self, key: str, sections: Optional[SectionSelector] = None
+    ) -> 'MdocEditor':
+        """Remove a key from the selected sections, all remaining if None."""
+        self._edit_sections(key, None, sections)
+        return self
+
+    def _edit_sections(
+        self, key: str, value: Optional[str], sections: Optional[SectionSelector]
+    ) -> None:
+        if key in SECTION_HEADER_KEYS:
+            raise ValueError(f"'{key}' is a section header, use renumber()")
+        for idx in self._positions(sections):
+            self._section_edits.setdefault(idx, {})[key] = value
+
+    def _edit_chunk(
+        self, chunk: bytes, edit: Callable[[List[bytes]], None]
+    ) -> bytes:
+        """Edit the lines of a chunk, keeping the blank lines which follow it."""
+        content, trailing = _split_trailing(chunk)
+        lines = [line.rstrip(b'\r') for line in content.split(b'\n')]
+        edit(lines)
+        return self._newline.join(lines) + trailing
+
+    def _edit_header(self, lines: List[bytes]) -> None:
+        # new keys follow the last key before the titles
+        title_prefix = TITLE_PREFIX.encode()
+        titles = (
+            idx for idx, line in enumerate(lines)
+            if line.lstrip().startswith(title_prefix)
+        )
+        insert_at = next(titles, len(lines))
+        while insert_at > 0 and not lines[insert_at - 1].strip():
+            insert_at -= 1
+        _apply_key_edits(lines, self._global_edits, insert_at)
+
+    def _section_chunk(self, idx: int) -> bytes:
+        entry = self.entries[idx]
+        chunk = self._data[entry.start:entry.end]
+        number = self._numbers.get(idx, entry.number)
+        edits = self._section_edits.get(idx)
+        if number == entry.number and not edits:
+            return chunk
+
+        def edit(lines: List[bytes]) -> None:
+            if number != entry.number:
+                header = f'[{entry.kind} = {number}]'.encode()
+                lines[0] = _indent(lines[0]) + header
+            if edits:
+                _apply_key_edits(lines, edits, insert_at=len(lines))
+        return self._edit_chunk(chunk, edit)
+
+    def iter_chunks(self) -> Iterator[bytes]:
+        """Bytes of the edited file, unedited spans as they are in the file."""
+        header = self._data[slice(*self._header)]
+        if self._global_edits:
+            header = self._edit_chunk(header, self._edit_header)
+        yield header
+        if not self._order:
+            return
+        # moved sections are separated by a blank line, the file ends as before
+        separator = self._newline * 2
+        file_ending = _split_trailing(self._data[self.entries[-1].start:])[1]
+        for position, idx in enumerate(self._order):
+            content, trailing = _split_trailing(self._section_chunk(idx))
+            if position == len(self._order) - 1:
+                trailing = file_ending
+            elif trailing.count(b'\n') < 2:
+                trailing = separator
+            yield content + trailing
+
+    def to_bytes(self) -> bytes:
+        """Contents of the edited file."""
+        return b''.join(self.iter_chunks())
+
+    def save(self, filename: Optional[PathLike] = None) -> Path:
+        """Write the edited file atomically, by default over the original.
+
+        Returns the path of the written file.
+        """
+        path = self.filename if filename is None else Path(filename)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                for chunk in self.iter_chunks():
+                    file.write(chunk)
+            if path.exists():
+                shutil.copymode(path, tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        return path
+
+
+def edit_many(
+    paths: Union[PathLike, str, Iterable[PathLike]],
+    edit: Callable[[MdocEditor], Any],
+    workers: Optional[int] = None,
+) -> Dict[str, str]:
+    """Apply the same edits to many mdoc files concurrently and save them.
+
+    Files which fail are logged and skipped.
+
+    Parameters
+    ----------
+    paths : PathLike | str | Iterable[PathLike]
+        glob pattern, directory containing mdoc files or sequence of mdoc files
+    edit : Callable[[MdocEditor], Any]
+        function which edits the editor of one file, e.g.
+        ``lambda e: e.set_global('PixelSpacing', 1.35)``
+    workers : Optional[int]
+        maximum number of concurrent threads
+
+    Returns
+    -------
+    errors : Dict[str, str]
+        error message of each file which failed
+    """
+    from mdocfile.functions import find_mdoc_files
+
+    def edit_file(filename: Path) -> None:
+        editor = MdocEditor(filename)
+        edit(editor)
+        editor.save()
+
+    filenames = find_mdoc_files(paths)
+    errors = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(edit_file, filename) for filename in filenames]
+        for filename, future in zip(filenames, futures):
+            try:
+                future.result()
+            except Exception as e:
+                log.warning(f'Failed to edit {filename}: {e!r}')
+                errors[str(filename)] = repr(e)
+    return errors
@@ -0,0 +1,150 @@
+"""Incremental parsing of mdoc files which are still being written."""
+import asyncio
+import codecs
+import logging
+import os
+import time
+from os import PathLike
+from pathlib import Path
+from typing import AsyncIterator, Iterator, List, Optional
+
+import pandas as pd
+
+from mdocfile.data_models import Mdoc, MdocGlobalData, MdocSectionData
+from mdocfile.utils import TITLE_PREFIX, scan_boundaries, split_lines
+
+log = logging.getLogger('mdocfile')
+
+
+class MdocFollower:
+    """Follow an mdoc file as SerialEM appends sections to it.
+
+    Only bytes appended since the previous poll are read and parsed. A section
+    is complete once the header of the next section has been written, the
+    trailing section of the file is parsed when following stops.
+
+    Parameters
+    ----------
+    filename : PathLike
+        mdoc file to follow, it does not need to exist yet
+    poll_interval : float
+        seconds to wait between checks for new data when iterating
+    timeout : Optional[float]
+        stop iterating once the file has not grown for this many seconds,
+        None follows the file forever
+    """
+
+    def __init__(
+        self,
+        filename: PathLike,
+        poll_interval: float = 1.0,
+        timeout: Optional[float] = None,
+    ):
+        self.filename = Path(filename)
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self._reset()
+
+    def _reset(self) -> None:
+        self.titles: List[str] = []
+        self.global_data: Optional[MdocGlobalData] = None
+        self.section_data: List[MdocSectionData] = []
+        self._offset = 0
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._partial_line = ''
+        self._pending_lines: List[str] = []
+
+    @property
+    def mdoc(self) -> Mdoc:
+        """Mdoc containing all complete sections parsed so far."""
+        return Mdoc(
+            titles=self.titles,
+            global_data=self.global_data or MdocGlobalData(),
+            section_data=self.section_data,
+        )
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Dataframe of all complete sections parsed so far."""
+        return self.mdoc.to_dataframe()
+
+    def poll(self) -> List[MdocSectionData]:
+        """Parse data appended since the last poll.
+
+        Returns
+        -------
+        sections : List[MdocSectionData]
+            sections which were completed by the newly appended data
+        """
+        try:
+            size = os.stat(self.filename).st_size
+        except FileNotFoundError:
+            return []
+        if size < self._offset:
+            log.warning(f'{self.filename} was truncated, restarting from the start')
+            self._reset()
+        if size == self._offset:
+            return []
+        with open(self.filename, 'rb') as file:
+            file.seek(self._offset)
+            data = file.read()
+        self._offset += len(data)
+        text = self._partial_line + self._decoder.decode(data)
+        text, _, self._partial_line = text.rpartition('\n')
+
+        boundaries = scan_boundaries(text)
+        self._pending_lines.extend(split_lines(text, *boundaries.header))
+        sections = []
+        for _, start, end in boundaries.sections:
+            sections.extend(self._complete_pending())
+            self._pending_lines.extend(split_lines(text, start, end))
+        return sections
+
+    def flush(self) -> List[MdocSectionData]:
+        """Parse the trailing section, treating the file as complete."""
+        if self._partial_line:
+            self._pending_lines.append(self._partial_line.strip())
+            self._partial_line = ''
+        return self._complete_pending()
+
+    def _complete_pending(self) -> List[MdocSectionData]:
+        lines, self._pending_lines = self._pending_lines, []
+        if self.global_data is None:
+            self.titles = [line for line in lines if line.startswith(TITLE_PREFIX)]
+            self.global_data = MdocGlobalData.from_lines(lines)
+            return []
+        if not lines:
+            return []
+        section = MdocSectionData.from_lines(lines)
+        self.section_data.append(section)
+        return [section]
+
+    def __iter__(self) -> Iterator[MdocSectionData]:
+        """Poll the file, yielding sections until it stops changing."""
+        last_change = time.monotonic()
+        while True:
+            offset = self._offset
+            yield from self.poll()
+            now = time.monotonic()
+            if self._offset != offset:
+                last_change = now
+            elif self.timeout is not None and now - last_change >= self.timeout:
+                break
+            time.sleep(self.poll_interval)
+        yield from self.flush()
+
+    async def __aiter__(self) -> AsyncIterator[MdocSectionData]:
+        """Poll the file without blocking the event loop, see `__iter__`."""
+        loop = asyncio.get_running_loop()
+        last_change = loop.time()
+        while True:
+            offset = self._offset
+            for section in await asyncio.to_thread(self.poll):
+                yield section
+            now = loop.time()
+            if self._offset != offset:
+                last_change = now
+            elif self.timeout is not None and now - last_change >= self.timeout:
+                break
+            await asyncio.sleep(self.poll_interval)
+        for section in self.flush():
+            yield section
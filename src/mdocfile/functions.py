@@ -1,28 +1,135 @@
+import glob
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from os import PathLike
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Union
 
 import pandas as pd
 
+from . import columnar, derived, streaming, writer
+from .cache import MdocCache
+from .compact import compact_dataframe, expand_dataframe
 from .data_models import Mdoc
+from .interning import Interner
+from .section_index import SectionSelector, read_selected
 
+log = logging.getLogger('mdocfile')
 
-def read(filename: PathLike) -> pd.DataFrame:
+ENGINES = ('pydantic', 'fast')
+EXECUTORS = {'thread': ThreadPoolExecutor, 'process': ProcessPoolExecutor}
+IMAGE_SUFFIXES = ('.mrc', '.st', '.tif', '.tiff', '.eer')
+
+_default_cache: Optional[MdocCache] = None
+
+
+def _get_default_cache() -> MdocCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = MdocCache()
+    return _default_cache
+
+
+def read(
+    filename: PathLike,
+    engine: str = 'pydantic',
+    chunksize: Optional[int] = None,
+    cache: Union[bool, MdocCache] = False,
+    columns: Optional[Sequence[str]] = None,
+    compact: bool = False,
+    mmap: bool = False,
+    sections: Optional[SectionSelector] = None,
+    cache_index: bool = False,
+    derive: bool = False,
+) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
     """Read an mdoc file as a pandas dataframe.
 
     Parameters
     ----------
     filename : PathLike
         SerialEM mdoc file to read
+    engine : str
+        'pydantic' builds one validated model per section,
+        'fast' parses straight into columns and produces an identical dataframe
+    chunksize : Optional[int]
+        if set, stream the file and return an iterator of dataframes
+        with up to `chunksize` sections each
+    cache : Union[bool, MdocCache]
+        reuse dataframes parsed previously from the same unchanged file,
+        True uses a cache in the user cache directory
+    columns : Optional[Sequence[str]]
+        only return these columns, in this order, columns absent from the
+        file are omitted. With the 'fast' engine only these keys are converted.
+    compact : bool
+        split tuple fields into numeric columns, e.g. 'StagePosition_x' and
+        'StagePosition_y', and store repeated values as categoricals.
+        Compact dataframes can be passed to `write()` directly.
+    mmap : bool
+        memory map the file and parse sections straight from the mapping
+        rather than reading it into memory, for very large files. The result
+        is identical. Streaming with `chunksize` always maps the file.
+    sections : Optional[SectionSelector]
+        only read and validate these sections: a header number, e.g. 3 for
+        '[ZValue = 3]', a slice or list of header numbers, a (kind, numbers)
+        pair for other sections, e.g. ('MontSection', 2), or a predicate on
+        `SectionEntry`. Selected sections are returned in file order.
+    cache_index : bool
+        with `sections`, keep the section offsets in a side-car file next to
+        the mdoc file so later selections do not scan the file
+    derive : bool
+        add derived columns, e.g. 'Timestamp', 'AcquisitionOrder' and
+        'CumulativeDose', see `mdocfile.derived`. They are computed from the
+        columns which are read.
 
     Returns
     -------
     df : pd.DataFrame
         dataframe containing info from mdoc file
     """
-    return Mdoc.from_file(filename).to_dataframe()
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}, got '{engine}'")
+    if chunksize is not None:
+        if chunksize < 1:
+            raise ValueError(f'chunksize must be a positive integer, got {chunksize}')
+        if cache:
+            raise ValueError('cache cannot be combined with chunksize')
+        if sections is not None:
+            raise ValueError('sections cannot be combined with chunksize')
+        if derive:
+            raise ValueError('derive cannot be combined with chunksize')
+        chunks = streaming.read_chunks(
+            filename, chunksize=chunksize, engine=engine, columns=columns
+        )
+        return map(compact_dataframe, chunks) if compact else chunks
+    if sections is not None:
+        if cache:
+            raise ValueError('sections cannot be combined with cache')
+        buffer = read_selected(filename, sections, cache_index=cache_index)
+        if engine == 'fast':
+            df = columnar.read_buffer(buffer, usecols=columns)
+        else:
+            df = Mdoc.from_buffer(buffer).to_dataframe()
+    elif cache:
+        if not isinstance(cache, MdocCache):
+            cache = _get_default_cache()
+        df = cache.read(filename, parse=lambda f: read(f, engine=engine, mmap=mmap))
+    elif engine == 'fast':
+        df = columnar.read_file(filename, usecols=columns, mmap=mmap)
+    else:
+        df = Mdoc.from_file(filename, mmap=mmap).to_dataframe()
+    if columns is not None:
+        df = columnar.select_columns(df, columns)
+    if derive:
+        df = derived.derive(df)
+    return compact_dataframe(df) if compact else df
+
 
 def write(df: pd.DataFrame, filename: PathLike):
-    """Write a pandas dataframe to an mdoc file. 
-    Note this only works for tilt series mdoc files, not montages or frame sets.
+    """Write a pandas dataframe to an mdoc file.
+
+    Sections are written in row order with their original header kind
+    ([ZValue], [MontSection] or [FrameSet]), missing values are omitted.
+    Dataframes read with `compact=True` are expanded before writing.
 
     Parameters
     ----------
@@ -31,6 +138,112 @@ def write(df: pd.DataFrame, filename: PathLike):
     filename : PathLike
         path of file to be written
     """
-    mdoc = Mdoc.from_dataframe(df)
     with open(filename, 'w') as file:
-        file.write(mdoc.to_string())
+        writer.write_dataframe(expand_dataframe(df), file)
+
+
+def find_mdoc_files(paths: Union[PathLike, str, Iterable[PathLike]]) -> List[Path]:
+    """Expand a glob pattern, a directory or a list of paths into mdoc files.
+
+    Directories are searched for files ending in '.mdoc', glob patterns are
+    expanded in sorted order and explicit lists keep their order.
+    """
+    if isinstance(paths, (str, PathLike)):
+        path = Path(paths)
+        if path.is_dir():
+            return sorted(path.glob('*.mdoc'))
+        if glob.has_magic(str(paths)):
+            return [Path(p) for p in sorted(glob.glob(str(paths), recursive=True))]
+        return [path]
+    return [Path(p) for p in paths]
+
+
+def tilt_series_id(filename: PathLike) -> str:
+    """Derive a tilt series id from an mdoc filename.
+
+    e.g. 'TS_01.mrc.mdoc' -> 'TS_01'
+    """
+    name = Path(filename).name
+    if name.endswith('.mdoc'):
+        name = name[:-len('.mdoc')]
+    for suffix in IMAGE_SUFFIXES:
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+def _read_one(filename: Path, engine: str, derive: bool) -> pd.DataFrame:
+    df = read(filename, engine=engine, derive=derive)
+    df['source_file'] = str(filename)
+    return df
+
+
+def read_many(
+    paths: Union[PathLike, str, Iterable[PathLike]],
+    workers: Optional[int] = None,
+    executor: str = 'thread',
+    engine: str = 'pydantic',
+    add_tilt_series_id: bool = False,
+    derive: bool = False,
+    intern: Union[bool, Interner] = True,
+) -> pd.DataFrame:
+    """Read many mdoc files concurrently into a single pandas dataframe.
+
+    Rows keep the order of the input files. Files which fail to parse are
+    logged and skipped, their errors are available from
+    `df.attrs['read_errors']` as a mapping of filename to error message.
+
+    Parameters
+    ----------
+    paths : PathLike | str | Iterable[PathLike]
+        glob pattern, directory containing mdoc files or sequence of mdoc files
+    workers : Optional[int]
+        maximum number of concurrent workers, defaults to the executor default
+    executor : str
+        'thread' or 'process'
+    engine : str
+        parsing engine passed on to `read`
+    add_tilt_series_id : bool
+        whether to add a 'tilt_series_id' column derived from each filename
+    derive : bool
+        add derived columns, computed per file by the workers
+    intern : Union[bool, Interner]
+        share equal titles, paths, keys and tuple values between files to
+        reduce memory, an `Interner` also shares them with other batches
+
+    Returns
+    -------
+    df : pd.DataFrame
+        concatenated dataframe with a 'source_file' column
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(
+            f"executor must be one of {tuple(EXECUTORS)}, got '{executor}'"
+        )
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}, got '{engine}'")
+    filenames = find_mdoc_files(paths)
+
+    frames = []
+    read_errors = {}
+    with EXECUTORS[executor](max_workers=workers) as pool:
+        futures = [
+            pool.submit(_read_one, filename, engine, derive) for filename in filenames
+        ]
+        for filename, future in zip(filenames, futures):
+            try:
+                df = future.result()
+            except Exception as e:
+                log.warning(f"Failed to read {filename}: {e!r}")
+                read_errors[str(filename)] = repr(e)
+                continue
+            if add_tilt_series_id:
+                df['tilt_series_id'] = tilt_series_id(filename)
+            frames.append(df)
+
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    if intern:
+        interner = intern if isinstance(intern, Interner) else Interner()
+        interner.dataframe(df)
+    df.attrs['read_errors'] = read_errors
+    return df
@@ -0,0 +1,120 @@
+"""Lightweight reading of mdoc headers and tilt angles.
+
+Nothing in this module imports pandas or pydantic, so short-lived scripts which
+only need e.g. the pixel size or the tilt angles of a file avoid their import
+time. Values are converted to the same types as in the data models.
+"""
+import re
+from os import PathLike
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from mdocfile.converters import compile_converter
+from mdocfile.utils import SECTION_PREFIXES, TITLE_PREFIX, scan_boundaries
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# field annotations of MdocGlobalData, kept here to avoid importing pydantic
+GLOBAL_FIELD_TYPES: Dict[str, Any] = {
+    'DataMode': Optional[int],
+    'ImageSize': Optional[Tuple[int, int]],
+    'Montage': Optional[bool],
+    'ImageSeries': Optional[int],
+    'ImageFile': Optional[Path],
+    'PixelSpacing': Optional[float],
+    'Voltage': Optional[float],
+    'Version': Optional[str],
+}
+_GLOBAL_CONVERTERS = {
+    name: compile_converter(annotation)
+    for name, annotation in GLOBAL_FIELD_TYPES.items()
+}
+
+_to_tilt_angle = compile_converter(float)
+
+tilt_angle_regex = re.compile(r'^[^\S\n]*TiltAngle[^\S\n]*=(.*)$', re.MULTILINE)
+
+
+def _read_header_lines(filename: PathLike) -> List[str]:
+    """Stripped lines of an mdoc file before the first section header."""
+    header_lines = []
+    with open(filename) as file:
+        for line in file:
+            line = line.strip()
+            if line.startswith(SECTION_PREFIXES):
+                break
+            header_lines.append(line)
+    return header_lines
+
+
+def read_header(filename: PathLike) -> Dict[str, Any]:
+    """Read the global data of an mdoc file as a dictionary.
+
+    Only the lines before the first section are read. Known fields are
+    converted to the types of `MdocGlobalData`, unknown fields are kept as
+    strings.
+
+    Parameters
+    ----------
+    filename : PathLike
+        SerialEM mdoc file to read
+
+    Returns
+    -------
+    global_data : Dict[str, Any]
+        global data keyed on field name, fields which are absent are omitted
+    """
+    global_data = {}
+    for line in _read_header_lines(filename):
+        if not line or line.startswith(TITLE_PREFIX) or '=' not in line:
+            continue
+        key, value = (part.strip() for part in line.split('=', 1))
+        converter = _GLOBAL_CONVERTERS.get(key)
+        if converter is None:
+            global_data[key] = value
+            continue
+        try:
+            global_data[key] = converter(value)
+        except (ValueError, TypeError, KeyError) as e:
+            raise ValueError(f"invalid value for '{key}': {value!r}") from e
+    return global_data
+
+
+def read_titles(filename: PathLike) -> List[str]:
+    """Read the title lines of an mdoc file, e.g. '[T = SerialEM: ...]'."""
+    return [
+        line for line in _read_header_lines(filename)
+        if line.startswith(TITLE_PREFIX)
+    ]
+
+
+def read_tilt_angles(filename: PathLike) -> 'np.ndarray':
+    """Read the tilt angle of each section of an mdoc file.
+
+    Parameters
+    ----------
+    filename : PathLike
+        SerialEM mdoc file to read
+
+    Returns
+    -------
+    tilt_angles : np.ndarray
+        (n_sections, ) float array, NaN for sections without a tilt angle
+    """
+    import numpy as np  # only needed here, reading headers is stdlib only
+
+    with open(filename, 'rb') as file:
+        text = file.read().decode()
+    sections = scan_boundaries(text).sections
+    tilt_angles = np.full(len(sections), np.nan)
+    for idx, (_, start, end) in enumerate(sections):
+        match = tilt_angle_regex.search(text, start, end)
+        if match is None:
+            continue
+        value = match.group(1).strip()
+        try:
+            tilt_angles[idx] = _to_tilt_angle(value)
+        except ValueError as e:
+            raise ValueError(f"invalid value for 'TiltAngle': {value!r}") from e
+    return tilt_angles
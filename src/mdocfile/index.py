@@ -0,0 +1,288 @@
+"""SQLite index of the mdoc files in a directory tree."""
+import json
+import logging
+import os
+import sqlite3
+from os import PathLike
+from pathlib import Path, PurePath
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from mdocfile.compact import (
+    GLOBAL_PREFIX,
+    FlatColumn,
+    flat_columns,
+    flat_values,
+)
+from mdocfile.data_models import Mdoc, MdocGlobalData, MdocSectionData
+from mdocfile.functions import EXECUTORS
+
+log = logging.getLogger('mdocfile')
+
+INDEXED_COLUMNS = ('TiltAngle', 'Magnification', 'Defocus', 'DateTime')
+_SQL_TYPES = {
+    int: 'INTEGER', float: 'REAL', bool: 'INTEGER', str: 'TEXT',
+    PurePath: 'TEXT', list: 'TEXT',
+}
+
+SECTION_FLAT_COLUMNS = flat_columns(MdocSectionData)
+GLOBAL_FLAT_COLUMNS = flat_columns(MdocGlobalData)
+SECTION_COLUMNS = [(c.name, _SQL_TYPES[c.value_type]) for c in SECTION_FLAT_COLUMNS]
+GLOBAL_COLUMNS = [(c.name, _SQL_TYPES[c.value_type]) for c in GLOBAL_FLAT_COLUMNS]
+
+
+def _flatten(model_instance, columns: Sequence[FlatColumn]) -> List[Any]:
+    """Values of a data model instance in the order of its flat columns."""
+    values = []
+    for column in columns:
+        [value] = flat_values(column, [getattr(model_instance, column.field)])
+        if value is not None and column.value_type is list:
+            value = json.dumps([list(pair) for pair in value])
+        values.append(value)
+    extra = {k: str(v) for k, v in model_instance.model_extra.items()}
+    values.append(json.dumps(extra) if extra else None)
+    return values
+
+
+def _parse_file(filename: str) -> Tuple[List[Any], List[List[Any]]]:
+    mdoc = Mdoc.from_file(filename)
+    file_row = [
+        *_flatten(mdoc.global_data, GLOBAL_FLAT_COLUMNS), json.dumps(mdoc.titles)
+    ]
+    section_rows = [
+        [idx, *_flatten(section, SECTION_FLAT_COLUMNS)]
+        for idx, section in enumerate(mdoc.section_data)
+    ]
+    return file_row, section_rows
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class MdocIndex:
+    """Searchable SQLite index of the mdoc files in a directory tree.
+
+    Global data is stored per file and section data per section, tuple fields
+    are split into one column per element as in the compact dataframe layout
+    and unknown fields are stored as JSON in 'extra_fields' columns.
+    Queries run against the 'sections' view, in which global data columns are
+    prefixed with 'global_' and each section has the 'path' of its file.
+
+    Updates only parse files which are new or whose modification time or size
+    changed, and are committed in batches so an interrupted update resumes
+    where it stopped.
+
+    Parameters
+    ----------
+    database : PathLike
+        SQLite database file, created if it does not exist
+    """
+
+    def __init__(self, database: PathLike):
+        self.database = Path(database)
+        self._connection = sqlite3.connect(self.database)
+        self._connection.execute('PRAGMA foreign_keys = ON')
+        self._create_tables()
+
+    def _create_tables(self) -> None:
+        global_columns = ', '.join(
+            f'{_quote(name)} {sql_type}' for name, sql_type in GLOBAL_COLUMNS
+        )
+        section_columns = ', '.join(
+            f'{_quote(name)} {sql_type}' for name, sql_type in SECTION_COLUMNS
+        )
+        view_columns = ', '.join(
+            [f's.{_quote(name)}' for name, _ in SECTION_COLUMNS]
+            + ['s.extra_fields']
+            + [f'f.{_quote(name)} AS {_quote(GLOBAL_PREFIX + name)}'
+               for name, _ in GLOBAL_COLUMNS]
+            + ['f.extra_fields AS global_extra_fields', 'f.titles']
+        )
+        with self._connection:
+            self._connection.executescript(f"""
+                CREATE TABLE IF NOT EXISTS files (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT UNIQUE NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    {global_columns},
+                    extra_fields TEXT,
+                    titles TEXT
+                );
+                CREATE TABLE IF NOT EXISTS section_data (
+                    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+                    section INTEGER NOT NULL,
+                    {section_columns},
+                    extra_fields TEXT,
+                    PRIMARY KEY (file_id, section)
+                );
+                CREATE VIEW IF NOT EXISTS sections AS
+                    SELECT f.path, s.section, {view_columns}
+                    FROM section_data s JOIN files f ON s.file_id = f.id;
+            """)
+            for column in INDEXED_COLUMNS:
+                self._connection.execute(
+                    f'CREATE INDEX IF NOT EXISTS {_quote("idx_" + column)} '
+                    f'ON section_data ({_quote(column)})'
+                )
+
+    def update(
+        self,
+        root: PathLike,
+        pattern: str = '**/*.mdoc',
+        workers: Optional[int] = None,
+        executor: str = 'process',
+        batch_size: int = 500,
+    ) -> Dict[str, int]:
+        """Index new and changed mdoc files below a directory.
+
+        Files which were removed from below `root` are removed from the index.
+
+        Parameters
+        ----------
+        root : PathLike
+            directory to crawl
+        pattern : str
+            glob pattern for mdoc files relative to `root`
+        workers : Optional[int]
+            maximum number of concurrent workers, defaults to the executor default
+        executor : str
+            'thread' or 'process'
+        batch_size : int
+            number of files parsed and committed at a time
+
+        Returns
+        -------
+        counts : Dict[str, int]
+            number of files which were 'added', 'updated', 'removed',
+            'unchanged' and 'failed'
+        """
+        if executor not in EXECUTORS:
+            raise ValueError(
+                f"executor must be one of {tuple(EXECUTORS)}, got '{executor}'"
+            )
+        root = Path(root).absolute()
+        indexed = {
+            path: (file_id, mtime_ns, size) for file_id, path, mtime_ns, size
+            in self._connection.execute('SELECT id, path, mtime_ns, size FROM files')
+        }
+        counts = dict.fromkeys(
+            ('added', 'updated', 'removed', 'unchanged', 'failed'), 0
+        )
+        found = set()
+        todo = []
+        for filename in sorted(root.glob(pattern)):
+            path = str(filename)
+            found.add(path)
+            stat = os.stat(filename)
+            state = (stat.st_mtime_ns, stat.st_size)
+            if path in indexed and indexed[path][1:] == state:
+                counts['unchanged'] += 1
+                continue
+            todo.append((path, stat.st_mtime_ns, stat.st_size))
+
+        removed = [
+            (file_id,) for path, (file_id, _, _) in indexed.items()
+            if path not in found and Path(path).is_relative_to(root)
+        ]
+        with self._connection:
+            self._connection.executemany('DELETE FROM files WHERE id = ?', removed)
+        counts['removed'] = len(removed)
+
+        with EXECUTORS[executor](max_workers=workers) as pool:
+            for start in range(0, len(todo), batch_size):
+                batch = todo[start:start + batch_size]
+                futures = [pool.submit(_parse_file, path) for path, _, _ in batch]
+                with self._connection:
+                    for (path, mtime_ns, size), future in zip(batch, futures):
+                        try:
+                            file_row, section_rows = future.result()
+                        except Exception as e:
+                            log.warning(f"Failed to index {path}: {e!r}")
+                            counts['failed'] += 1
+                            continue
+                        counts['updated' if path in indexed else 'added'] += 1
+                        self._store(path, mtime_ns, size, file_row, section_rows)
+        return counts
+
+    def _store(
+        self,
+        path: str,
+        mtime_ns: int,
+        size: int,
+        file_row: List[Any],
+        section_rows: List[List[Any]],
+    ) -> None:
+        file_columns = ['path', 'mtime_ns', 'size'] + [
+            name for name, _ in GLOBAL_COLUMNS
+        ] + ['extra_fields', 'titles']
+        section_columns = ['file_id', 'section'] + [
+            name for name, _ in SECTION_COLUMNS
+        ] + ['extra_fields']
+        self._connection.execute('DELETE FROM files WHERE path = ?', (path,))
+        cursor = self._connection.execute(
+            f'INSERT INTO files ({", ".join(map(_quote, file_columns))}) '
+            f'VALUES ({", ".join("?" * len(file_columns))})',
+            [path, mtime_ns, size, *file_row],
+        )
+        self._connection.executemany(
+            f'INSERT INTO section_data ({", ".join(map(_quote, section_columns))}) '
+            f'VALUES ({", ".join("?" * len(section_columns))})',
+            [[cursor.lastrowid, *row] for row in section_rows],
+        )
+
+    def query(
+        self,
+        where: Optional[str] = None,
+        params: Sequence[Any] = (),
+        columns: Optional[Sequence[str]] = None,
+    ) -> pd.DataFrame:
+        """Query indexed sections.
+
+        Parameters
+        ----------
+        where : Optional[str]
+            SQL condition on columns of the 'sections' view,
+            e.g. 'Magnification = ? AND Defocus BETWEEN ? AND ?'
+        params : Sequence[Any]
+            values for placeholders in `where`
+        columns : Optional[Sequence[str]]
+            columns to return, all columns if None
+
+        Returns
+        -------
+        df : pd.DataFrame
+            one row per matching section
+        """
+        selected = '*' if columns is None else ', '.join(map(_quote, columns))
+        sql = f'SELECT {selected} FROM sections'
+        if where is not None:
+            sql += f' WHERE {where}'
+        return pd.read_sql_query(sql, self._connection, params=tuple(params))
+
+    def files(
+        self, where: Optional[str] = None, params: Sequence[Any] = ()
+    ) -> List[Path]:
+        """Paths of indexed files with at least one section matching `where`."""
+        sql = 'SELECT DISTINCT path FROM sections'
+        if where is not None:
+            sql += f' WHERE {where}'
+        return [Path(path) for path, in self._connection.execute(sql, tuple(params))]
+
+    def __len__(self) -> int:
+        """Number of indexed files."""
+        return self._connection.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._connection.close()
+
+    def __enter__(self) -> 'MdocIndex':
+        """Use the index as a context manager which closes the connection."""
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Close the database connection."""
+        self.close()
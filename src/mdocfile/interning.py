@@ -0,0 +1,82 @@
+"""Sharing of repeated values between the dataframes of a batch of files.
+
+Files of one session repeat the same titles, paths, keys and tuple values,
+e.g. 'ImageShift = 0 0' or the piece coordinates of a montage layout, but each
+file is parsed into its own objects. An `Interner` replaces equal values in
+the object columns of each dataframe with a single shared instance and
+rebuilds paths from a shared directory, so the component strings of the
+directory are shared as well. Values compare equal before and after.
+"""
+from pathlib import PurePath
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class Interner:
+    """Shares equal values between dataframes, e.g. of all files of a batch.
+
+    Interned values are kept alive until the interner is discarded, so use one
+    interner per batch.
+    """
+
+    def __init__(self):
+        self._values: Dict[Any, Any] = {}
+        self._titles: Dict[Tuple[str, ...], List[str]] = {}
+        self._paths: Dict[Tuple[type, str], PurePath] = {}
+
+    def value(self, value: Any) -> Any:
+        """Shared instance of a hashable value, other values as they are."""
+        try:
+            return self._values.setdefault(value, value)
+        except TypeError:
+            return value
+
+    def titles(self, titles: List[str]) -> List[str]:
+        """Shared list of titles."""
+        return self._titles.setdefault(tuple(titles), titles)
+
+    def path(self, path: PurePath) -> PurePath:
+        """Shared instance of a path, built from a shared parent directory."""
+        # keyed on strings, comparing Windows paths caches case folded parts
+        key = (type(path), str(path))
+        interned = self._paths.get(key)
+        if interned is not None:
+            return interned
+        if path.name:
+            path = self.path(path.parent) / path.name
+        self._paths[key] = path
+        return path
+
+    def _column(self, values: Iterable[Any]) -> List[Any]:
+        shared = self._values.setdefault
+        interned = []
+        for value in values:
+            if type(value) in (tuple, str):
+                value = shared(value, value)
+            elif isinstance(value, PurePath):
+                value = self.path(value)
+            interned.append(value)
+        return interned
+
+    def dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Intern the column names and object column values of a dataframe.
+
+        The dataframe is modified in place and returned.
+        """
+        df.columns = [self.value(column) for column in df.columns]
+        for idx, (column, dtype) in enumerate(df.dtypes.items()):
+            if dtype is not np.dtype(object):
+                continue
+            values = df.iloc[:, idx].to_numpy()
+            if column == 'titles':
+                values = [self.titles(v) if isinstance(v, list) else v for v in values]
+            else:
+                values = self._column(values)
+            df.isetitem(idx, pd.Series(values, index=df.index, dtype=object))
+        if 'global_extra_fields' in df.attrs:
+            df.attrs['global_extra_fields'] = [
+                self.value(k) for k in df.attrs['global_extra_fields']
+            ]
+        return df
@@ -0,0 +1,159 @@
+"""Montage piece metadata as typed NumPy arrays.
+
+Piece coordinates, stage positions and edge shifts of every piece ('[ZValue]'
+section) of a montage are packed into (n_pieces, width) float arrays, with NaN
+where a piece has no value and to pad two-element values of fields which hold
+two or three elements. `read_montage()` parses only these keys straight from
+the file, without pandas or pydantic.
+"""
+import itertools
+from os import PathLike
+from typing import Dict, List, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+from mdocfile.utils import Buffer, open_buffer, scan_boundaries, split_lines
+
+# MontageArrays attribute -> (mdoc key, number of columns)
+MONTAGE_FIELDS = {
+    'piece_coordinates': ('PieceCoordinates', 3),
+    'stage_position': ('StagePosition', 2),
+    'aligned_piece_coords': ('AlignedPieceCoords', 3),
+    'aligned_piece_coords_vs': ('AlignedPieceCoordsVS', 3),
+    'xedge_dxy': ('XedgeDxy', 3),
+    'yedge_dxy': ('YedgeDxy', 3),
+    'xedge_dxy_vs': ('XedgeDxyVS', 3),
+    'yedge_dxy_vs': ('YedgeDxyVS', 3),
+}
+_KEYS = {key: attribute for attribute, (key, _) in MONTAGE_FIELDS.items()}
+
+Values = Sequence[Optional[Union[str, Sequence[float]]]]
+
+
+class MontageArrays(NamedTuple):
+    """Piece metadata of a montage, pieces grouped by montage section.
+
+    Pieces are ordered by their montage section, the third piece coordinate,
+    and otherwise keep file order. Pieces of section ``sections[i]`` are rows
+    ``section_offsets[i]:section_offsets[i + 1]``.
+
+    Attributes
+    ----------
+    z_values : np.ndarray
+        (n_pieces, ) int array of the 'ZValue' of each piece
+    piece_coordinates, stage_position, aligned_piece_coords, ... : np.ndarray
+        (n_pieces, width) float arrays of the fields in `MONTAGE_FIELDS`
+    sections : np.ndarray
+        (n_sections, ) int array of montage section numbers
+    section_offsets : np.ndarray
+        (n_sections + 1, ) int array of the first row of each section
+    """
+
+    z_values: np.ndarray
+    piece_coordinates: np.ndarray
+    stage_position: np.ndarray
+    aligned_piece_coords: np.ndarray
+    aligned_piece_coords_vs: np.ndarray
+    xedge_dxy: np.ndarray
+    yedge_dxy: np.ndarray
+    xedge_dxy_vs: np.ndarray
+    yedge_dxy_vs: np.ndarray
+    sections: np.ndarray
+    section_offsets: np.ndarray
+
+
+def pack(values: Values, width: int) -> np.ndarray:
+    """Pack numeric tuples or their strings into a NaN padded float array.
+
+    Parameters
+    ----------
+    values : Values
+        one value per row, e.g. '4.02 56.7' or (4.02, 56.7), None if missing
+    width : int
+        number of columns, values with fewer elements are padded with NaN
+
+    Returns
+    -------
+    array : np.ndarray
+        (len(values), width) float array
+    """
+    array = np.full((len(values), width), np.nan)
+    rows = [idx for idx, value in enumerate(values) if value is not None]
+    parts = [
+        values[idx].split() if isinstance(values[idx], str) else values[idx]
+        for idx in rows
+    ]
+    widths = np.fromiter(map(len, parts), dtype=np.intp, count=len(parts))
+    if widths.size and widths.max() > width:
+        raise ValueError(f'expected at most {width} elements per value')
+    flat = np.array(list(itertools.chain.from_iterable(parts)), dtype=float)
+    row_idx = np.repeat(np.array(rows, dtype=np.intp), widths)
+    col_idx = np.arange(flat.size) - np.repeat(np.cumsum(widths) - widths, widths)
+    array[row_idx, col_idx] = flat
+    return array
+
+
+def montage_arrays(
+    z_values: Sequence[int], columns: Dict[str, Values]
+) -> MontageArrays:
+    """Assemble montage arrays from per-piece values keyed on mdoc key."""
+    n_pieces = len(z_values)
+    arrays = {
+        attribute: pack(columns.get(key, [None] * n_pieces), width)
+        for attribute, (key, width) in MONTAGE_FIELDS.items()
+    }
+    z_values = np.asarray(z_values, dtype=np.int64).reshape(n_pieces)
+    # stable sort keeps file order within sections, pieces without one last
+    piece_sections = arrays['piece_coordinates'][:, 2]
+    order = np.argsort(piece_sections, kind='stable')
+    if (order != np.arange(n_pieces)).any():
+        z_values = z_values[order]
+        arrays = {name: array[order] for name, array in arrays.items()}
+        piece_sections = piece_sections[order]
+    known = piece_sections[~np.isnan(piece_sections)]
+    sections = np.unique(known).astype(np.int64)
+    section_offsets = np.searchsorted(known, [*sections, np.inf]).astype(np.int64)
+    return MontageArrays(
+        z_values=z_values,
+        sections=sections,
+        section_offsets=section_offsets,
+        **arrays,
+    )
+
+
+def montage_arrays_from_buffer(buffer: Buffer) -> MontageArrays:
+    """Parse montage arrays from mdoc text or bytes, reading only their keys."""
+    z_values: List[int] = []
+    columns: Dict[str, List[Optional[str]]] = {key: [] for key in _KEYS}
+    for kind, start, end in scan_boundaries(buffer).sections:
+        if kind != 'ZValue':
+            continue
+        lines = split_lines(buffer, start, end)
+        z_values.append(int(lines[0].strip('[]').partition('=')[2]))
+        for column in columns.values():
+            column.append(None)
+        for line in lines[1:]:
+            key, separator, value = line.partition('=')
+            key = key.strip()
+            if separator and key in columns:
+                columns[key][-1] = value.strip()
+    return montage_arrays(z_values, columns)
+
+
+def read_montage(filename: PathLike, mmap: bool = False) -> MontageArrays:
+    """Read the piece metadata of a montage mdoc file as NumPy arrays.
+
+    Parameters
+    ----------
+    filename : PathLike
+        SerialEM mdoc file of a montage
+    mmap : bool
+        memory map the file rather than reading it into memory
+
+    Returns
+    -------
+    montage : MontageArrays
+        arrays of piece metadata, grouped by montage section
+    """
+    with open_buffer(filename, use_mmap=mmap) as buffer:
+        return montage_arrays_from_buffer(buffer)
@@ -0,0 +1,328 @@
+"""Parquet datasets of many parsed mdoc files.
+
+Each row of a dataset is one section. The schema is derived from the data
+models and does not depend on the files which were converted: tuple fields are
+split into one column per element as in the compact dataframe layout, global
+data is stored in columns prefixed with 'global_' and unknown fields are kept
+in 'extra_fields' and 'global_extra_fields' maps. 'Timestamp' holds the parsed
+'DateTime' of each section for range queries.
+
+pyarrow is an optional dependency, install it with ``pip install mdocfile[parquet]``.
+"""
+import functools
+import json
+import logging
+from os import PathLike
+from pathlib import PurePath
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import pandas as pd
+
+from mdocfile.compact import (
+    FRAME_DOSES_FIELD,
+    GLOBAL_PREFIX,
+    TUPLE_FIELDS,
+    flat_columns,
+    flat_values,
+    join_tuples,
+)
+from mdocfile.data_models import Mdoc, MdocGlobalData, MdocSectionData
+from mdocfile.derived import parse_datetimes
+from mdocfile.functions import EXECUTORS, find_mdoc_files
+
+log = logging.getLogger('mdocfile')
+
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            'pyarrow is required for parquet support, '
+            'install it with `pip install mdocfile[parquet]`'
+        ) from e
+    return pyarrow, pyarrow.parquet
+
+
+def _field_types(pa, model, prefix: str) -> List[tuple]:
+    arrow_types = {
+        int: pa.int64(), float: pa.float64(), bool: pa.bool_(), str: pa.string(),
+        PurePath: pa.string(),
+        list: pa.list_(pa.struct([('dose', pa.float64()), ('frames', pa.int64())])),
+    }
+    return [
+        (prefix + column.name, arrow_types[column.value_type])
+        for column in flat_columns(model)
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def arrow_schema():
+    """Schema of mdoc parquet datasets, derived from the data models."""
+    pa, _ = _import_pyarrow()
+    extra_fields = pa.map_(pa.string(), pa.string())
+    return pa.schema([
+        ('source_file', pa.string()),
+        *_field_types(pa, MdocSectionData, prefix=''),
+        ('extra_fields', extra_fields),
+        ('used_aliases', pa.list_(pa.string())),
+        ('Timestamp', pa.timestamp('s')),
+        *_field_types(pa, MdocGlobalData, prefix=GLOBAL_PREFIX),
+        ('global_extra_fields', extra_fields),
+        ('titles', pa.list_(pa.string())),
+    ])
+
+
+def _add_fields(data: Dict[str, list], model, instances: list, prefix: str):
+    for column in flat_columns(model):
+        values = flat_values(column, [getattr(i, column.field) for i in instances])
+        if column.value_type is list:
+            values = [
+                None if value is None else [
+                    {'dose': dose, 'frames': frames} for dose, frames in value
+                ]
+                for value in values
+            ]
+        data[prefix + column.name] = values
+
+
+def mdoc_to_arrow(mdoc: Mdoc, source_file: str = ''):
+    """Convert an Mdoc to an Arrow table with one row per section."""
+    pa, _ = _import_pyarrow()
+    sections = mdoc.section_data
+    n_sections = len(sections)
+    data: Dict[str, list] = {'source_file': [source_file] * n_sections}
+    _add_fields(data, MdocSectionData, sections, prefix='')
+    data['extra_fields'] = [
+        [(k, str(v)) for k, v in s.model_extra.items()] for s in sections
+    ]
+    data['used_aliases'] = [sorted(s._used_aliases.values()) for s in sections]
+    data['Timestamp'] = parse_datetimes([s.DateTime for s in sections])
+    _add_fields(
+        data, MdocGlobalData, [mdoc.global_data] * n_sections, prefix=GLOBAL_PREFIX
+    )
+    global_extra = [(k, str(v)) for k, v in mdoc.global_data.model_extra.items()]
+    data['global_extra_fields'] = [global_extra] * n_sections
+    data['titles'] = [mdoc.titles] * n_sections
+    return pa.Table.from_pydict(data, schema=arrow_schema())
+
+
+def _file_to_arrow(filename: PathLike):
+    return mdoc_to_arrow(Mdoc.from_file(filename), source_file=str(filename))
+
+
+def _iter_tables(
+    filenames: list, workers: Optional[int], executor: str, read_errors: Dict[str, str]
+):
+    """Arrow tables of the files which parse, errors of the others in read_errors."""
+    if executor not in EXECUTORS:
+        raise ValueError(
+            f"executor must be one of {tuple(EXECUTORS)}, got '{executor}'"
+        )
+    with EXECUTORS[executor](max_workers=workers) as pool:
+        futures = [pool.submit(_file_to_arrow, filename) for filename in filenames]
+        for filename, future in zip(filenames, futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                log.warning(f"Failed to read {filename}: {e!r}")
+                read_errors[str(filename)] = repr(e)
+
+
+def to_arrow(
+    paths: Union[PathLike, str, Iterable[PathLike]],
+    workers: Optional[int] = None,
+    executor: str = 'thread',
+):
+    """Read many mdoc files into a single Arrow table.
+
+    Files which fail to parse are logged and skipped, their errors are
+    available from the 'read_errors' schema metadata as a JSON mapping of
+    filename to error message.
+
+    Parameters
+    ----------
+    paths : PathLike | str | Iterable[PathLike]
+        glob pattern, directory containing mdoc files or sequence of mdoc files
+    workers : Optional[int]
+        maximum number of concurrent workers, defaults to the executor default
+    executor : str
+        'thread' or 'process'
+
+    Returns
+    -------
+    table : pyarrow.Table
+        one row per section with the schema from `arrow_schema()`
+    """
+    pa, _ = _import_pyarrow()
+    filenames = find_mdoc_files(paths)
+    read_errors: Dict[str, str] = {}
+    tables = list(_iter_tables(
+        filenames, workers=workers, executor=executor, read_errors=read_errors
+    ))
+    table = pa.concat_tables(tables) if tables else arrow_schema().empty_table()
+    if read_errors:
+        table = table.replace_schema_metadata({'read_errors': json.dumps(read_errors)})
+    return table
+
+
+def to_parquet(
+    paths: Union[PathLike, str, Iterable[PathLike]],
+    out: PathLike,
+    partition_cols: Optional[Sequence[str]] = None,
+    workers: Optional[int] = None,
+    executor: str = 'thread',
+    files_per_batch: int = 1000,
+) -> Dict[str, str]:
+    """Convert many mdoc files into a parquet dataset.
+
+    Files are converted in batches of `files_per_batch`, each batch is written
+    as separate parquet files so memory use does not grow with the number of
+    files. Files which fail to parse are logged and skipped.
+
+    Parameters
+    ----------
+    paths : PathLike | str | Iterable[PathLike]
+        glob pattern, directory containing mdoc files or sequence of mdoc files
+    out : PathLike
+        directory of the parquet dataset
+    partition_cols : Optional[Sequence[str]]
+        columns to partition the dataset by, e.g. ['global_ImageFile']
+    workers : Optional[int]
+        maximum number of concurrent workers, defaults to the executor default
+    executor : str
+        'thread' or 'process'
+    files_per_batch : int
+        number of mdoc files converted per batch
+
+    Returns
+    -------
+    read_errors : Dict[str, str]
+        error message of each file which failed to parse
+    """
+    pa, pq = _import_pyarrow()
+    filenames = find_mdoc_files(paths)
+    read_errors: Dict[str, str] = {}
+    for batch, start in enumerate(range(0, len(filenames), files_per_batch)):
+        tables = list(_iter_tables(
+            filenames[start:start + files_per_batch],
+            workers=workers,
+            executor=executor,
+            read_errors=read_errors,
+        ))
+        if not tables:
+            continue
+        pq.write_to_dataset(
+            pa.concat_tables(tables),
+            out,
+            partition_cols=partition_cols,
+            basename_template=f'part-{batch}-{{i}}.parquet',
+        )
+    return read_errors
+
+
+def _read_table(path: PathLike, columns, filters):
+    _, pq = _import_pyarrow()
+    return pq.read_table(path, columns=columns, filters=filters)
+
+
+def read_parquet(
+    path: PathLike,
+    columns: Optional[Sequence[str]] = None,
+    filters: Optional[Any] = None,
+) -> pd.DataFrame:
+    """Read sections from a parquet dataset written by `to_parquet()`.
+
+    Only the requested columns and the row groups matching `filters` are read.
+
+    Parameters
+    ----------
+    path : PathLike
+        parquet file or dataset directory
+    columns : Optional[Sequence[str]]
+        columns to read, all columns if None
+    filters : Optional[Any]
+        pyarrow filters, e.g. [('TiltAngle', '>', 0), ('NavigatorLabel', '=', '12')]
+        or a `pyarrow.compute` expression
+
+    Returns
+    -------
+    df : pd.DataFrame
+        one row per section
+    """
+    return _read_table(path, columns=columns, filters=filters).to_pandas()
+
+
+def _field_values(
+    columns: Dict[str, list], name: str, rows: List[int], prefix: str
+) -> Optional[list]:
+    if name in TUPLE_FIELDS:
+        split_columns, element_types, min_length = TUPLE_FIELDS[name]
+        split = [
+            [columns[prefix + column][row] for row in rows]
+            for column in split_columns if prefix + column in columns
+        ]
+        if not split:
+            return None
+        return join_tuples(split, element_types, min_length)
+    if prefix + name not in columns:
+        return None
+    values = [columns[prefix + name][row] for row in rows]
+    if name == FRAME_DOSES_FIELD:
+        values = [
+            None if value is None else [(v['dose'], v['frames']) for v in value]
+            for value in values
+        ]
+    return values
+
+
+def table_to_mdocs(table) -> Dict[str, Mdoc]:
+    """Reconstruct Mdoc objects from an Arrow table, keyed on source file."""
+    columns = table.to_pydict()
+    rows_per_file: Dict[str, List[int]] = {}
+    for row, source_file in enumerate(columns['source_file']):
+        rows_per_file.setdefault(source_file, []).append(row)
+
+    mdocs = {}
+    for source_file, rows in rows_per_file.items():
+        global_data = {}
+        for name in MdocGlobalData.model_fields:
+            values = _field_values(columns, name, rows[:1], prefix=GLOBAL_PREFIX)
+            if values is not None and values[0] is not None:
+                global_data[name] = values[0]
+        if 'global_extra_fields' in columns:
+            global_data.update(columns['global_extra_fields'][rows[0]])
+
+        section_data: List[Dict[str, Any]] = [{} for _ in rows]
+        for name in MdocSectionData.model_fields:
+            values = _field_values(columns, name, rows, prefix='')
+            for section, value in zip(section_data, values or []):
+                if value is not None:
+                    section[name] = value
+        sections = []
+        for section, row in zip(section_data, rows):
+            if 'extra_fields' in columns:
+                section.update(columns['extra_fields'][row])
+            section = MdocSectionData(**section)
+            if 'used_aliases' in columns:
+                section._used_aliases = MdocSectionData.aliases_in(
+                    columns['used_aliases'][row]
+                )
+            sections.append(section)
+        titles = columns['titles'][rows[0]] if 'titles' in columns else []
+        mdocs[source_file] = Mdoc(
+            titles=titles,
+            global_data=MdocGlobalData(**global_data),
+            section_data=sections,
+        )
+    return mdocs
+
+
+def read_mdocs(path: PathLike, filters: Optional[Any] = None) -> Dict[str, Mdoc]:
+    """Reconstruct Mdoc objects from a parquet dataset, keyed on source file.
+
+    Sections excluded by `filters` are omitted from the reconstructed Mdocs.
+    """
+    return table_to_mdocs(_read_table(path, columns=None, filters=filters))
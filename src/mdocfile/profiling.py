@@ -0,0 +1,128 @@
+"""Opt-in parse statistics and per-phase timings.
+
+Nothing is recorded unless a `stats()` context is active, in which case the
+parsers report timings of each phase, counts of files, sections and fields and
+tallies of unknown fields and aliases. Parsing in worker threads is recorded,
+parsing in worker processes is not.
+"""
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+
+class ParseStats:
+    """Statistics recorded while a `stats()` context is active.
+
+    Attributes
+    ----------
+    timings : Counter
+        seconds spent per phase, 'io', 'split_lines', 'find_sections',
+        'validation' and 'dataframe'
+    files : int
+        number of mdoc files parsed
+    sections : int
+        number of sections parsed
+    fields : int
+        number of key value pairs in parsed sections
+    unknown_fields : Counter
+        number of sections in which each unknown field occurred
+    aliases : Counter
+        number of sections in which each alias, e.g. 'FrameDosesAndNumber',
+        occurred
+    """
+
+    def __init__(self):
+        self.timings: Counter = Counter()
+        self.files = 0
+        self.sections = 0
+        self.fields = 0
+        self.unknown_fields: Counter = Counter()
+        self.aliases: Counter = Counter()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Statistics as a dictionary, e.g. for a metrics system."""
+        return {
+            'files': self.files,
+            'sections': self.sections,
+            'fields': self.fields,
+            'timings': dict(self.timings),
+            'unknown_fields': dict(self.unknown_fields),
+            'aliases': dict(self.aliases),
+        }
+
+
+_lock = threading.Lock()
+_active: List[ParseStats] = []
+
+
+@contextmanager
+def stats(
+    callback: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Iterator[ParseStats]:
+    """Record parse statistics within a with block.
+
+    Parameters
+    ----------
+    callback : Optional[Callable[[Dict[str, Any]], None]]
+        called with `ParseStats.as_dict()` when the block exits
+
+    Yields
+    ------
+    stats : ParseStats
+        statistics, updated as files are parsed
+    """
+    collector = ParseStats()
+    with _lock:
+        _active.append(collector)
+    try:
+        yield collector
+    finally:
+        with _lock:
+            _active.remove(collector)
+        if callback is not None:
+            callback(collector.as_dict())
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Add the time spent in a with block to a phase of all active stats."""
+    if not _active:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+            for collector in _active:
+                collector.timings[phase] += elapsed
+
+
+def enabled() -> bool:
+    """Whether any `stats()` context is active."""
+    return bool(_active)
+
+
+def record_file(
+    n_sections: int,
+    n_fields: int,
+    unknown_fields: Iterable[str] = (),
+    aliases: Iterable[str] = (),
+) -> None:
+    """Record one parsed file in all active stats.
+
+    `unknown_fields` and `aliases` contain one entry per occurrence.
+    """
+    if not _active:
+        return
+    unknown_fields, aliases = Counter(unknown_fields), Counter(aliases)
+    with _lock:
+        for collector in _active:
+            collector.files += 1
+            collector.sections += n_sections
+            collector.fields += n_fields
+            collector.unknown_fields.update(unknown_fields)
+            collector.aliases.update(aliases)
@@ -0,0 +1,238 @@
+"""Byte offsets of the sections of mdoc files, for reading selected sections.
+
+Sections are located with a single boundary scan and identified by the number
+in their header, e.g. 3 for '[ZValue = 3]'. The offsets can be cached in a
+side-car file next to the mdoc file, e.g. 'atlas.mdoc.sections.json', so that
+random access into large files does not need to scan them again.
+"""
+import json
+import logging
+import os
+import re
+import tempfile
+from os import PathLike
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from mdocfile.utils import SECTION_HEADER_KEYS, Buffer, open_buffer, scan_boundaries
+
+log = logging.getLogger('mdocfile')
+
+SIDECAR_SUFFIX = '.sections.json'
+SIDECAR_VERSION = 1
+
+_section_number_regex = re.compile(r'[^\S\n]*\[\w+ =[^\S\n]*([+-]?\d+)[^\S\n]*\]')
+_section_number_regex_bytes = re.compile(_section_number_regex.pattern.encode())
+
+
+class SectionEntry(NamedTuple):
+    """Header kind and number and byte offsets of one section."""
+
+    kind: str
+    number: Optional[int]
+    start: int
+    end: int
+
+
+# numbers select [ZValue] sections, other kinds with e.g. ('MontSection', 2)
+NumberSelector = Union[int, slice, Iterable[int]]
+SectionSelector = Union[
+    NumberSelector, Tuple[str, NumberSelector], Callable[[SectionEntry], bool]
+]
+
+
+def _section_number(buffer: Buffer, start: int) -> Optional[int]:
+    regex = (
+        _section_number_regex if isinstance(buffer, str)
+        else _section_number_regex_bytes
+    )
+    match = regex.match(buffer, start)
+    return None if match is None else int(match.group(1))
+
+
+def _selects_number(sections: NumberSelector) -> Callable[[Optional[int]], bool]:
+    if isinstance(sections, int):
+        return lambda number: number == sections
+    if isinstance(sections, slice):
+        start = 0 if sections.start is None else sections.start
+        step = 1 if sections.step is None else sections.step
+        if step < 1:
+            raise ValueError(f'slice step must be positive, got {step}')
+        stop = sections.stop
+
+        def in_range(number: Optional[int]) -> bool:
+            return (
+                number is not None
+                and number >= start
+                and (stop is None or number < stop)
+                and (number - start) % step == 0
+            )
+        return in_range
+    numbers = set(sections)
+    return lambda number: number in numbers
+
+
+def selects(sections: SectionSelector) -> Callable[[SectionEntry], bool]:
+    """Predicate on section entries from a selector.
+
+    Header numbers select '[ZValue]' sections, a (kind, numbers) pair selects
+    sections of another kind, e.g. ('MontSection', 2) or ('FrameSet', [0, 1]).
+    """
+    if callable(sections):
+        return sections
+    kind = 'ZValue'
+    if (
+        isinstance(sections, tuple) and len(sections) == 2
+        and isinstance(sections[0], str)
+    ):
+        kind, sections = sections
+        if kind not in SECTION_HEADER_KEYS:
+            raise ValueError(
+                f'section kind must be one of {SECTION_HEADER_KEYS}, got {kind!r}'
+            )
+    selected = _selects_number(sections)
+    return lambda entry: entry.kind == kind and selected(entry.number)
+
+
+def sidecar_path(filename: PathLike) -> Path:
+    """Path of the side-car index file of an mdoc file."""
+    return Path(str(filename) + SIDECAR_SUFFIX)
+
+
+class SectionIndex:
+    """Byte offsets of the header and sections of an mdoc file.
+
+    Parameters
+    ----------
+    header : Tuple[int, int]
+        byte offsets of the file header, before the first section
+    entries : List[SectionEntry]
+        one entry per section, in file order
+    """
+
+    def __init__(self, header: Tuple[int, int], entries: List[SectionEntry]):
+        self.header = header
+        self.entries = entries
+        self._positions: Optional[Dict[Tuple[Optional[str], int], int]] = None
+
+    @classmethod
+    def from_buffer(cls, buffer: Buffer) -> 'SectionIndex':
+        """Index mdoc data with a single boundary scan."""
+        boundaries = scan_boundaries(buffer)
+        entries = [
+            SectionEntry(kind, _section_number(buffer, start), start, end)
+            for kind, start, end in boundaries.sections
+        ]
+        return cls(boundaries.header, entries)
+
+    @classmethod
+    def for_file(cls, filename: PathLike, cache: bool = False) -> 'SectionIndex':
+        """Index an mdoc file.
+
+        Parameters
+        ----------
+        filename : PathLike
+            SerialEM mdoc file
+        cache : bool
+            reuse the side-car index of the file if it is up to date, otherwise
+            write one. Side-car files which cannot be written are skipped.
+        """
+        stat = os.stat(filename)
+        if cache:
+            index = cls._load(filename, stat)
+            if index is not None:
+                return index
+        with open_buffer(filename, use_mmap=True) as buffer:
+            index = cls.from_buffer(buffer)
+        if cache:
+            index._save(filename, stat)
+        return index
+
+    @classmethod
+    def _load(
+        cls, filename: PathLike, stat: os.stat_result
+    ) -> Optional['SectionIndex']:
+        try:
+            with open(sidecar_path(filename)) as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            log.warning(f'Ignoring unreadable section index for {filename}: {e!r}')
+            return None
+        if (data.get('version'), data.get('mtime_ns'), data.get('size')) != (
+            SIDECAR_VERSION, stat.st_mtime_ns, stat.st_size
+        ):
+            return None
+        entries = [SectionEntry(*entry) for entry in data['sections']]
+        return cls(tuple(data['header']), entries)
+
+    def _save(self, filename: PathLike, stat: os.stat_result) -> None:
+        path = sidecar_path(filename)
+        data = {
+            'version': SIDECAR_VERSION,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'header': list(self.header),
+            'sections': [list(entry) for entry in self.entries],
+        }
+        try:
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        except OSError as e:
+            log.warning(f'Could not write section index for {filename}: {e!r}')
+            return
+        try:
+            with os.fdopen(fd, 'w') as file:
+                json.dump(data, file)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def select(self, sections: SectionSelector) -> List[SectionEntry]:
+        """Entries of the selected sections, in file order.
+
+        Parameters
+        ----------
+        sections : SectionSelector
+            a header number, a slice or an iterable of header numbers of
+            '[ZValue]' sections, a (kind, numbers) pair for other kinds, e.g.
+            ``('MontSection', slice(0, 4))``, or a predicate on `SectionEntry`
+        """
+        selected = selects(sections)
+        return [entry for entry in self.entries if selected(entry)]
+
+    def find(self, number: int, kind: Optional[str] = 'ZValue') -> int:
+        """Position of the first section with a header number, in O(1).
+
+        Sections of any kind match if `kind` is None. Raises a KeyError if
+        there is no such section.
+        """
+        if self._positions is None:
+            positions: Dict[Tuple[Optional[str], int], int] = {}
+            for idx, entry in reversed(list(enumerate(self.entries))):
+                positions[(entry.kind, entry.number)] = idx
+                positions[(None, entry.number)] = idx
+            self._positions = positions
+        key = (kind, number)
+        if key not in self._positions:
+            kind = 'any kind' if kind is None else kind
+            raise KeyError(f'no section numbered {number} of {kind}')
+        return self._positions[key]
+
+
+def read_selected(
+    filename: PathLike, sections: SectionSelector, cache_index: bool = False
+) -> bytes:
+    """Header and selected sections of an mdoc file, as mdoc data.
+
+    Only the selected sections are read from disk.
+    """
+    index = SectionIndex.for_file(filename, cache=cache_index)
+    selected = index.select(sections)
+    with open(filename, 'rb') as file:
+        parts = []
+        for start, end in [index.header, *((e.start, e.end) for e in selected)]:
+            file.seek(start)
+            parts.append(file.read(end - start))
+    return b''.join(parts)
@@ -0,0 +1,154 @@
+"""Streaming access to mdoc files, one section at a time.
+
+Files are memory mapped and split into sections with a single boundary scan,
+sections are decoded and parsed one at a time so memory use does not grow
+with the size of the file.
+"""
+import contextlib
+import itertools
+from os import PathLike
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+import pandas as pd
+
+from mdocfile import columnar
+from mdocfile.data_models import Mdoc, MdocGlobalData, MdocSectionData
+from mdocfile.utils import (
+    TITLE_PREFIX,
+    Buffer,
+    open_buffer,
+    scan_boundaries,
+    split_lines,
+)
+
+
+def iter_blocks(buffer: Buffer) -> Iterator[List[str]]:
+    """Yield the stripped lines of the header, then of each section of mdoc data.
+
+    Only one block of lines is decoded at a time.
+    """
+    boundaries = scan_boundaries(buffer)
+    yield split_lines(buffer, *boundaries.header)
+    for _, start, end in boundaries.sections:
+        yield split_lines(buffer, start, end)
+
+
+class SectionIterator:
+    """Iterator over the sections of an mdoc file which streams the file.
+
+    Titles and global data are parsed from the file header on construction,
+    sections are parsed lazily as the iterator is consumed.
+
+    Parameters
+    ----------
+    filename : PathLike
+        SerialEM mdoc file to read
+    as_dict : bool
+        yield dictionaries of typed values rather than MdocSectionData
+    """
+
+    def __init__(self, filename: PathLike, as_dict: bool = False):
+        self.as_dict = as_dict
+        self._exit_stack = contextlib.ExitStack()
+        buffer = self._exit_stack.enter_context(open_buffer(filename, use_mmap=True))
+        self._blocks = iter_blocks(buffer)
+        header_lines = next(self._blocks)
+        self.titles: List[str] = [
+            line for line in header_lines if line.startswith(TITLE_PREFIX)
+        ]
+        self.global_data = MdocGlobalData.from_lines(header_lines)
+
+    def __iter__(self) -> 'SectionIterator':
+        """The iterator itself, sections are read as they are requested."""
+        return self
+
+    def __next__(self) -> Union[MdocSectionData, Dict[str, Any]]:
+        """Read and parse the next section, closing the file after the last."""
+        try:
+            lines = next(self._blocks)
+        except StopIteration:
+            self.close()
+            raise
+        if self.as_dict:
+            return columnar.convert_section(columnar.parse_section_lines(lines))
+        return MdocSectionData.from_lines(lines)
+
+    def close(self) -> None:
+        """Close the file, the iterator is exhausted afterwards."""
+        self._blocks.close()
+        self._exit_stack.close()
+
+    def __enter__(self) -> 'SectionIterator':
+        """Use the iterator as a context manager which closes the file."""
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Close the file."""
+        self.close()
+
+
+def iter_sections(filename: PathLike, as_dict: bool = False) -> SectionIterator:
+    """Iterate over the sections of an mdoc file without reading the whole file.
+
+    Parameters
+    ----------
+    filename : PathLike
+        SerialEM mdoc file to read
+    as_dict : bool
+        yield dictionaries of typed values rather than MdocSectionData
+
+    Returns
+    -------
+    sections : SectionIterator
+        iterator over sections with `titles` and `global_data` attributes
+    """
+    return SectionIterator(filename, as_dict=as_dict)
+
+
+def _batched(iterable, n: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, n)):
+        yield batch
+
+
+def _chunk_to_dataframe(
+    header_lines: List[str],
+    chunk: List[List[str]],
+    engine: str,
+    columns: Optional[Sequence[str]],
+) -> pd.DataFrame:
+    if engine == 'fast':
+        try:
+            titles, global_data = columnar.parse_header_lines(header_lines)
+            sections = [columnar.parse_section_lines(lines) for lines in chunk]
+            return columnar.columns_to_dataframe(
+                titles, global_data, columnar.sections_to_columns(sections),
+                len(sections), usecols=columns,
+            )
+        except (ValueError, TypeError, KeyError, IndexError):
+            pass
+    lines = header_lines + list(itertools.chain.from_iterable(chunk))
+    df = Mdoc.from_lines(lines).to_dataframe()
+    return df if columns is None else columnar.select_columns(df, columns)
+
+
+def read_chunks(
+    filename: PathLike,
+    chunksize: int,
+    engine: str = 'pydantic',
+    columns: Optional[Sequence[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Read an mdoc file as an iterator of dataframes of `chunksize` sections.
+
+    Each chunk has the same layout as `Mdoc.to_dataframe()` and the index
+    continues across chunks. Columns which are empty within a chunk are dropped.
+    """
+    with open_buffer(filename, use_mmap=True) as buffer:
+        blocks = iter_blocks(buffer)
+        header_lines = next(blocks)
+        start = 0
+        for chunk in _batched(blocks, chunksize):
+            df = _chunk_to_dataframe(header_lines, chunk, engine, columns)
+            df.index = pd.RangeIndex(start, start + len(df))
+            start += len(df)
+            yield df
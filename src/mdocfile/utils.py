@@ -1,24 +1,67 @@
+import math
+import mmap
 import re
-from typing import List, Union
+from contextlib import contextmanager
+from os import PathLike
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
 
 camel_to_snake_regex = re.compile(r'(?<!^)(?=[A-Z])')
 
+SECTION_HEADER_KEYS = ('ZValue', 'MontSection', 'FrameSet')
+SECTION_PREFIXES = tuple(f'[{key} =' for key in SECTION_HEADER_KEYS)
+TITLE_PREFIX = '[T ='
+
+# section headers capture their kind, titles match up to the end of the line.
+# Matches are checked to be at the start of a line separately, which is much
+# faster than anchoring the pattern to every line.
+_BOUNDARY_PATTERN = (
+    r'\[(?:(' + '|'.join(SECTION_HEADER_KEYS) + r') =|T =[^\n]*)'
+)
+boundary_regex = re.compile(_BOUNDARY_PATTERN)
+boundary_regex_bytes = re.compile(_BOUNDARY_PATTERN.encode())
+_SECTION_KINDS: Dict[Union[str, bytes], str] = {
+    **{key: key for key in SECTION_HEADER_KEYS},
+    **{key.encode(): key for key in SECTION_HEADER_KEYS},
+}
+# characters which may indent a boundary, as str and as byte values
+_INDENT = {*' \t\r\f\v', *b' \t\r\f\v'}
+_NEWLINE = {'\n', ord('\n')}
+
+Buffer = Union[str, bytes, bytearray, memoryview, mmap.mmap]
+
+
+class SectionSpan(NamedTuple):
+    """Offsets of one section, from its header line to the next section."""
+
+    kind: str
+    start: int
+    end: int
+
+
+class Boundaries(NamedTuple):
+    """Offsets of the parts of an mdoc file, see `scan_boundaries()`."""
+
+    header: Tuple[int, int]
+    titles: List[Tuple[int, int]]
+    sections: List[SectionSpan]
+
 
 def camel_to_snake(word: str) -> str:
     return camel_to_snake_regex.sub('_', word).lower()
 
 
+def is_missing(value: Any) -> bool:
+    """Whether a value from a dataframe cell marks a missing entry."""
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
 def find_section_entries(lines: List[str]) -> List[int]:
     """Find the strings which contains a section entry header."""
     section_idx = [
         idx
         for idx, line
         in enumerate(lines)
-        if (
-            line.startswith('[ZValue =')
-            or line.startswith('[MontSection =')
-            or line.startswith('[FrameSet =')
-        )
+        if line.startswith(SECTION_PREFIXES)
     ]
 
     return section_idx
@@ -28,6 +71,83 @@ def find_title_entries(lines: List[str]) -> List[int]:
     """Find mdoc title entries in a list of strings"""
     title_idxs = []
     for idx, line in enumerate(lines):
-        if line.startswith('[T ='):
+        if line.startswith(TITLE_PREFIX):
             title_idxs.append(idx)
     return title_idxs
+
+
+def _line_start(buffer: Buffer, pos: int) -> Optional[int]:
+    """Start of the line containing pos if only indentation precedes pos."""
+    while pos > 0 and buffer[pos - 1] in _INDENT:
+        pos -= 1
+    if pos == 0 or buffer[pos - 1] in _NEWLINE:
+        return pos
+    return None
+
+
+def scan_boundaries(buffer: Buffer) -> Boundaries:
+    """Find the header, titles and sections of mdoc data in a single pass.
+
+    Works on text or raw bytes, including memory mapped files, without
+    splitting lines. Section headers and titles may be indented and lines may
+    end in CRLF.
+
+    Parameters
+    ----------
+    buffer : Buffer
+        mdoc file contents as str, bytes or any bytes-like object
+
+    Returns
+    -------
+    boundaries : Boundaries
+        `header` span up to the first section, `titles` spans of the title
+        lines in the header, including surrounding whitespace, and `sections`
+        spans with the section header kind, e.g. 'ZValue'
+    """
+    regex = boundary_regex if isinstance(buffer, str) else boundary_regex_bytes
+    titles = []
+    starts = []
+    kinds = []
+    for match in regex.finditer(buffer):
+        start = _line_start(buffer, match.start())
+        if start is None:
+            continue
+        kind = match.group(1)
+        if kind is not None:
+            starts.append(start)
+            kinds.append(_SECTION_KINDS[kind])
+        elif not starts:
+            titles.append((start, match.end()))
+    header_end = starts[0] if starts else len(buffer)
+    sections = [
+        SectionSpan(kind, start, end)
+        for kind, start, end in zip(kinds, starts, [*starts[1:], len(buffer)])
+    ]
+    return Boundaries(header=(0, header_end), titles=titles, sections=sections)
+
+
+def decode(buffer: Buffer, start: int, end: int) -> str:
+    """Text of a span of a buffer, decoding bytes as utf-8."""
+    chunk = buffer[start:end]
+    return chunk if isinstance(chunk, str) else str(chunk, 'utf-8')
+
+
+def split_lines(buffer: Buffer, start: int, end: int) -> List[str]:
+    """Stripped lines of a span of a buffer."""
+    return [line.strip() for line in decode(buffer, start, end).split('\n')]
+
+
+@contextmanager
+def open_buffer(filename: PathLike, use_mmap: bool = False) -> Iterator[Buffer]:
+    """Contents of a file as bytes or, with `use_mmap`, as a read-only mmap."""
+    with open(filename, 'rb') as file:
+        if not use_mmap:
+            yield file.read()
+            return
+        try:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty files cannot be mapped
+            yield b''
+            return
+        with buffer:
+            yield buffer
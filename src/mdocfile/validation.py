@@ -0,0 +1,189 @@
+"""Validation of many mdoc files into a structured report of problems.
+
+Files are checked line by line with the fast converters, values they reject
+are checked again with pydantic so that only values which fail validation are
+reported. All problems of a file are collected instead of raising on the first,
+each with its line number, section, key, raw value and expected type.
+"""
+import logging
+from os import PathLike
+from typing import Any, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+import pandas as pd
+from pydantic import ValidationError
+
+from mdocfile.data_models import (
+    GLOBAL_FIELD_TABLE,
+    SECTION_FIELD_TABLE,
+    MdocGlobalData,
+    MdocSectionData,
+)
+from mdocfile.functions import EXECUTORS, find_mdoc_files
+from mdocfile.utils import (
+    TITLE_PREFIX,
+    Buffer,
+    open_buffer,
+    scan_boundaries,
+    split_lines,
+)
+
+log = logging.getLogger('mdocfile')
+
+REPORT_COLUMNS = (
+    'file', 'line', 'section_kind', 'section', 'key', 'value', 'expected', 'message'
+)
+
+
+class Problem(NamedTuple):
+    """A problem found in an mdoc file, one row of a validation report."""
+
+    file: str
+    line: Optional[int]
+    section_kind: Optional[str]
+    section: Optional[str]
+    key: Optional[str]
+    value: Optional[str]
+    expected: Optional[str]
+    message: str
+
+
+def _type_name(annotation: Any) -> str:
+    """Readable name of a field annotation, e.g. 'Tuple[float, float]'."""
+    name = str(annotation).replace('typing.', '').replace('pathlib.', '')
+    if name.startswith('Optional[') and name.endswith(']'):
+        name = name[len('Optional['):-1]
+    return name.replace("<class '", '').replace("'>", '')
+
+
+def _check_value(model, table, key: str, value: str) -> Optional[Tuple[str, str]]:
+    """Expected type and error message if a value fails validation."""
+    field_name = table.aliases.get(key, key)
+    converter = table.converters.get(field_name)
+    if converter is None:
+        return None  # unknown fields are kept as strings
+    try:
+        converter(value)
+        return None
+    except (ValueError, TypeError, KeyError):
+        pass
+    # the fast converters are stricter than pydantic, e.g. on non-ascii digits
+    try:
+        model.model_validate({key: value})
+        return None
+    except ValidationError as e:
+        message = e.errors()[0]['msg']
+    return _type_name(model.model_fields[field_name].annotation), message
+
+
+def check_buffer(buffer: Buffer, filename: str = '') -> Tuple[int, List[Problem]]:
+    """Check mdoc text or bytes, collecting all problems.
+
+    Returns
+    -------
+    n_sections : int
+        number of sections in the data
+    problems : List[Problem]
+        problems in file order, empty if the data is valid
+    """
+    problems = []
+    boundaries = scan_boundaries(buffer)
+    blocks = [(None, *boundaries.header), *boundaries.sections]
+    newline = '\n' if isinstance(buffer, str) else b'\n'
+    line_number = 1
+    previous_start = 0
+    for kind, start, end in blocks:
+        line_number += buffer.count(newline, previous_start, start)
+        previous_start = start
+        lines = split_lines(buffer, start, end)
+        if kind is None:
+            model, table, section = MdocGlobalData, GLOBAL_FIELD_TABLE, None
+        else:
+            model, table = MdocSectionData, SECTION_FIELD_TABLE
+            section = lines[0].strip('[]').partition('=')[2].strip()
+            try:
+                int(section)
+            except ValueError:
+                problems.append(Problem(
+                    filename, line_number, kind, section, kind, section, 'int',
+                    'section header should be a whole number',
+                ))
+            lines[0] = ''
+        for idx, line in enumerate(lines):
+            if not line or line.startswith(TITLE_PREFIX):
+                continue
+            key, separator, value = line.partition('=')
+            if not separator:
+                problems.append(Problem(
+                    filename, line_number + idx, kind, section, None, line,
+                    'key = value', 'line is not a key value pair',
+                ))
+                continue
+            key, value = key.strip(), value.strip()
+            failure = _check_value(model, table, key, value)
+            if failure is not None:
+                problems.append(Problem(
+                    filename, line_number + idx, kind, section, key, value, *failure
+                ))
+    return len(boundaries.sections), problems
+
+
+def check_file(filename: PathLike) -> Tuple[int, List[Problem]]:
+    """Check an mdoc file, collecting all problems, see `check_buffer()`.
+
+    Files which cannot be read or decoded are reported as a single problem.
+    """
+    try:
+        with open_buffer(filename) as buffer:
+            return check_buffer(buffer, str(filename))
+    except (OSError, UnicodeDecodeError) as e:
+        message = ' '.join(f'{type(e).__name__}: {e}'.split())
+        return 0, [Problem(str(filename), None, None, None, None, None, None, message)]
+
+
+def validate(
+    paths: Union[PathLike, str, Iterable[PathLike]],
+    workers: Optional[int] = None,
+    executor: str = 'process',
+) -> pd.DataFrame:
+    """Validate many mdoc files into a report of all problems found.
+
+    Parameters
+    ----------
+    paths : PathLike | str | Iterable[PathLike]
+        glob pattern, directory containing mdoc files or sequence of mdoc files
+    workers : Optional[int]
+        maximum number of concurrent workers, defaults to the executor default
+    executor : str
+        'process' or 'thread'
+
+    Returns
+    -------
+    report : pd.DataFrame
+        one row per problem with the columns in `REPORT_COLUMNS`, empty if
+        all files are valid. `report.attrs['n_files']` and
+        `report.attrs['n_invalid']` count the files checked and those with
+        problems, `report.attrs['n_sections']` maps files to their number
+        of sections.
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(
+            f"executor must be one of {tuple(EXECUTORS)}, got '{executor}'"
+        )
+    filenames = find_mdoc_files(paths)
+    problems: List[Problem] = []
+    n_sections = {}
+    n_invalid = 0
+    with EXECUTORS[executor](max_workers=workers) as pool:
+        chunksize = max(1, len(filenames) // (8 * (workers or 8)))
+        results = pool.map(check_file, filenames, chunksize=chunksize)
+        for filename, (n, file_problems) in zip(filenames, results):
+            n_sections[str(filename)] = n
+            if file_problems:
+                n_invalid += 1
+                problems.extend(file_problems)
+    report = pd.DataFrame(problems, columns=list(REPORT_COLUMNS))
+    report = report.astype({'line': 'Int64'})
+    report.attrs['n_files'] = len(filenames)
+    report.attrs['n_invalid'] = n_invalid
+    report.attrs['n_sections'] = n_sections
+    return report
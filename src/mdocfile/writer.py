@@ -0,0 +1,230 @@
+"""Column-wise formatting of mdoc dataframes.
+
+Each column of a dataframe is formatted once into 'key = value' lines, using
+the field annotations of the data models as a schema, and sections are streamed
+to a file handle. The output is identical to
+``Mdoc.from_dataframe(df).to_string()``, dataframes which cannot be formatted
+column-wise fall back to that path.
+"""
+import collections.abc
+from pathlib import Path, PureWindowsPath
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    get_args,
+    get_origin,
+)
+
+import pandas as pd
+
+from mdocfile.data_models import (
+    SECTION_FIELD_TABLE,
+    Mdoc,
+    MdocGlobalData,
+    MdocSectionData,
+)
+from mdocfile.derived import DERIVED_COLUMNS
+from mdocfile.utils import SECTION_HEADER_KEYS, is_missing
+
+
+class UnsupportedValue(ValueError):
+    """Raised when a value cannot be formatted without model validation."""
+
+
+def _format_float(value: Any) -> str:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise UnsupportedValue(value)
+    return str(float(value))
+
+
+def _format_int(value: Any) -> str:
+    if isinstance(value, bool):
+        raise UnsupportedValue(value)
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if not isinstance(value, int):
+        raise UnsupportedValue(value)
+    return str(value)
+
+
+def _format_bool(value: Any) -> str:
+    if isinstance(value, int) and value in (0, 1):
+        return str(bool(value))
+    raise UnsupportedValue(value)
+
+
+def _format_str(value: Any) -> str:
+    if not isinstance(value, str):
+        raise UnsupportedValue(value)
+    return 'NaN' if value == 'nan' else value
+
+
+def _format_path(value: Any) -> str:
+    if isinstance(value, str):
+        return str(PureWindowsPath(value))
+    if isinstance(value, (PureWindowsPath, Path)):
+        return str(value)
+    raise UnsupportedValue(value)
+
+
+def _tuple_formatter(element_formatters: List[Callable]) -> Callable:
+    def format_tuple(value: Any) -> str:
+        if not isinstance(value, (tuple, list)):
+            raise UnsupportedValue(value)
+        if len(value) != len(element_formatters):
+            raise UnsupportedValue(value)
+        return ' '.join(f(el) for f, el in zip(element_formatters, value))
+    return format_tuple
+
+
+def _union_formatter(options: List[Callable]) -> Callable:
+    def format_union(value: Any) -> str:
+        for option in options:
+            try:
+                return option(value)
+            except UnsupportedValue:
+                continue
+        raise UnsupportedValue(value)
+    return format_union
+
+
+def _format_frame_doses_and_numbers(value: Any) -> str:
+    if not isinstance(value, list):
+        raise UnsupportedValue(value)
+    return ' '.join(f'{_format_float(d)} {_format_int(n)}' for d, n in value)
+
+
+def _format_extra(value: Any) -> str:
+    if isinstance(value, tuple):
+        return ' '.join(str(el) for el in value)
+    if isinstance(value, str) and value == 'nan':
+        return 'NaN'
+    return f'{value}'
+
+
+_SCALAR_FORMATTERS = {
+    float: _format_float,
+    int: _format_int,
+    bool: _format_bool,
+    str: _format_str,
+}
+
+
+def compile_formatter(annotation: Any) -> Callable[[Any], str]:
+    """Derive a formatter for validated values of a field annotation."""
+    if annotation in _SCALAR_FORMATTERS:
+        return _SCALAR_FORMATTERS[annotation]
+    origin, args = get_origin(annotation), get_args(annotation)
+    if origin is Union:
+        args = tuple(arg for arg in args if arg is not type(None))
+        if set(args) <= {Path, PureWindowsPath}:
+            return _format_path
+        options = [compile_formatter(arg) for arg in args]
+        return options[0] if len(options) == 1 else _union_formatter(options)
+    if origin is tuple and Ellipsis not in args:
+        return _tuple_formatter([compile_formatter(arg) for arg in args])
+    if origin is collections.abc.Sequence:
+        return _format_frame_doses_and_numbers
+    raise TypeError(f'no formatter for {annotation}')
+
+
+SECTION_FORMATTERS = {
+    name: compile_formatter(info.annotation)
+    for name, info in MdocSectionData.model_fields.items()
+}
+SECTION_ALIASES = SECTION_FIELD_TABLE.aliases
+SKIPPED_COLUMNS = (
+    set(MdocGlobalData.model_fields.keys()) | {'titles'} | set(DERIVED_COLUMNS)
+)
+
+
+def _format_column(
+    key: str, values: list, formatter: Callable[[Any], str]
+) -> List[Optional[str]]:
+    return [
+        None if is_missing(value) else f'{key} = {formatter(value)}'
+        for value in values
+    ]
+
+
+def _format_headers(
+    df: pd.DataFrame, fields: Dict[str, str]
+) -> Tuple[List[str], List[str]]:
+    header_keys = ['ZValue'] * len(df)
+    header_values: List[Any] = [None] * len(df)
+    for key in reversed(SECTION_HEADER_KEYS):
+        if key not in fields:
+            continue
+        for idx, value in enumerate(df[fields[key]].tolist()):
+            if not is_missing(value):
+                header_keys[idx] = key
+                header_values[idx] = value
+    headers = [
+        f'[{key} = {None if value is None else _format_int(value)}]'
+        for key, value in zip(header_keys, header_values)
+    ]
+    return header_keys, headers
+
+
+def format_sections(df: pd.DataFrame) -> List[List[Optional[str]]]:
+    """Format section data column-wise into 'key = value' lines.
+
+    Returns
+    -------
+    columns : List[List[Optional[str]]]
+        the section header column followed by one column of lines per key,
+        None where a key is omitted from a section
+    """
+    skipped = SKIPPED_COLUMNS | set(df.attrs.get('global_extra_fields', []))
+    section_columns = [k for k in df.columns if k not in skipped]
+    fields: Dict[str, str] = {}
+    for column in section_columns:
+        field_name = SECTION_ALIASES.get(column, column)
+        if field_name in fields:
+            raise UnsupportedValue(f'{column} given more than once')
+        fields[field_name] = column
+
+    header_keys, headers = _format_headers(df, fields)
+    columns = [headers]
+    for field_name, formatter in SECTION_FORMATTERS.items():
+        if field_name not in fields:
+            continue
+        values = df[fields[field_name]].tolist()
+        if field_name in SECTION_HEADER_KEYS:
+            values = [
+                None if header_key == field_name else value
+                for header_key, value in zip(header_keys, values)
+            ]
+        columns.append(_format_column(fields[field_name], values, formatter))
+    for field_name, column in fields.items():
+        if field_name not in SECTION_FORMATTERS:
+            values = df[column].tolist()
+            columns.append(_format_column(column, values, _format_extra))
+    return columns
+
+
+def write_dataframe(df: pd.DataFrame, file: IO[str]) -> None:
+    """Write a dataframe, e.g. from `Mdoc.to_dataframe()`, to an open mdoc file."""
+    try:
+        titles = df['titles'].iloc[0]
+        if not all(isinstance(title, str) for title in titles):
+            raise UnsupportedValue(titles)
+        columns = format_sections(df)
+    except (UnsupportedValue, TypeError, ValueError, KeyError):
+        file.write(Mdoc.from_dataframe(df).to_string())
+        return
+
+    file.write(MdocGlobalData.from_dataframe(df).to_string())
+    file.write('\n\n')
+    file.write('\n\n'.join(titles))
+    file.write('\n\n')
+    for idx, lines in enumerate(zip(*columns)):
+        if idx > 0:
+            file.write('\n\n')
+        file.write('\n'.join(line for line in lines if line is not None))
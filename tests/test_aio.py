@@ -0,0 +1,64 @@
+import asyncio
+import shutil
+import threading
+
+import pandas as pd
+
+from mdocfile import aio, read, read_many
+
+
+def test_aio_read(tilt_series_mdoc_file):
+    df = asyncio.run(aio.read(tilt_series_mdoc_file, engine='fast'))
+    pd.testing.assert_frame_equal(df, read(tilt_series_mdoc_file))
+
+
+def test_aio_read_many_matches_read_many(tilt_series_mdoc_file, tmp_path):
+    (tmp_path / 'broken.mdoc').write_text('[ZValue = not a number]\n')
+    paths = [tilt_series_mdoc_file, tmp_path / 'broken.mdoc', tilt_series_mdoc_file]
+    df = asyncio.run(aio.read_many(paths, add_tilt_series_id=True))
+    expected = read_many(paths, add_tilt_series_id=True)
+    pd.testing.assert_frame_equal(df, expected)
+    assert list(df.attrs['read_errors']) == [str(tmp_path / 'broken.mdoc')]
+
+
+class InFlightReader:
+    """Reader which records the maximum number of concurrent reads."""
+
+    def __init__(self, read_text, barrier=None):
+        self.read_text = read_text
+        self.barrier = barrier
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def __call__(self, filename):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.barrier is not None:
+                # only passes once `parties` reads are in flight at the same time
+                self.barrier.wait(timeout=30)
+            return self.read_text(filename)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+def test_aio_read_many_overlaps_io(tilt_series_mdoc_file, tmp_path, monkeypatch):
+    paths = []
+    for idx in range(8):
+        paths.append(tmp_path / f'TS_{idx:02d}.mdoc')
+        shutil.copy(tilt_series_mdoc_file, paths[-1])
+
+    reader = InFlightReader(aio._read_text, barrier=threading.Barrier(4))
+    monkeypatch.setattr(aio, '_read_text', reader)
+    df = asyncio.run(aio.read_many(paths, max_concurrency=4, engine='fast'))
+    assert df.attrs['read_errors'] == {}
+    assert df['source_file'].nunique() == 8
+    assert reader.max_in_flight == 4
+
+    reader = InFlightReader(aio._read_text.read_text)
+    monkeypatch.setattr(aio, '_read_text', reader)
+    asyncio.run(aio.read_many(paths, max_concurrency=1, engine='fast'))
+    assert reader.max_in_flight == 1
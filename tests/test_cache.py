@@ -0,0 +1,66 @@
+import json
+import os
+import shutil
+import stat
+from pathlib import PureWindowsPath
+
+import pandas as pd
+
+from mdocfile import MdocCache, read
+
+
+def test_cache_hit_and_invalidation(tilt_series_mdoc_file, tmp_path):
+    mdoc_file = tmp_path / 'TS_01.mrc.mdoc'
+    shutil.copy(tilt_series_mdoc_file, mdoc_file)
+    cache = MdocCache(tmp_path / 'cache')
+
+    df = read(mdoc_file, cache=cache)
+    assert (cache.hits, cache.misses) == (0, 1)
+    cached = read(mdoc_file, cache=cache)
+    assert (cache.hits, cache.misses) == (1, 1)
+    pd.testing.assert_frame_equal(cached, df)
+
+    # appending a section changes the key
+    with open(mdoc_file, 'a') as f:
+        f.write('\n[ZValue = 41]\nTiltAngle = 60.0\n')
+    df = read(mdoc_file, cache=cache)
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert len(df) == 42
+
+
+def test_cache_evicts_least_recently_used(
+    tilt_series_mdoc_file, frame_set_single_mdoc_file, tmp_path
+):
+    cache = MdocCache(tmp_path / 'cache')
+    read(frame_set_single_mdoc_file, cache=cache)
+    os.utime(cache._entry(cache.key(frame_set_single_mdoc_file)), (0, 0))
+    read(tilt_series_mdoc_file, cache=cache)
+    assert len(cache._entries()) == 2
+
+    cache.max_bytes = cache.size() - 1
+    cache.evict()
+    assert cache.get(frame_set_single_mdoc_file) is None
+    assert cache.get(tilt_series_mdoc_file) is not None
+
+    cache.clear()
+    assert cache.size() == 0
+
+
+def test_cache_entries_are_json(frame_set_multiple_mdoc_file, tmp_path):
+    cache = MdocCache(tmp_path / 'cache')
+    df = read(frame_set_multiple_mdoc_file, cache=cache)
+    assert stat.S_IMODE(os.stat(cache.directory).st_mode) == 0o700
+    entry = cache._entry(cache.key(frame_set_multiple_mdoc_file))
+    data = json.loads(entry.read_text())
+    assert data['key'] == cache.key(frame_set_multiple_mdoc_file)
+
+    cached = cache.get(frame_set_multiple_mdoc_file)
+    pd.testing.assert_frame_equal(cached, df)
+    assert cached.attrs == df.attrs
+    assert cached['StagePosition'].iloc[0] == df['StagePosition'].iloc[0]
+    assert isinstance(cached['SubFramePath'].iloc[0], PureWindowsPath)
+
+    # entries of other files are not used
+    data['key'] = 'other'
+    entry.write_text(json.dumps(data))
+    assert cache.get(frame_set_multiple_mdoc_file) is None
@@ -0,0 +1,110 @@
+import json
+import shutil
+
+import pandas as pd
+import pytest
+
+from mdocfile import read
+from mdocfile.cli import main
+
+
+@pytest.fixture
+def session_dir(tmp_path, tilt_series_mdoc_file, frame_set_multiple_mdoc_file):
+    directory = tmp_path / 'session'
+    directory.mkdir()
+    shutil.copy(tilt_series_mdoc_file, directory)
+    shutil.copy(frame_set_multiple_mdoc_file, directory)
+    return directory
+
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_summary(session_dir, capsys, jobs):
+    assert main(['summary', str(session_dir), '--jobs', jobs]) == 0
+    header, *rows = capsys.readouterr().out.splitlines()
+    assert header.split('\t')[:2] == ['file', 'sections']
+    assert [row.split('\t')[1] for row in rows] == ['21', '41']
+    assert rows[1].split('\t')[2:5] == ['-59.9986', '60.0006', '5.4']
+
+
+def test_to_csv(session_dir, tmp_path, tilt_series_mdoc_file, capsys):
+    out_dir = tmp_path / 'csv'
+    assert main(['to-csv', str(session_dir / '*.mdoc'), '-o', str(out_dir)]) == 0
+    assert capsys.readouterr().out.split() == [
+        str(out_dir / 'frame_set_multiple.csv'), str(out_dir / 'tilt_series.csv')
+    ]
+    df = pd.read_csv(out_dir / 'tilt_series.csv')
+    expected = read(tilt_series_mdoc_file, compact=True)
+    assert len(df) == len(expected)
+    pd.testing.assert_series_equal(df['StagePosition_x'], expected['StagePosition_x'])
+
+
+def test_to_json(tilt_series_mdoc_file, tmp_path):
+    assert main(['to-json', str(tilt_series_mdoc_file), '-o', str(tmp_path)]) == 0
+    records = json.loads((tmp_path / 'tilt_series.json').read_text())
+    assert len(records) == 41
+    assert records[0]['StagePosition'] == [20.7936, 155.287]
+
+
+def test_filter(tilt_series_mdoc_file, tmp_path, capsys):
+    args = [
+        'filter', str(tilt_series_mdoc_file), '--tilt-range', '-31', '31',
+        '--renumber', '-o', str(tmp_path),
+    ]
+    assert main(args) == 0
+    assert capsys.readouterr().out.split('\t')[1].strip() == '21/41 sections kept'
+    df = read(tmp_path / 'tilt_series.mdoc')
+    assert df['TiltAngle'].abs().max() <= 31
+    assert df['ZValue'].tolist() == list(range(21))
+
+
+@pytest.mark.parametrize(
+    'fixture', ['montage_section_multiple_mdoc_file', 'frame_set_multiple_mdoc_file']
+)
+def test_filter_renumber_keeps_section_kinds(fixture, request, tmp_path):
+    filename = request.getfixturevalue(fixture)
+    args = ['filter', str(filename), '--renumber', '-o', str(tmp_path)]
+    assert main(args) == 0
+    expected = read(filename)
+    df = read(tmp_path / filename.name)
+    is_z_section = expected['ZValue'].notna()
+    assert df['ZValue'].notna().tolist() == is_z_section.tolist()
+    assert df['ZValue'].dropna().tolist() == list(range(is_z_section.sum()))
+    for column in ('MontSection', 'FrameSet'):
+        if column in expected:
+            pd.testing.assert_series_equal(df[column], expected[column])
+    text = (tmp_path / filename.name).read_text()
+    assert '\nMontSection =' not in text and '\nFrameSet =' not in text
+
+
+def test_filter_in_place(session_dir):
+    filename = session_dir / 'tilt_series.mdoc'
+    expected = read(filename)
+    expected = expected[expected['MinMaxMean'].str[2] >= 200]
+    args = ['filter', str(filename), '--mean-range', '200', '1e9', '--in-place']
+    assert main(args) == 0
+    df = read(filename)
+    assert df['TiltAngle'].tolist() == expected['TiltAngle'].tolist()
+    assert not list(session_dir.glob('*.tmp'))
+
+
+def test_to_parquet_reports_failures(session_dir, tmp_path, capsys):
+    pytest.importorskip('pyarrow')
+    (session_dir / 'broken.mdoc').write_text('[ZValue = 0]\nTiltAngle = abc\n')
+    output = tmp_path / 'dataset'
+    assert main(['to-parquet', str(session_dir), '--output', str(output)]) == 1
+    captured = capsys.readouterr()
+    [error] = captured.err.splitlines()
+    assert error.startswith(f"mdocfile: {session_dir / 'broken.mdoc'}: ")
+    assert 'validation error' in error
+    assert captured.out.splitlines() == [str(output)]
+    assert pd.read_parquet(output)['source_file'].nunique() == 2
+
+
+def test_validate(session_dir, capsys):
+    (session_dir / 'broken.mdoc').write_text('[ZValue = 0]\nTiltAngle = abc\n')
+    assert main(['validate', str(session_dir), str(session_dir / 'missing.mdoc')]) == 1
+    captured = capsys.readouterr()
+    status = [line.split('\t')[1] for line in captured.out.splitlines()]
+    assert status == ['INVALID', 'OK', 'OK']
+    assert "line 2: TiltAngle = 'abc': expected float" in captured.out
+    assert 'missing.mdoc: no such file' in captured.err
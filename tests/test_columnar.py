@@ -0,0 +1,67 @@
+from pathlib import Path, PureWindowsPath
+
+import pandas as pd
+import pytest
+
+from mdocfile.columnar import SECTION_SCHEMA, read_string, tokenize
+from mdocfile.data_models import Mdoc
+
+MDOC_EXAMPLE = """PixelSpacing = 5.4
+ImageFile = TS_01.mrc
+ImageSize = 924 958
+
+[T = SerialEM: Digitized on EMBL Krios]
+
+[ZValue = 0]
+TiltAngle = 0.5
+StagePosition = 20.7936 155.287
+DividedBy2 = 1
+SubFramePath = D:\\DATA\\TS_01_000_0.0.mrc
+FrameDosesAndNumber = 2.5 10 3.0 20
+UnknownCustomField = some_value
+
+[ZValue = 1]
+TiltAngle = 3.0
+XedgeDxy = 1 2 3
+TiltAngle = 3.5
+"""
+
+
+def test_tokenize():
+    titles, global_data, columns, n_sections = tokenize(MDOC_EXAMPLE)
+    assert titles == ['[T = SerialEM: Digitized on EMBL Krios]']
+    assert global_data == {
+        'PixelSpacing': '5.4', 'ImageFile': 'TS_01.mrc', 'ImageSize': '924 958'
+    }
+    assert n_sections == 2
+    assert columns['ZValue'] == ['0', '1']
+    assert columns['TiltAngle'] == ['0.5', '3.5']
+    assert columns['UnknownCustomField'] == ['some_value', None]
+
+
+def test_schema_covers_all_section_fields():
+    converters = SECTION_SCHEMA
+    assert converters['SubFramePath']('a\\b.tif') == PureWindowsPath('a\\b.tif')
+    assert converters['PieceCoordinates']('1 2 3') == (1.0, 2.0, 3)
+    assert converters['XedgeDxy']('1 2') == (1.0, 2.0)
+    assert converters['XedgeDxy']('1 2 3') == (1.0, 2.0, 3.0)
+    assert converters['DividedBy2']('0') is False
+
+
+def test_read_string_matches_pydantic_engine():
+    expected = Mdoc.from_string(MDOC_EXAMPLE).to_dataframe()
+    df = read_string(MDOC_EXAMPLE)
+    pd.testing.assert_frame_equal(df, expected)
+    assert df['ImageFile'].iloc[0] == Path('TS_01.mrc')
+    assert df['FrameDosesAndNumber'].iloc[0] == [(2.5, 10), (3.0, 20)]
+
+
+def test_read_string_falls_back_on_invalid_values():
+    with pytest.raises(ValueError):
+        read_string(MDOC_EXAMPLE.replace('TiltAngle = 0.5', 'TiltAngle = abc'))
+
+
+def test_read_string_crlf(tilt_series_mdoc_string):
+    expected = read_string(tilt_series_mdoc_string)
+    df = read_string(tilt_series_mdoc_string.replace('\n', '\r\n'))
+    assert df.equals(expected)
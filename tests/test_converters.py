@@ -0,0 +1,29 @@
+import pytest
+from pydantic import ValidationError
+
+from mdocfile.converters import ConversionError
+from mdocfile.data_models import SECTION_FIELD_TABLE, MdocSectionData
+
+INT_VALUES = [
+    '1', '-3', '+4', '1_000', '1.0', '-3.000', '00.0', '-0.0',
+    '2.', '1e3', '1.5', '1.0000000000000001', '.0', '0x10', 'nan', 'inf', '',
+]
+
+
+@pytest.mark.parametrize('value', INT_VALUES)
+def test_int_converter_matches_pydantic(value):
+    try:
+        expected = MdocSectionData(MagIndex=value).MagIndex
+    except ValidationError:
+        expected = None
+    convert = SECTION_FIELD_TABLE.converters['MagIndex']
+    if expected is None:
+        with pytest.raises(ValueError):
+            convert(value)
+    else:
+        assert convert(value) == expected
+
+
+def test_int_converter_raises_conversion_error():
+    with pytest.raises(ConversionError):
+        SECTION_FIELD_TABLE.converters['MagIndex']('1e3')
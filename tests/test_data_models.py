@@ -1,6 +1,9 @@
 from pathlib import Path, PureWindowsPath
 from tempfile import NamedTemporaryFile
 
+import pytest
+from pydantic import ValidationError
+
 from mdocfile.data_models import MdocGlobalData, MdocSectionData, Mdoc
 
 GLOBAL_DATA_EXAMPLE = r"""PixelSpacing = 5.4
@@ -189,3 +192,57 @@ UnknownCustomField = some_value
     mdoc2 = Mdoc.from_dataframe(df)
     assert mdoc2.section_data[0].model_extra['CountsPerElectron'] == '42.0'
     assert mdoc2.section_data[0].model_extra['UnknownCustomField'] == 'some_value'
+
+
+def test_mdoc_from_dataframe(tilt_series_mdoc_file):
+    mdoc = Mdoc.from_file(tilt_series_mdoc_file)
+    mdoc2 = Mdoc.from_dataframe(mdoc.to_dataframe())
+    assert mdoc2.titles == mdoc.titles
+    assert mdoc2.section_data[3].TiltAngle == mdoc.section_data[3].TiltAngle
+    assert mdoc2.section_data[3].SubFramePath == mdoc.section_data[3].SubFramePath
+
+
+def test_mdoc_open_lazy(montage_section_multiple_mdoc_file):
+    mdoc = Mdoc.from_file(montage_section_multiple_mdoc_file)
+    lazy_mdoc = Mdoc.open(montage_section_multiple_mdoc_file, lazy=True)
+    assert lazy_mdoc.titles == mdoc.titles
+    assert lazy_mdoc.global_data == mdoc.global_data
+    assert lazy_mdoc.section_data._spans is None  # nothing indexed yet
+
+    assert len(lazy_mdoc.section_data) == len(mdoc.section_data)
+    assert lazy_mdoc.section_data[-1] == mdoc.section_data[-1]
+    assert lazy_mdoc.section_data[2:4] == mdoc.section_data[2:4]
+    assert len(lazy_mdoc.section_data._sections) == 3
+    assert lazy_mdoc.to_dataframe().equals(mdoc.to_dataframe())
+
+
+def test_mdoc_open_lazy_serialises(frame_set_multiple_mdoc_file):
+    mdoc = Mdoc.from_file(frame_set_multiple_mdoc_file)
+    lazy_mdoc = Mdoc.open(frame_set_multiple_mdoc_file, lazy=True)
+    assert lazy_mdoc.model_dump() == mdoc.model_dump()
+    assert lazy_mdoc.model_dump_json() == mdoc.model_dump_json()
+    assert lazy_mdoc.to_string() == mdoc.to_string()
+
+
+@pytest.mark.parametrize('mdoc_file', [
+    'tilt_series_mdoc_file',
+    'montage_section_multiple_mdoc_file',
+    'frame_set_multiple_mdoc_file',
+])
+def test_section_data_from_lines_matches_validation(mdoc_file, request):
+    mdoc = Mdoc.from_file(request.getfixturevalue(mdoc_file))
+    for section in mdoc.section_data:
+        data = {**section.model_dump(exclude_none=True), **section.model_extra}
+        validated = MdocSectionData(**data)
+        validated._used_aliases = section._used_aliases
+        assert section == validated
+        assert section.model_fields_set == validated.model_fields_set
+        assert section.model_extra == validated.model_extra
+
+
+def test_section_data_from_lines_malformed_value():
+    with pytest.raises(ValidationError, match='StagePosition'):
+        MdocSectionData.from_lines(['[ZValue = 0]', 'StagePosition = 1 2 3'])
+    with pytest.raises(ValidationError, match='TiltAngle'):
+        # fullwidth digit one
+        MdocSectionData.from_lines(['[ZValue = 0]', 'TiltAngle = \uff11'])
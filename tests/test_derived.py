@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mdocfile import read, read_many, write
+from mdocfile.data_models import Mdoc
+from mdocfile.derived import DERIVED_COLUMNS, derive, parse_datetimes
+
+
+def test_parse_datetimes():
+    timestamps = parse_datetimes(
+        ['30-Nov-15  15:21:38', None, '08-Oct-21 07:47:29', 'not a date']
+    )
+    assert timestamps[0] == pd.Timestamp('2015-11-30 15:21:38')
+    assert timestamps[2] == pd.Timestamp('2021-10-08 07:47:29')
+    assert timestamps[[1, 3]].isna().all()
+
+
+def test_parse_datetimes_other_format():
+    timestamps = parse_datetimes(['30-Nov-2015 15:21:38'])
+    assert timestamps[0] == pd.Timestamp('2015-11-30 15:21:38')
+
+
+@pytest.mark.parametrize('engine', ['pydantic', 'fast'])
+def test_read_derive(tilt_series_mdoc_file, engine):
+    df = read(tilt_series_mdoc_file, engine=engine, derive=True)
+    assert set(DERIVED_COLUMNS[:4]) <= set(df.columns)
+    assert df['Timestamp'].is_monotonic_increasing
+    assert df['AcquisitionOrder'].tolist() == list(range(len(df)))
+    np.testing.assert_allclose(df['CumulativeDose'], 0)
+
+
+def test_acquisition_order_and_dose():
+    df = pd.DataFrame({
+        'ZValue': [0, 1, 2],
+        'DateTime': ['01-Jan-21 10:00:10', '01-Jan-21 10:00:00', None],
+        'ExposureDose': [2.0, 3.0, 1.0],
+    })
+    df = derive(df)
+    assert df['AcquisitionOrder'].tolist() == [1, 0, 2]
+    assert df['PriorDose'].tolist() == [3.0, 0.0, 5.0]
+    assert df['CumulativeDose'].tolist() == [5.0, 3.0, 6.0]
+
+
+def test_prior_record_dose(frame_set_multiple_mdoc_file):
+    df = Mdoc.from_file(frame_set_multiple_mdoc_file).derived()
+    tilts = df[df['ZValue'].notna()]
+    np.testing.assert_allclose(tilts['PriorDose'], tilts['PriorRecordDose'])
+    np.testing.assert_allclose(
+        tilts['CumulativeDose'], tilts['PriorRecordDose'] + tilts['ExposureDose']
+    )
+
+
+def test_frame_doses(frame_set_multiple_mdoc_file):
+    df = read(frame_set_multiple_mdoc_file, derive=True)
+    frame_doses = df['FrameDoses'][0]
+    assert len(frame_doses) == 243
+    np.testing.assert_allclose(frame_doses, 0.63882)
+    assert df['FrameDoses'][1:].isna().all()
+
+    df = derive(pd.DataFrame({
+        'FrameDosesAndNumbers': [[(0.5, 2), (1.0, 1)], None, [(2.0, 3)]],
+    }))
+    assert df['FrameDoses'][0].tolist() == [0.5, 0.5, 1.0]
+    assert df['FrameDoses'][1] is None
+    assert df['FrameDoses'][2].tolist() == [2.0, 2.0, 2.0]
+
+
+def test_derived_columns_are_not_written(tilt_series_mdoc_file, tmp_path):
+    write(read(tilt_series_mdoc_file), tmp_path / 'plain.mdoc')
+    write(read(tilt_series_mdoc_file, derive=True), tmp_path / 'derived.mdoc')
+    plain = (tmp_path / 'plain.mdoc').read_text()
+    assert (tmp_path / 'derived.mdoc').read_text() == plain
+
+
+def test_derived_columns_are_not_written_by_fallback(
+    frame_set_multiple_mdoc_file, tmp_path
+):
+    df = read(frame_set_multiple_mdoc_file, derive=True)
+    assert 'FrameDoses' in df
+    assert len(Mdoc.from_dataframe(df).section_data) == len(df)
+    # str tilt angles are not formatted column-wise, so the writer falls back
+    df['TiltAngle'] = df['TiltAngle'].astype(str)
+    write(df, tmp_path / 'derived.mdoc')
+    text = (tmp_path / 'derived.mdoc').read_text()
+    assert not any(f'{column} =' in text for column in DERIVED_COLUMNS)
+    expected = read(frame_set_multiple_mdoc_file)
+    assert len(read(tmp_path / 'derived.mdoc')) == len(expected)
+
+
+def test_read_many_derive(tmp_path, tilt_series_mdoc_file):
+    for name in ('TS_01.mdoc', 'TS_02.mdoc'):
+        (tmp_path / name).write_bytes(tilt_series_mdoc_file.read_bytes())
+    df = read_many(tmp_path, derive=True)
+    n_sections = len(df) // 2
+    # orders are per file
+    assert df['AcquisitionOrder'].tolist() == [*range(n_sections)] * 2
+
+
+def test_derive_with_chunksize_raises(tilt_series_mdoc_file):
+    with pytest.raises(ValueError):
+        read(tilt_series_mdoc_file, chunksize=10, derive=True)
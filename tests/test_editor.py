@@ -0,0 +1,103 @@
+import pytest
+
+from mdocfile import MdocEditor, edit_many, read
+from mdocfile.header import read_header
+
+
+@pytest.fixture
+def mdoc_file(tilt_series_mdoc_file, tmp_path):
+    filename = tmp_path / 'TS_01.mrc.mdoc'
+    filename.write_bytes(tilt_series_mdoc_file.read_bytes())
+    return filename
+
+
+def test_unedited_file_is_unchanged(mdoc_file):
+    data = mdoc_file.read_bytes()
+    assert MdocEditor(mdoc_file).to_bytes() == data
+
+
+def test_delete_and_renumber(mdoc_file):
+    expected = read(mdoc_file)
+    MdocEditor(mdoc_file).delete_sections([0, 40]).renumber().save()
+    df = read(mdoc_file)
+    assert df['ZValue'].tolist() == list(range(39))
+    assert df['TiltAngle'].tolist() == expected['TiltAngle'][1:40].tolist()
+
+
+def test_delete_sections_by_kind(frame_set_multiple_mdoc_file, tmp_path):
+    filename = tmp_path / 'frames.mdoc'
+    filename.write_bytes(frame_set_multiple_mdoc_file.read_bytes())
+    expected = read(filename)
+    MdocEditor(filename).delete_sections([0]).save()
+    df = read(filename)
+    assert len(df) == len(expected) - 1
+    assert df['FrameSet'].tolist()[:1] == [0]
+    assert 0 not in df['ZValue'].tolist()
+
+    MdocEditor(filename).delete_sections(('FrameSet', 0)).save()
+    df = read(filename)
+    assert len(df) == len(expected) - 2
+    assert 'FrameSet' not in df or df['FrameSet'].isna().all()
+
+
+def test_unedited_sections_are_copied(mdoc_file):
+    data = mdoc_file.read_bytes()
+    editor = MdocEditor(mdoc_file).delete_sections(slice(5, None))
+    editor.set_value('NavigatorLabel', 'A1', sections=2)
+    out = editor.to_bytes()
+    assert b'DateTime = 30-Nov-15  15:24:24\nNavigatorLabel = A1\n\n' in out
+    kept = data[:editor.entries[5].start].rstrip() + b'\n'
+    assert out.replace(b'\nNavigatorLabel = A1', b'') == kept
+
+
+def test_set_and_remove_keys(mdoc_file):
+    (
+        MdocEditor(mdoc_file)
+        .set_global('PixelSpacing', 1.35)
+        .set_global('Tilt axis', (85.3, 1))
+        .remove_global('DataMode')
+        .remove_key('MinMaxMean')
+        .set_value('Defocus', -3.0, sections=lambda s: s.number < 2)
+        .save()
+    )
+    header = read_header(mdoc_file)
+    assert header['PixelSpacing'] == 1.35
+    assert header['Tilt axis'] == '85.3 1'
+    assert 'DataMode' not in header
+    df = read(mdoc_file)
+    assert 'MinMaxMean' not in df
+    assert df['Defocus'][:3].tolist()[:2] == [-3.0, -3.0]
+    assert df['Defocus'][2] != -3.0
+
+
+def test_reorder(mdoc_file):
+    editor = MdocEditor(mdoc_file).delete_sections(slice(3, None))
+    editor.reorder_sections([2, 0, 1]).save()
+    df = read(mdoc_file)
+    assert df['ZValue'].tolist() == [2, 0, 1]
+    assert mdoc_file.read_bytes().endswith(b'\n')
+    with pytest.raises(ValueError):
+        MdocEditor(mdoc_file).reorder_sections([0, 1])
+
+
+def test_header_keys_cannot_be_set(mdoc_file):
+    with pytest.raises(ValueError):
+        MdocEditor(mdoc_file).set_value('ZValue', 3)
+
+
+def test_crlf(mdoc_file):
+    mdoc_file.write_bytes(mdoc_file.read_bytes().replace(b'\n', b'\r\n'))
+    MdocEditor(mdoc_file).set_value('NavigatorLabel', 'A1').save()
+    data = mdoc_file.read_bytes()
+    assert data.count(b'\n') == data.count(b'\r\n')
+    assert read(mdoc_file)['NavigatorLabel'].eq('A1').all()
+
+
+def test_edit_many(tilt_series_mdoc_file, tmp_path):
+    for name in ('TS_01.mdoc', 'TS_02.mdoc'):
+        (tmp_path / name).write_bytes(tilt_series_mdoc_file.read_bytes())
+    (tmp_path / 'broken.mdoc').mkdir()
+    errors = edit_many(tmp_path, lambda e: e.set_global('PixelSpacing', 2.7))
+    assert list(errors) == [str(tmp_path / 'broken.mdoc')]
+    for name in ('TS_01.mdoc', 'TS_02.mdoc'):
+        assert read_header(tmp_path / name)['PixelSpacing'] == 2.7
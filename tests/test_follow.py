@@ -0,0 +1,48 @@
+import asyncio
+
+from mdocfile import MdocFollower, read
+
+
+def test_follower_poll_only_yields_complete_sections(
+    tilt_series_mdoc_string, tmp_path
+):
+    mdoc_file = tmp_path / 'growing.mdoc'
+    mdoc_file.write_text('')
+    follower = MdocFollower(mdoc_file)
+
+    first_section = tilt_series_mdoc_string.index('[ZValue = 1]')
+    partial = tilt_series_mdoc_string.index('TiltAngle', first_section) + 5
+    with open(mdoc_file, 'a') as f:
+        f.write(tilt_series_mdoc_string[:partial])
+    sections = follower.poll()
+    assert [s.ZValue for s in sections] == [0]
+    assert follower.global_data.PixelSpacing == 5.4
+    assert len(follower.titles) == 2
+
+    assert follower.poll() == []
+
+    with open(mdoc_file, 'a') as f:
+        f.write(tilt_series_mdoc_string[partial:])
+    sections = follower.poll()
+    assert [s.ZValue for s in sections] == list(range(1, 40))
+    assert sections[0].TiltAngle == 3.00113
+
+    sections = follower.flush()
+    assert [s.ZValue for s in sections] == [40]
+    assert follower.to_dataframe().equals(read(mdoc_file))
+
+
+def test_follower_iterates_until_timeout(tilt_series_mdoc_file):
+    follower = MdocFollower(tilt_series_mdoc_file, poll_interval=0, timeout=0)
+    sections = list(follower)
+    assert len(sections) == 41
+
+
+def test_follower_async_iteration(tilt_series_mdoc_file):
+    async def collect():
+        follower = MdocFollower(tilt_series_mdoc_file, poll_interval=0, timeout=0)
+        return [section async for section in follower]
+
+    sections = asyncio.run(collect())
+    assert len(sections) == 41
+    assert sections[-1].ZValue == 40
@@ -1,9 +1,12 @@
 import shutil
 import os
+import tracemalloc
 
 import pandas as pd
+import pytest
 
-from mdocfile import read, write
+from mdocfile import read, read_many, write
+from mdocfile.compact import expand_dataframe
 from mdocfile.data_models import Mdoc
 
 
@@ -75,3 +78,147 @@ def test_write_tilt_series_mdoc_string(tilt_series_mdoc_string):
     shutil.rmtree(tmp_path)
 
     assert df.equals(df2)
+
+
+@pytest.mark.parametrize('mdoc_file', [
+    'tilt_series_mdoc_file',
+    'montage_section_mdoc_file',
+    'montage_section_multiple_mdoc_file',
+    'frame_set_single_mdoc_file',
+    'frame_set_multiple_mdoc_file',
+])
+def test_read_fast_engine_matches_pydantic_engine(mdoc_file, request):
+    filename = request.getfixturevalue(mdoc_file)
+    expected = read(filename)
+    df = read(filename, engine='fast')
+    pd.testing.assert_frame_equal(df, expected)
+
+
+def test_read_unknown_engine(tilt_series_mdoc_file):
+    with pytest.raises(ValueError):
+        read(tilt_series_mdoc_file, engine='bla')
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_read_many(
+    tilt_series_mdoc_file, frame_set_multiple_mdoc_file, executor, tmp_path
+):
+    broken_file = tmp_path / 'broken.mdoc'
+    broken_file.write_text('[ZValue = 0]\nTiltAngle = abc\n')
+    files = [frame_set_multiple_mdoc_file, broken_file, tilt_series_mdoc_file]
+
+    df = read_many(files, workers=2, executor=executor, add_tilt_series_id=True)
+    assert df.shape[0] == 21 + 41
+    assert list(df['source_file'].unique()) == [
+        str(frame_set_multiple_mdoc_file), str(tilt_series_mdoc_file)
+    ]
+    assert list(df['tilt_series_id'].unique()) == ['frame_set_multiple', 'tilt_series']
+    assert list(df.attrs['read_errors']) == [str(broken_file)]
+
+    # column union of the per-file dataframes
+    expected_columns = set(read(tilt_series_mdoc_file).columns)
+    expected_columns |= set(read(frame_set_multiple_mdoc_file).columns)
+    assert set(df.columns) == expected_columns | {'source_file', 'tilt_series_id'}
+
+
+def test_read_many_glob(tilt_series_mdoc_file):
+    df = read_many(str(tilt_series_mdoc_file.parent / 'frame_set_*.mdoc'))
+    assert df.shape[0] == 21 + 1
+    assert df['source_file'].iloc[0].endswith('frame_set_multiple.mdoc')
+
+
+def test_write_matches_mdoc_to_string(tilt_series_mdoc_file, tmp_path):
+    df = read(tilt_series_mdoc_file)
+    df = df[df['TiltAngle'] > 0].iloc[::-1]
+    df['Note'] = ['nan', None] + ['x'] * (len(df) - 2)
+    write(df, tmp_path / 'test.mdoc')
+    assert (tmp_path / 'test.mdoc').read_text() == Mdoc.from_dataframe(df).to_string()
+
+
+@pytest.mark.parametrize('mdoc_file', [
+    'montage_section_mdoc_file',
+    'montage_section_multiple_mdoc_file',
+    'frame_set_single_mdoc_file',
+    'frame_set_multiple_mdoc_file',
+])
+def test_write_round_trip(mdoc_file, request, tmp_path):
+    filename = request.getfixturevalue(mdoc_file)
+    df = read(filename)
+    write(df, tmp_path / 'test.mdoc')
+    df2 = read(tmp_path / 'test.mdoc')
+    pd.testing.assert_frame_equal(df2, df)
+
+    mdoc = Mdoc.from_file(filename)
+    mdoc2 = Mdoc.from_file(tmp_path / 'test.mdoc')
+    assert mdoc2.titles == mdoc.titles
+    assert mdoc2.global_data == mdoc.global_data
+    assert [s.header_key for s in mdoc2.section_data] == [
+        s.header_key for s in mdoc.section_data
+    ]
+
+
+def test_write_filtered_montage(montage_section_mdoc_file, tmp_path):
+    df = read(montage_section_mdoc_file)
+    df = df[df['ZValue'] % 2 != 1]
+    write(df, tmp_path / 'test.mdoc')
+    text = (tmp_path / 'test.mdoc').read_text()
+    assert '[MontSection = 0]' in text
+    assert '[ZValue = 1]' not in text
+    assert 'nan' not in text
+
+
+@pytest.mark.parametrize('engine', ['pydantic', 'fast'])
+def test_read_columns(montage_section_mdoc_file, engine):
+    columns = ['TiltAngle', 'PixelSpacing', 'XedgeDxy', 'titles', 'NotAColumn']
+    df = read(montage_section_mdoc_file, engine=engine, columns=columns)
+    assert list(df.columns) == ['TiltAngle', 'PixelSpacing', 'XedgeDxy', 'titles']
+    expected = read(montage_section_mdoc_file)[list(df.columns)]
+    pd.testing.assert_frame_equal(df, expected)
+
+
+@pytest.mark.parametrize('mdoc_file', [
+    'tilt_series_mdoc_file',
+    'montage_section_mdoc_file',
+    'montage_section_multiple_mdoc_file',
+    'frame_set_single_mdoc_file',
+    'frame_set_multiple_mdoc_file',
+])
+def test_read_compact(mdoc_file, request, tmp_path):
+    mdoc_file = request.getfixturevalue(mdoc_file)
+    df = read(mdoc_file)
+    compact_df = read(mdoc_file, compact=True)
+    assert 'StagePosition' not in compact_df.columns
+    assert compact_df['StagePosition_x'].dtype == 'float64'
+    assert isinstance(compact_df['titles'].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(expand_dataframe(compact_df), df)
+
+    write(compact_df, tmp_path / 'compact.mdoc')
+    write(df, tmp_path / 'expanded.mdoc')
+    compact_text = (tmp_path / 'compact.mdoc').read_text()
+    assert compact_text == (tmp_path / 'expanded.mdoc').read_text()
+
+
+@pytest.mark.parametrize('engine', ['pydantic', 'fast'])
+@pytest.mark.parametrize('mdoc_file', [
+    'tilt_series_mdoc_file',
+    'montage_section_mdoc_file',
+    'frame_set_multiple_mdoc_file',
+])
+def test_read_mmap(mdoc_file, request, engine):
+    filename = request.getfixturevalue(mdoc_file)
+    expected = read(filename, engine=engine)
+    pd.testing.assert_frame_equal(read(filename, engine=engine, mmap=True), expected)
+
+
+def test_mmap_does_not_hold_file_contents(tilt_series_mdoc_string, tmp_path):
+    header, _, sections = tilt_series_mdoc_string.partition('[ZValue')
+    filename = tmp_path / 'large.mdoc'
+    filename.write_text(header + ('[ZValue' + sections) * 20)
+
+    peaks = {}
+    for mmap in (False, True):
+        tracemalloc.start()
+        Mdoc.from_file(filename, mmap=mmap)
+        peaks[mmap] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    assert peaks[False] - peaks[True] > os.path.getsize(filename) / 2
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+import mdocfile
+from mdocfile.data_models import Mdoc, MdocGlobalData
+from mdocfile.header import GLOBAL_FIELD_TYPES
+
+
+def test_global_field_types_match_model():
+    expected = {
+        name: info.annotation for name, info in MdocGlobalData.model_fields.items()
+    }
+    assert GLOBAL_FIELD_TYPES == expected
+
+
+@pytest.mark.parametrize('fixture', [
+    'tilt_series_mdoc_file',
+    'montage_section_mdoc_file',
+    'montage_section_multiple_mdoc_file',
+    'frame_set_multiple_mdoc_file',
+])
+def test_read_header_matches_mdoc(fixture, request):
+    filename = request.getfixturevalue(fixture)
+    mdoc = Mdoc.from_file(filename)
+    expected = {
+        k: v for k, v in mdoc.global_data.model_dump().items() if v is not None
+    }
+    assert mdocfile.read_header(filename) == expected
+    assert mdocfile.read_titles(filename) == mdoc.titles
+
+
+def test_read_header_types(tilt_series_mdoc_file):
+    header = mdocfile.read_header(tilt_series_mdoc_file)
+    assert header['PixelSpacing'] == 5.4
+    assert header['ImageSize'] == (924, 958)
+    assert header['DataMode'] == 1
+
+
+def test_read_header_malformed_value(tmp_path):
+    filename = tmp_path / 'malformed.mdoc'
+    filename.write_text('PixelSpacing = abc\n\n[ZValue = 0]\nTiltAngle = 0\n')
+    with pytest.raises(ValueError, match='PixelSpacing'):
+        mdocfile.read_header(filename)
+
+
+@pytest.mark.parametrize('fixture', [
+    'tilt_series_mdoc_file',
+    'montage_section_multiple_mdoc_file',
+    'frame_set_multiple_mdoc_file',
+])
+def test_read_tilt_angles_matches_mdoc(fixture, request):
+    filename = request.getfixturevalue(fixture)
+    mdoc = Mdoc.from_file(filename)
+    expected = [
+        np.nan if s.TiltAngle is None else s.TiltAngle for s in mdoc.section_data
+    ]
+    np.testing.assert_array_equal(mdocfile.read_tilt_angles(filename), expected)
+
+
+def test_read_tilt_angles_missing_and_crlf(tmp_path):
+    filename = tmp_path / 'crlf.mdoc'
+    filename.write_bytes(
+        b'PixelSpacing = 1\r\n\r\n[ZValue = 0]\r\nTiltAngle = -3.5\r\n\r\n'
+        b'[ZValue = 1]\r\nStageZ = 0\r\n'
+    )
+    np.testing.assert_array_equal(mdocfile.read_tilt_angles(filename), [-3.5, np.nan])
@@ -0,0 +1,61 @@
+import subprocess
+import sys
+
+SCRIPT = """
+import sys
+import mdocfile
+on_import = not {'pandas', 'pydantic'} & set(sys.modules)
+mdocfile.read_header(sys.argv[1])
+mdocfile.read_tilt_angles(sys.argv[1])
+on_read = not {'pandas', 'pydantic'} & set(sys.modules)
+print(on_import, on_read)
+"""
+
+
+def _run(script: str, *args: str) -> str:
+    result = subprocess.run(
+        [sys.executable, '-c', script, *args],
+        capture_output=True, text=True, check=True,
+    )
+    return result.stdout.split()
+
+
+def test_light_path_does_not_import_pandas_or_pydantic(tilt_series_mdoc_file):
+    assert _run(SCRIPT, str(tilt_series_mdoc_file)) == ['True', 'True']
+
+
+def test_pandas_imported_on_read(tilt_series_mdoc_file):
+    script = (
+        "import sys, mdocfile\n"
+        "before = 'pandas' in sys.modules\n"
+        "mdocfile.read(sys.argv[1])\n"
+        "print(before, 'pandas' in sys.modules)"
+    )
+    assert _run(script, str(tilt_series_mdoc_file)) == ['False', 'True']
+
+
+def test_mdoc_without_pandas(tilt_series_mdoc_file):
+    script = (
+        "import sys\n"
+        "from mdocfile.data_models import Mdoc\n"
+        "mdoc = Mdoc.from_file(sys.argv[1])\n"
+        "print(len(mdoc.section_data), 'pandas' in sys.modules)"
+    )
+    assert _run(script, str(tilt_series_mdoc_file)) == ['41', 'False']
+
+
+def test_lazy_attributes():
+    import mdocfile
+    assert set(mdocfile.__all__) <= set(dir(mdocfile))
+    for name in mdocfile.__all__:
+        assert getattr(mdocfile, name) is not None
+    assert not hasattr(mdocfile, 'not_an_attribute')
+
+
+def test_read_montage_without_pandas(montage_section_mdoc_file):
+    script = (
+        "import sys, mdocfile\n"
+        "montage = mdocfile.read_montage(sys.argv[1])\n"
+        "print(len(montage.z_values), {'pandas', 'pydantic'} & set(sys.modules))"
+    )
+    assert _run(script, str(montage_section_mdoc_file)) == ['62', 'set()']
@@ -0,0 +1,55 @@
+import os
+import shutil
+
+import pytest
+
+from mdocfile import MdocIndex, read
+
+
+@pytest.fixture
+def mdoc_tree(tilt_series_mdoc_file, tmp_path):
+    root = tmp_path / 'tree'
+    shutil.copytree(tilt_series_mdoc_file.parent, root / 'session_1')
+    return root
+
+
+def test_index_query(mdoc_tree, tmp_path):
+    with MdocIndex(tmp_path / 'index.sqlite') as index:
+        counts = index.update(mdoc_tree, executor='thread')
+        assert counts['added'] == len(list(mdoc_tree.glob('**/*.mdoc')))
+        assert len(index) == counts['added']
+
+        df = index.query(
+            'Magnification = ? AND Defocus BETWEEN ? AND ?',
+            params=(105000, 2.5, 3),
+            columns=['path', 'TiltAngle', 'Defocus', 'StagePosition_x'],
+        )
+        expected = read(mdoc_tree / 'session_1' / 'tilt_series.mdoc')
+        expected = expected[expected['Defocus'].between(2.5, 3)]
+        assert df['TiltAngle'].tolist() == expected['TiltAngle'].tolist()
+        assert df['StagePosition_x'].tolist() == [
+            x for x, _ in expected['StagePosition']
+        ]
+        assert index.files('Magnification = ?', (105000,)) == [
+            mdoc_tree / 'session_1' / 'tilt_series.mdoc'
+        ]
+
+
+def test_index_update_is_incremental(mdoc_tree, tmp_path):
+    database = tmp_path / 'index.sqlite'
+    with MdocIndex(database) as index:
+        n_files = index.update(mdoc_tree, executor='thread')['added']
+
+    tilt_series = mdoc_tree / 'session_1' / 'tilt_series.mdoc'
+    with open(tilt_series, 'a') as file:
+        file.write('\n')
+    os.remove(mdoc_tree / 'session_1' / 'frame_set_single.mdoc')
+    with MdocIndex(database) as index:
+        counts = index.update(mdoc_tree, executor='thread')
+        assert counts == {
+            'added': 0, 'updated': 1, 'removed': 1,
+            'unchanged': n_files - 2, 'failed': 0,
+        }
+        assert len(index) == n_files - 1
+        n_sections = len(index.query('path = ?', (str(tilt_series),)))
+        assert n_sections == len(read(tilt_series))
@@ -0,0 +1,59 @@
+import asyncio
+from pathlib import PureWindowsPath
+
+import pandas as pd
+import pytest
+
+from mdocfile import aio, read_many
+from mdocfile.interning import Interner
+
+
+@pytest.fixture
+def mdoc_files(tilt_series_mdoc_file, montage_section_mdoc_file, tmp_path):
+    paths = []
+    filenames = [tilt_series_mdoc_file] * 2 + [montage_section_mdoc_file]
+    for idx, filename in enumerate(filenames):
+        paths.append(tmp_path / f'{idx}.mdoc')
+        paths[-1].write_bytes(filename.read_bytes())
+    return paths
+
+
+def test_interner():
+    interner = Interner()
+    assert interner.value((0.0, 0.0)) is interner.value((0.0, 0.0))
+    assert interner.value([1]) == [1]
+    titles = interner.titles(['[T = a]'])
+    assert interner.titles(['[T = a]']) is titles
+
+    path = interner.path(PureWindowsPath(r'D:\DATA\frames\TS_01_001.mrc'))
+    other = interner.path(PureWindowsPath(r'D:\DATA\frames\TS_01_002.mrc'))
+    assert path == PureWindowsPath(r'D:\DATA\frames\TS_01_001.mrc')
+    assert path.parent == other.parent
+    assert interner.path(PureWindowsPath(r'D:\DATA\frames\TS_01_001.mrc')) is path
+    assert interner.path(PureWindowsPath('TS_01.mrc')) == PureWindowsPath('TS_01.mrc')
+
+
+def test_read_many_interns_values(mdoc_files):
+    df = read_many(mdoc_files)
+    expected = read_many(mdoc_files, intern=False)
+    pd.testing.assert_frame_equal(df, expected)
+
+    first = df[df['source_file'] == str(mdoc_files[0])].index[0]
+    other_file = df[df['source_file'] == str(mdoc_files[1])].index[0]
+    assert df['titles'][first] is df['titles'][other_file]
+    assert df['ImageShift'][first] is df['ImageShift'][other_file]
+    assert df['SubFramePath'][first] is df['SubFramePath'][other_file]
+    assert expected['titles'][first] is not expected['titles'][other_file]
+
+
+def test_interner_shared_between_batches(mdoc_files):
+    interner = Interner()
+    first = read_many(mdoc_files[:1], intern=interner)
+    second = read_many(mdoc_files[1:2], intern=interner)
+    assert first['titles'][0] is second['titles'][0]
+
+
+def test_aio_read_many_interns_values(mdoc_files):
+    df = asyncio.run(aio.read_many(mdoc_files))
+    pd.testing.assert_frame_equal(df, read_many(mdoc_files))
+    assert df['titles'][0] is df['titles'][41]  # first row of the second file
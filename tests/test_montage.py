@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from mdocfile import read, read_montage
+from mdocfile.data_models import Mdoc
+from mdocfile.montage import MONTAGE_FIELDS, pack
+
+
+def test_pack():
+    array = pack(['1 2', None, (3.0, 4.0, 5.0)], width=3)
+    np.testing.assert_array_equal(
+        array, [[1, 2, np.nan], [np.nan] * 3, [3, 4, 5]]
+    )
+    assert array.flags['C_CONTIGUOUS']
+    assert pack([], width=2).shape == (0, 2)
+    with pytest.raises(ValueError):
+        pack(['1 2 3'], width=2)
+
+
+@pytest.mark.parametrize('mmap', [False, True])
+def test_read_montage(montage_section_multiple_mdoc_file, mmap):
+    montage = read_montage(montage_section_multiple_mdoc_file, mmap=mmap)
+    df = read(montage_section_multiple_mdoc_file)
+    pieces = df[df['ZValue'].notna()]
+    assert montage.z_values.tolist() == pieces['ZValue'].tolist()
+    for attribute, (key, width) in MONTAGE_FIELDS.items():
+        array = getattr(montage, attribute)
+        assert array.shape == (len(pieces), width)
+        if key not in pieces:
+            assert np.isnan(array).all()
+            continue
+        for row, value in zip(array, pieces[key]):
+            if isinstance(value, tuple):
+                np.testing.assert_array_equal(row[:len(value)], value)
+                assert np.isnan(row[len(value):]).all()
+            else:
+                assert np.isnan(row).all()
+
+    assert montage.sections.tolist() == list(range(10))
+    assert montage.section_offsets.tolist() == list(range(0, 91, 9))
+    first_section = slice(*montage.section_offsets[:2])
+    assert (montage.piece_coordinates[first_section, 2] == 0).all()
+
+
+def test_three_element_edge_shifts(montage_section_mdoc_file):
+    montage = read_montage(montage_section_mdoc_file)
+    assert not np.isnan(montage.xedge_dxy_vs[0]).any()
+    assert np.isnan(montage.xedge_dxy[:, 2]).all()
+
+
+def test_mdoc_montage_arrays(montage_section_multiple_mdoc_file):
+    expected = read_montage(montage_section_multiple_mdoc_file)
+    montage = Mdoc.from_file(montage_section_multiple_mdoc_file).montage_arrays()
+    for array, expected_array in zip(montage, expected):
+        np.testing.assert_array_equal(array, expected_array)
+
+
+def test_pieces_grouped_by_section(montage_section_multiple_mdoc_file):
+    mdoc = Mdoc.from_file(montage_section_multiple_mdoc_file)
+    pieces = [s for s in mdoc.section_data if s.header_key == 'ZValue']
+    pieces.reverse()
+    mdoc.section_data = pieces
+    montage = mdoc.montage_arrays()
+    assert montage.sections.tolist() == list(range(10))
+    assert montage.z_values[:9].tolist() == list(range(8, -1, -1))
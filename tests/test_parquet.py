@@ -0,0 +1,82 @@
+import json
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from mdocfile.data_models import Mdoc
+
+pytest.importorskip('pyarrow')
+
+from mdocfile.parquet import (
+    arrow_schema,
+    mdoc_to_arrow,
+    read_mdocs,
+    read_parquet,
+    to_arrow,
+    to_parquet,
+)
+
+MDOC_FILES = [
+    'tilt_series_mdoc_file',
+    'montage_section_mdoc_file',
+    'montage_section_multiple_mdoc_file',
+    'frame_set_single_mdoc_file',
+    'frame_set_multiple_mdoc_file',
+]
+
+
+@pytest.fixture
+def mdoc_files(request):
+    return [request.getfixturevalue(name) for name in MDOC_FILES]
+
+
+def test_to_arrow_schema(mdoc_files):
+    table = to_arrow(mdoc_files)
+    assert table.schema == arrow_schema()
+    assert table.num_rows == sum(
+        len(Mdoc.from_file(f).section_data) for f in mdoc_files
+    )
+
+
+def test_to_parquet_round_trip(mdoc_files, tmp_path):
+    to_parquet(
+        mdoc_files, tmp_path / 'dataset',
+        partition_cols=['global_ImageFile'], files_per_batch=2,
+    )
+    mdocs = read_mdocs(tmp_path / 'dataset')
+    for filename in mdoc_files:
+        expected = Mdoc.from_file(filename).to_string()
+        assert mdocs[str(filename)].to_string() == expected
+
+
+def test_read_parquet_filters(tilt_series_mdoc_file, tmp_path):
+    to_parquet([tilt_series_mdoc_file], tmp_path / 'dataset')
+    df = read_parquet(
+        tmp_path / 'dataset',
+        columns=['TiltAngle', 'Timestamp', 'StagePosition_x'],
+        filters=[('TiltAngle', '>', 30)],
+    )
+    assert list(df.columns) == ['TiltAngle', 'Timestamp', 'StagePosition_x']
+    assert (df['TiltAngle'] > 30).all()
+    assert len(df) == 11
+    assert df['Timestamp'].iloc[0] == pd.Timestamp('2015-11-30 15:42:28')
+
+
+def test_read_errors(tilt_series_mdoc_file, tmp_path):
+    broken = tmp_path / 'broken.mdoc'
+    broken.write_text('[ZValue = 0]\nTiltAngle = abc\n')
+    read_errors = to_parquet([tilt_series_mdoc_file, broken], tmp_path / 'dataset')
+    assert list(read_errors) == [str(broken)]
+    assert to_parquet([tilt_series_mdoc_file], tmp_path / 'other') == {}
+    table = to_arrow([tilt_series_mdoc_file, broken])
+    assert json.loads(table.schema.metadata[b'read_errors']) == read_errors
+    assert table.num_rows == 41
+
+
+def test_timestamp_formats(tilt_series_mdoc_string):
+    # e.g. '30-Nov-15  15:21:38' written as '30-Nov-2015  15:21:38'
+    mdoc = Mdoc.from_string(tilt_series_mdoc_string.replace('-Nov-15', '-Nov-2015'))
+    timestamps = mdoc_to_arrow(mdoc).column('Timestamp').to_pylist()
+    assert timestamps[0] == datetime(2015, 11, 30, 15, 21, 38)
+    assert None not in timestamps
@@ -0,0 +1,32 @@
+import logging
+
+import pytest
+
+import mdocfile
+from mdocfile import read
+
+
+@pytest.mark.parametrize('engine', ['pydantic', 'fast'])
+def test_stats(frame_set_multiple_mdoc_file, engine):
+    reports = []
+    with mdocfile.stats(callback=reports.append) as stats:
+        df = read(frame_set_multiple_mdoc_file, engine=engine)
+        read(frame_set_multiple_mdoc_file, engine=engine)
+    read(frame_set_multiple_mdoc_file, engine=engine)  # not recorded
+
+    assert reports == [stats.as_dict()]
+    assert stats.files == 2
+    assert stats.sections == 2 * len(df)
+    assert stats.aliases == {'FrameDosesAndNumber': 2}
+    assert stats.unknown_fields['FrameTSStartEndFrames'] == 2 * 20
+    assert stats.fields == 2 * 130
+    expected_phases = {'io', 'split_lines', 'find_sections', 'validation', 'dataframe'}
+    assert set(stats.timings) == expected_phases
+    assert all(seconds > 0 for seconds in stats.timings.values())
+
+
+def test_alias_logged_once_per_file(frame_set_multiple_mdoc_file, caplog):
+    with caplog.at_level(logging.WARNING, logger='mdocfile'):
+        read(frame_set_multiple_mdoc_file)
+    alias_messages = [r for r in caplog.records if 'mapped to' in r.message]
+    assert len(alias_messages) == 1
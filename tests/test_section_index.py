@@ -0,0 +1,99 @@
+import pandas as pd
+import pytest
+
+from mdocfile import read
+from mdocfile.data_models import Mdoc
+from mdocfile.section_index import SectionIndex, read_selected, sidecar_path
+
+
+def test_section_index(montage_section_multiple_mdoc_file):
+    mdoc = Mdoc.from_file(montage_section_multiple_mdoc_file)
+    index = SectionIndex.for_file(montage_section_multiple_mdoc_file)
+    assert len(index.entries) == len(mdoc.section_data)
+    assert [(e.kind, e.number) for e in index.entries] == [
+        (s.header_key, getattr(s, s.header_key)) for s in mdoc.section_data
+    ]
+    assert index.find(5) == 5
+    with pytest.raises(KeyError):
+        index.find(5, kind='FrameSet')
+
+
+@pytest.mark.parametrize('sections, expected', [
+    (0, [0]),
+    (slice(10, 21), list(range(10, 21))),
+    (slice(None, 10, 3), [0, 3, 6, 9]),
+    ([40, 2, 7], [2, 7, 40]),
+    (lambda s: s.number % 20 == 0, [0, 20, 40]),
+])
+@pytest.mark.parametrize('engine', ['pydantic', 'fast'])
+def test_read_sections(tilt_series_mdoc_file, sections, expected, engine):
+    full = read(tilt_series_mdoc_file)
+    df = read(tilt_series_mdoc_file, sections=sections, engine=engine)
+    expected_df = full.iloc[expected].reset_index(drop=True)
+    pd.testing.assert_frame_equal(df, expected_df[df.columns])
+    assert df['ZValue'].tolist() == expected
+
+
+def test_read_sections_by_kind(frame_set_multiple_mdoc_file):
+    full = read(frame_set_multiple_mdoc_file)
+    df = read(frame_set_multiple_mdoc_file, sections=0)
+    assert df['ZValue'].tolist() == [0]
+    assert df['TiltAngle'].tolist() == full[full['ZValue'] == 0]['TiltAngle'].tolist()
+    df = read(frame_set_multiple_mdoc_file, sections=('FrameSet', 0))
+    assert df['FrameSet'].tolist() == [0]
+    assert len(df) == 1
+    index = SectionIndex.for_file(frame_set_multiple_mdoc_file)
+    assert index.find(0) == 1
+    assert index.find(0, kind=None) == 0
+    with pytest.raises(ValueError):
+        read(frame_set_multiple_mdoc_file, sections=('Frame', 0))
+
+
+def test_select_montage_sections(montage_section_multiple_mdoc_file):
+    index = SectionIndex.for_file(montage_section_multiple_mdoc_file)
+    selected = index.select(('MontSection', slice(2, 4)))
+    assert [(e.kind, e.number) for e in selected] == [
+        ('MontSection', 2), ('MontSection', 3)
+    ]
+    assert {e.kind for e in index.select([0, 1, 2])} == {'ZValue'}
+
+
+def test_read_selected_only_reads_selected(tilt_series_mdoc_file):
+    data = read_selected(tilt_series_mdoc_file, 3)
+    assert data.count(b'[ZValue =') == 1
+    assert b'[T = SerialEM' in data
+
+
+def test_sidecar_index(tilt_series_mdoc_file, tmp_path):
+    filename = tmp_path / 'TS_01.mdoc'
+    filename.write_bytes(tilt_series_mdoc_file.read_bytes())
+    expected = read(filename, sections=[1, 2])
+    df = read(filename, sections=[1, 2], cache_index=True)
+    pd.testing.assert_frame_equal(df, expected)
+    assert sidecar_path(filename).exists()
+
+    # a stale side-car index is rebuilt
+    data = filename.read_bytes().replace(b'[ZValue = 1]', b'[ZValue = 99]')
+    filename.write_bytes(data)
+    df = read(filename, sections=99, cache_index=True)
+    assert df['ZValue'].tolist() == [99]
+
+
+def test_mdoc_section(montage_section_multiple_mdoc_file, tmp_path):
+    mdoc = Mdoc.from_file(montage_section_multiple_mdoc_file)
+    assert mdoc.section(7) == mdoc.section_data[7]
+    with pytest.raises(KeyError):
+        mdoc.section(7, kind='FrameSet')
+
+    lazy_mdoc = Mdoc.open(montage_section_multiple_mdoc_file, lazy=True)
+    assert lazy_mdoc.section(7) == mdoc.section_data[7]
+    assert list(lazy_mdoc.section_data._sections) == [7]
+
+    filename = tmp_path / 'montage.mdoc'
+    filename.write_bytes(montage_section_multiple_mdoc_file.read_bytes())
+    Mdoc.open(filename, lazy=True, cache_index=True)
+    indexed_mdoc = Mdoc.open(filename, lazy=True, cache_index=True)
+    assert indexed_mdoc.global_data == mdoc.global_data
+    assert indexed_mdoc.titles == mdoc.titles
+    assert indexed_mdoc.section(80) == mdoc.section(80)
+    assert indexed_mdoc.section_data._buffer is None  # file was not read whole
@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+
+from mdocfile import iter_sections, read
+from mdocfile.data_models import Mdoc, MdocSectionData
+
+
+def test_iter_sections(montage_section_multiple_mdoc_file):
+    mdoc = Mdoc.from_file(montage_section_multiple_mdoc_file)
+    with iter_sections(montage_section_multiple_mdoc_file) as sections:
+        assert sections.titles == mdoc.titles
+        assert sections.global_data == mdoc.global_data
+        section_data = list(sections)
+    assert all(isinstance(section, MdocSectionData) for section in section_data)
+    assert section_data == mdoc.section_data
+
+
+def test_iter_sections_as_dict(tilt_series_mdoc_file):
+    sections = list(iter_sections(tilt_series_mdoc_file, as_dict=True))
+    assert len(sections) == 41
+    assert sections[0]['ZValue'] == 0
+    assert sections[0]['StagePosition'] == (20.7936, 155.287)
+
+
+@pytest.mark.parametrize('engine', ['pydantic', 'fast'])
+def test_read_chunksize(frame_set_multiple_mdoc_file, engine):
+    chunks = list(read(frame_set_multiple_mdoc_file, engine=engine, chunksize=8))
+    assert [len(chunk) for chunk in chunks] == [8, 8, 5]
+    expected = read(frame_set_multiple_mdoc_file)
+    df = pd.concat(chunks)
+    pd.testing.assert_series_equal(df['TiltAngle'], expected['TiltAngle'])
+    pd.testing.assert_series_equal(df['ZValue'], expected['ZValue'])
+
+
+def test_read_invalid_chunksize(tilt_series_mdoc_file):
+    with pytest.raises(ValueError):
+        read(tilt_series_mdoc_file, chunksize=0)
@@ -0,0 +1,74 @@
+import pytest
+
+from mdocfile.data_models import Mdoc
+from mdocfile.utils import SectionSpan, open_buffer, scan_boundaries, split_lines
+
+MDOC = (
+    'PixelSpacing = 5.4\n'
+    'ImageFile = TS_01.mrc\n'
+    '\n'
+    '[T = SerialEM: Digitized on EMBL Krios]\n'
+    '\n'
+    '  [T =     Tilt axis angle = 85.3, binning = 4]\n'
+    '\n'
+    '[ZValue = 0]\n'
+    'TiltAngle = 0.001\n'
+    'NavigatorLabel = a=b\n'
+    '\n'
+    '\t[MontSection = 0]\n'
+    'TiltAngle = 3.0\n'
+    '[T = not a title]\n'
+    '[FrameSet = 0]\n'
+    'TiltAngle = -3.0\n'
+)
+
+
+@pytest.mark.parametrize('encode', [False, True])
+def test_scan_boundaries(encode):
+    buffer = MDOC.encode() if encode else MDOC
+    boundaries = scan_boundaries(buffer)
+    header_end = MDOC.index('[ZValue')
+    montage_start = MDOC.index('\t[MontSection')
+    frame_set_start = MDOC.index('[FrameSet')
+    assert boundaries.header == (0, header_end)
+    assert [split_lines(buffer, *span) for span in boundaries.titles] == [
+        ['[T = SerialEM: Digitized on EMBL Krios]'],
+        ['[T =     Tilt axis angle = 85.3, binning = 4]'],
+    ]
+    assert boundaries.sections == [
+        SectionSpan('ZValue', header_end, montage_start),
+        SectionSpan('MontSection', montage_start, frame_set_start),
+        SectionSpan('FrameSet', frame_set_start, len(MDOC)),
+    ]
+
+
+def test_scan_boundaries_without_sections():
+    boundaries = scan_boundaries('PixelSpacing = 1\n')
+    assert boundaries.header == (0, len('PixelSpacing = 1\n'))
+    assert boundaries.sections == []
+
+
+def test_crlf_and_equals_in_values():
+    mdoc = Mdoc.from_string(MDOC)
+    crlf_mdoc = Mdoc.from_buffer(MDOC.replace('\n', '\r\n').encode())
+    assert crlf_mdoc == mdoc
+    assert mdoc.titles[1] == '[T =     Tilt axis angle = 85.3, binning = 4]'
+    assert mdoc.section_data[0].NavigatorLabel == 'a=b'
+    assert [s.header_key for s in mdoc.section_data] == [
+        'ZValue', 'MontSection', 'FrameSet'
+    ]
+
+
+def test_global_value_containing_equals():
+    mdoc = Mdoc.from_string('Version = a=b\n[ZValue = 0]\nTiltAngle = 0\n')
+    assert mdoc.global_data.Version == 'a=b'
+
+
+@pytest.mark.parametrize('use_mmap', [False, True])
+def test_open_buffer(tmp_path, tilt_series_mdoc_file, use_mmap):
+    with open_buffer(tilt_series_mdoc_file, use_mmap=use_mmap) as buffer:
+        assert len(scan_boundaries(buffer).sections) == 41
+    empty = tmp_path / 'empty.mdoc'
+    empty.touch()
+    with open_buffer(empty, use_mmap=use_mmap) as buffer:
+        assert scan_boundaries(buffer).sections == []
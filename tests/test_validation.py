@@ -0,0 +1,94 @@
+import shutil
+
+import pytest
+
+from mdocfile import validate
+from mdocfile.validation import REPORT_COLUMNS, check_buffer, check_file
+
+BROKEN_MDOC = """PixelSpacing = 5.4
+ImageSize = 924 abc
+Comment = a = b
+
+[T = SerialEM: Digitized on EMBL Krios]
+
+[ZValue = 0]
+TiltAngle = abc
+StagePosition = 1 2 3
+garbage line
+UnknownKey = anything
+
+[ZValue = x]
+TiltAngle = 0.5
+"""
+
+
+@pytest.fixture
+def session_dir(tmp_path, tilt_series_mdoc_file, frame_set_multiple_mdoc_file):
+    directory = tmp_path / 'session'
+    directory.mkdir()
+    shutil.copy(tilt_series_mdoc_file, directory)
+    shutil.copy(frame_set_multiple_mdoc_file, directory)
+    (directory / 'broken.mdoc').write_text(BROKEN_MDOC)
+    return directory
+
+
+def test_check_valid_files(tilt_series_mdoc_file, montage_section_mdoc_file):
+    assert check_file(tilt_series_mdoc_file) == (41, [])
+    assert check_file(montage_section_mdoc_file)[1] == []
+
+
+def test_check_buffer_collects_all_problems():
+    n_sections, problems = check_buffer(BROKEN_MDOC.encode(), 'broken.mdoc')
+    assert n_sections == 2
+    found = [(p.line, p.section, p.key, p.value) for p in problems]
+    assert found == [
+        (2, None, 'ImageSize', '924 abc'),
+        (8, '0', 'TiltAngle', 'abc'),
+        (9, '0', 'StagePosition', '1 2 3'),
+        (10, '0', None, 'garbage line'),
+        (13, 'x', 'ZValue', 'x'),
+    ]
+    assert [p.expected for p in problems] == [
+        'Tuple[int, int]', 'float', 'Tuple[float, float]', 'key = value', 'int'
+    ]
+    assert all(p.file == 'broken.mdoc' for p in problems)
+    assert check_buffer(BROKEN_MDOC, 'broken.mdoc') == (n_sections, problems)
+
+
+def test_check_undecodable_file(tmp_path):
+    filename = tmp_path / 'binary.mdoc'
+    filename.write_bytes(b'\xff\xfe\x00garbage')
+    n_sections, [problem] = check_file(filename)
+    assert n_sections == 0
+    assert problem.line is None
+    assert 'UnicodeDecodeError' in problem.message
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_validate(session_dir, executor):
+    report = validate(session_dir, workers=2, executor=executor)
+    assert list(report.columns) == list(REPORT_COLUMNS)
+    assert (report['file'] == str(session_dir / 'broken.mdoc')).all()
+    assert report['line'].tolist() == [2, 8, 9, 10, 13]
+    assert report.attrs['n_files'] == 3
+    assert report.attrs['n_invalid'] == 1
+    assert report.attrs['n_sections'] == {
+        str(session_dir / 'broken.mdoc'): 2,
+        str(session_dir / 'frame_set_multiple.mdoc'): 21,
+        str(session_dir / 'tilt_series.mdoc'): 41,
+    }
+
+
+def test_validate_valid_files(tilt_series_mdoc_file):
+    report = validate([tilt_series_mdoc_file], executor='thread')
+    assert report.empty
+    assert list(report.columns) == list(REPORT_COLUMNS)
+    assert report.attrs['n_invalid'] == 0
+    with pytest.raises(ValueError):
+        validate([tilt_series_mdoc_file], executor='fiber')
+
+
+@pytest.mark.parametrize('value', ['1e3', '2.'])
+def test_check_buffer_rejects_what_pydantic_rejects(value):
+    _, [problem] = check_buffer(f'[ZValue = 0]\nMagIndex = {value}\n')
+    assert (problem.line, problem.key, problem.expected) == (2, 'MagIndex', 'int')